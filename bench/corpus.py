@@ -0,0 +1,297 @@
+"""
+Generador de programas Compiscript sintéticos para benchmarks.
+
+Determinista por semilla. Cada forma estresa una parte distinta del front-end:
+
+    expressions  cadenas aritméticas/lógicas largas con paréntesis anidados
+    classes      muchas clases con cadenas de herencia, métodos y `new`
+    nesting      bloques if/while/for/foreach anidados a gran profundidad
+    functions    funciones largas con muchas sentencias y llamadas
+    arrays       arreglos multidimensionales, indexación y foreach
+    mixed        todas las anteriores intercaladas
+    chains       cadenas fluidas largas o.m(1).m(2).peers[0]... (no entra en mixed)
+
+`size` es la cantidad de unidades de nivel superior y `depth` la "profundidad"
+propia de cada forma (largo de la cadena, anidamiento, largo del cuerpo...).
+
+Con `errors="semantic"` se insertan sentencias con errores de tipos/ámbito
+(el programa sigue parseando); con `errors="syntax"` se rompen algunas
+sentencias (falta ';' o ')'). `errors="none"` genera programas válidos: el
+análisis semántico no reporta nada.
+
+Uso:
+    python bench/corpus.py --shape classes --size 200 --seed 1 -o /tmp/c.cps
+    python bench/corpus.py --out-dir /tmp/corpus        # matriz completa
+"""
+import argparse
+import os
+import random
+from typing import Callable, List
+
+SHAPES = ("expressions", "classes", "nesting", "functions", "arrays", "mixed", "chains")
+# formas que intercala "mixed" (fijas para que un mixed siga siendo comparable entre commits)
+_MIXED = ("expressions", "classes", "nesting", "functions", "arrays")
+ERROR_KINDS = ("none", "semantic", "syntax")
+
+# Sentencias con errores semánticos; usan nombres que siempre existen (g0, gs)
+_SEMANTIC_ERRORS = (
+    'let bad{n}: integer = "x";',
+    "let bad{n}: integer = undefined{n} + 1;",
+    "let bad{n}: string = g0 - gs;",
+    "if (g0) {{ print(g0); }}",
+    "break;",
+    "let bad{n}: integer = helper(1, 2, 3);",
+    "let bad{n}: integer = g0[0];",
+)
+
+
+class _Gen:
+    def __init__(self, seed: int, depth: int):
+        self.rng = random.Random(seed)
+        self.depth = depth
+        self.n = 0              # contador para nombres únicos
+
+    def fresh(self, prefix: str) -> str:
+        self.n += 1
+        return f"{prefix}{self.n}"
+
+    # ---- expresiones
+    def int_expr(self, length: int, names: List[str], parens: int = 3) -> str:
+        ops = ("+", "-", "*", "%")
+        parts = [self.int_atom(names)]
+        for _ in range(length - 1):
+            op = self.rng.choice(ops)
+            if parens > 0 and self.rng.random() < 0.15:
+                atom = f"({self.int_expr(self.rng.randint(2, 4), names, parens - 1)})"
+            else:
+                atom = self.int_atom(names)
+            if op == "%":
+                atom = str(self.rng.randint(2, 9))   # nunca % 0
+            parts.append(f"{op} {atom}")
+        return " ".join(parts)
+
+    def int_atom(self, names: List[str]) -> str:
+        if names and self.rng.random() < 0.5:
+            return self.rng.choice(names)
+        return str(self.rng.randint(0, 999))
+
+    def bool_expr(self, names: List[str]) -> str:
+        a, b = self.int_expr(3, names, 1), self.int_expr(2, names, 1)
+        cmp = self.rng.choice(("<", "<=", ">", ">=", "==", "!="))
+        tail = self.rng.choice(("", f" && !({self.int_atom(names)} == 0)", f" || {self.int_atom(names)} > 1"))
+        return f"{a} {cmp} {b}{tail}"
+
+    # ---- formas
+    def expressions(self) -> str:
+        names = ["g0"]
+        out = []
+        for _ in range(3):
+            name = self.fresh("e")
+            out.append(f"let {name}: integer = {self.int_expr(self.depth, names)};")
+            names.append(name)
+        name = self.fresh("b")
+        out.append(f"let {name}: boolean = {self.bool_expr(names)};")
+        out.append(f'let {self.fresh("t")}: string = {name} ? "si" : "no";')
+        return "\n".join(out)
+
+    def classes(self) -> str:
+        # una cadena de herencia de largo `depth`
+        root = self.fresh("K")
+        lines = [
+            f"class {root} {{",
+            f"  let v: integer;",
+            f"  function constructor(x: integer) {{ print(x); }}",
+            f"  function get(): integer {{ return this.v; }}",
+            f'  function toString(): string {{ return "{root}"; }}',
+            "}",
+        ]
+        prev = root
+        for level in range(1, self.depth):
+            cls = f"{root}_{level}"
+            lines += [
+                f"class {cls} : {prev} {{",
+                f"  let f{level}: integer;",
+                f"  function m{level}(a: integer): integer {{ return this.get() + a * {level}; }}",
+                "}",
+            ]
+            prev = cls
+        obj = self.fresh("o")
+        lines += [
+            f"let {obj}: {prev} = new {prev}({self.rng.randint(0, 9)});",
+            f"let {self.fresh('r')}: integer = {obj}.get() + {obj}.m{max(1, self.depth - 1)}(2);" if self.depth > 1
+            else f"let {self.fresh('r')}: integer = {obj}.get();",
+            f'print("obj " + {obj});',
+        ]
+        return "\n".join(lines)
+
+    def nesting(self) -> str:
+        lines: List[str] = []
+        names = ["g0"]
+        indent = ""
+        for level in range(self.depth):
+            kind = self.rng.choice(("if", "while", "for", "foreach", "block"))
+            v = self.fresh("n")
+            if kind == "if":
+                lines.append(f"{indent}if ({self.bool_expr(names)}) {{")
+            elif kind == "while":
+                lines.append(f"{indent}while ({self.bool_expr(names)}) {{")
+            elif kind == "for":
+                lines.append(f"{indent}for (let {v}: integer = 0; {v} < {level + 2}; {v} = {v} + 1) {{")
+                names.append(v)
+            elif kind == "foreach":
+                lines.append(f"{indent}foreach ({v} in garr) {{")
+                names.append(v)
+            else:
+                lines.append(f"{indent}{{")
+            indent += "  "
+            w = self.fresh("w")
+            lines.append(f"{indent}let {w}: integer = {self.int_expr(3, names, 0)};")
+            names.append(w)
+        lines.append(f"{indent}print(\"hondo \" + {names[-1]});")
+        for _ in range(self.depth):
+            indent = indent[:-2]
+            lines.append(f"{indent}}}")
+        return "\n".join(lines)
+
+    def functions(self) -> str:
+        name = self.fresh("fn")
+        params = ["p", "q"]
+        body = ["  let acc: integer = p;"]
+        locals_ = ["p", "acc"]
+        for _ in range(self.depth):
+            r = self.rng.random()
+            if r < 0.4:
+                v = self.fresh("l")
+                body.append(f"  let {v}: integer = {self.int_expr(4, locals_, 1)};")
+                locals_.append(v)
+            elif r < 0.6:
+                body.append(f"  acc = acc + {self.int_expr(3, locals_, 0)};")
+            elif r < 0.75:
+                body.append(f"  if ({self.bool_expr(locals_)}) {{ acc = acc - 1; }} else {{ acc = acc + 1; }}")
+            elif r < 0.9:
+                body.append(f'  print(q + {self.rng.choice(locals_)});')
+            else:
+                body.append(f"  acc = helper(acc);")
+        body.append("  return acc;")
+        call = self.fresh("c")
+        return "\n".join(
+            [f"function {name}({params[0]}: integer, {params[1]}: string): integer {{"] + body + ["}",
+             f'let {call}: integer = {name}({self.rng.randint(0, 99)}, "s");']
+        )
+
+    def arrays(self) -> str:
+        dims = self.rng.randint(1, 3)
+        name = self.fresh("arr")
+
+        def literal(d: int) -> str:
+            if d == 0:
+                return str(self.rng.randint(0, 99))
+            return "[" + ", ".join(literal(d - 1) for _ in range(self.rng.randint(2, 4))) + "]"
+
+        idx = "".join("[0]" for _ in range(dims))
+        lines = [
+            f"let {name}: integer{'[]' * dims} = {literal(dims)};",
+            f"let {self.fresh('x')}: integer = {name}{idx} + {name}{idx} * {self.depth};",
+        ]
+        if dims >= 2:
+            row, cell = self.fresh("row"), self.fresh("cell")
+            lines.append(f"foreach ({row} in {name}) {{ foreach ({cell} in {row}) {{ print({cell}); }} }}")
+        else:
+            cell = self.fresh("cell")
+            lines.append(f"foreach ({cell} in {name}) {{ print({cell}); }}")
+        return "\n".join(lines)
+
+    def chains(self) -> str:
+        # una clase que se devuelve a sí misma y una cadena de `depth` sufijos sobre ella
+        cls, obj = self.fresh("F"), self.fresh("o")
+        steps = []
+        for _ in range(self.depth):
+            r = self.rng.random()
+            if r < 0.6:
+                steps.append(f".add({self.int_atom(['g0'])})")
+            elif r < 0.8:
+                steps.append(".self()")
+            else:
+                steps.append(".peers[0]")
+        return "\n".join([
+            f"class {cls} {{",
+            f"  let n: integer;",
+            f"  let peers: {cls}[];",
+            f"  function add(x: integer): {cls} {{ print(x); return this; }}",
+            f"  function self(): {cls} {{ return this; }}",
+            f"  function total(): integer {{ return this.n; }}",
+            "}",
+            f"let {obj}: {cls} = new {cls}();",
+            f"let {self.fresh('r')}: integer = {obj}{''.join(steps)}.total();",
+        ])
+
+
+_PRELUDE = """let g0: integer = 1;
+let gs: string = "s";
+let garr: integer[] = [1, 2, 3];
+function helper(a: integer): integer { return a + 1; }
+"""
+
+
+def generate(shape: str, size: int, seed: int = 0, depth: int = 8, errors: str = "none",
+             error_rate: float = 0.05) -> str:
+    """
+    Retorna el código de un programa sintético de `size` unidades con la forma dada.
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"forma desconocida: {shape}")
+    if errors not in ERROR_KINDS:
+        raise ValueError(f"tipo de error desconocido: {errors}")
+    gen = _Gen(seed, depth)
+    if shape == "mixed":
+        makers: List[Callable[[], str]] = [getattr(gen, s) for s in _MIXED]
+        pick = lambda: gen.rng.choice(makers)()
+    else:
+        pick = getattr(gen, shape)
+
+    units = [pick() for _ in range(size)]
+    broken = gen.rng.sample(range(len(units)), min(max(1, int(size * error_rate)), len(units)))
+    if errors == "semantic":
+        for i in broken:
+            units[i] += "\n" + gen.rng.choice(_SEMANTIC_ERRORS).format(n=gen.fresh(""))
+    elif errors == "syntax":
+        for i in broken:
+            text = units[i]
+            cut = [j for j, ch in enumerate(text) if ch in ";)"]
+            if cut:
+                j = gen.rng.choice(cut)
+                units[i] = text[:j] + text[j + 1:]
+    return _PRELUDE + "\n".join(units) + "\n"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generador de corpus sintético de Compiscript")
+    ap.add_argument("--shape", choices=SHAPES, default="mixed")
+    ap.add_argument("--size", type=int, default=100, help="Unidades de nivel superior.")
+    ap.add_argument("--depth", type=int, default=8, help="Profundidad propia de la forma.")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--errors", choices=ERROR_KINDS, default="none")
+    ap.add_argument("--error-rate", type=float, default=0.05)
+    ap.add_argument("-o", "--output", help="Archivo de salida (por defecto: stdout).")
+    ap.add_argument("--out-dir", help="Generar la matriz forma x errores en este directorio.")
+    args = ap.parse_args()
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+        for shape in SHAPES:
+            for errors in ERROR_KINDS:
+                path = os.path.join(args.out_dir, f"{shape}-{errors}-s{args.seed}.cps")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(generate(shape, args.size, args.seed, args.depth, errors, args.error_rate))
+        return
+
+    src = generate(args.shape, args.size, args.seed, args.depth, args.errors, args.error_rate)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(src)
+    else:
+        print(src, end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: visitor semántico con y sin colapso de cadenas passthrough.
+
+Genera un programa con muchas expresiones de hojas (literales e identificadores),
+lo parsea una vez y mide el pase semántico en ambos modos.
+
+Uso:
+    python bench/passthrough.py [--statements N] [--repeat R]
+"""
+import argparse
+import os
+import sys
+import time
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_root, "program"))
+sys.path.insert(0, os.path.join(repo_root, "src"))
+
+from antlr4 import InputStream, CommonTokenStream
+
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from semantic.semantic import SemanticVisitor
+
+
+def make_source(statements: int) -> str:
+    lines = ["let a: integer = 1;", "let s: string = \"x\";", "let xs: integer[] = [1, 2, 3];"]
+    for i in range(statements):
+        lines.append(f"let v{i}: integer = a + {i} * a - xs[{i % 3}];")
+        lines.append(f"print(s + v{i});")
+        lines.append(f"if (v{i} > a && true) {{ a = v{i}; }}")
+    return "\n".join(lines) + "\n"
+
+
+def parse(source: str):
+    parser = CompiscriptParser(CommonTokenStream(CompiscriptLexer(InputStream(source))))
+    return parser.program()
+
+
+def time_visitor(tree, collapse: bool, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        tree.accept(SemanticVisitor(collapse_passthroughs=collapse))
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--statements", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    tree = parse(make_source(args.statements))
+    plain = time_visitor(tree, collapse=False, repeat=args.repeat)
+    collapsed = time_visitor(tree, collapse=True, repeat=args.repeat)
+    print(f"sin colapso : {plain * 1000:8.1f} ms")
+    print(f"con colapso : {collapsed * 1000:8.1f} ms")
+    print(f"speedup     : {plain / collapsed:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
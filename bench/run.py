@@ -0,0 +1,242 @@
+"""
+Benchmark del front-end por fases sobre el corpus sintético de bench/corpus.py.
+
+Para cada combinación forma x errores x semilla genera un programa y mide por
+separado, sobre el mismo texto:
+
+    lex           char stream -> CompiscriptLexer -> tokens (CommonTokenStream.fill)
+    parse         parse_tokens() sobre los tokens ya lexeados
+    semantic      SemanticVisitor sobre el parse tree
+    lower         parse tree -> AST compacto
+    ast_semantic  AstSemanticVisitor sobre el AST
+
+Los tiempos son el mínimo y la mediana de `--repeat` corridas (el parser se
+calienta antes con analysis.warm_up). La memoria se mide en una corrida
+aparte con tracemalloc (para no inflar los tiempos): `peak_bytes` es el pico
+durante la fase y `retained_bytes` lo que queda vivo al terminar (p. ej. el
+árbol). Si el programa tiene errores de sintaxis, las fases semánticas no se
+corren.
+
+El resultado es JSON (con commit, versión de Python y del runtime de ANTLR)
+para comparar entre commits:
+
+    python bench/run.py --json bench-HEAD.json
+    python bench/run.py --baseline bench-HEAD~1.json      # ratios y regresiones
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(repo_root, "program"))
+sys.path.insert(0, os.path.join(repo_root, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from antlr4 import CommonTokenStream
+from antlr4.ListTokenSource import ListTokenSource
+
+from CompiscriptLexer import CompiscriptLexer
+from parser.parser import parse_tokens, STRATEGIES, STRATEGY_TWO_STAGE
+from parser.stream import CompactInputStream
+from semantic.semantic import SemanticVisitor
+from semantic.lowering import lower
+from semantic.ast_semantic import AstSemanticVisitor
+from analysis.analysis import warm_up
+from corpus import ERROR_KINDS, SHAPES, generate
+
+PHASES = ("lex", "parse", "semantic", "lower", "ast_semantic")
+
+
+def _phases(source: str, strategy: str) -> List[Tuple[str, Callable[[Dict[str, Any]], Any]]]:
+    """
+    Fases en orden; cada una lee lo que necesita de `state` y guarda su salida ahí.
+    """
+    def lex(state):
+        stream = CommonTokenStream(CompiscriptLexer(CompactInputStream.from_text(source)))
+        stream.fill()
+        state["tokens"] = stream.tokens[:-1]          # sin EOF: ListTokenSource lo agrega
+
+    def parse(state):
+        state["parse"] = parse_tokens(CommonTokenStream(ListTokenSource(state["tokens"])), strategy=strategy)
+
+    def semantic(state):
+        visitor = SemanticVisitor()
+        state["parse"].tree.accept(visitor)
+        state["semantic_issues"] = len(visitor.issues)
+
+    def lower_(state):
+        state["ast"] = lower(state["parse"].tree)
+
+    def ast_semantic(state):
+        AstSemanticVisitor().visit(state["ast"])
+
+    return [("lex", lex), ("parse", parse), ("semantic", semantic), ("lower", lower_), ("ast_semantic", ast_semantic)]
+
+
+def _run_once(source: str, strategy: str, times: Dict[str, List[float]]) -> Dict[str, Any]:
+    state: Dict[str, Any] = {}
+    for name, fn in _phases(source, strategy):
+        if name not in ("lex", "parse") and state["parse"].issues:
+            break
+        t0 = time.perf_counter()
+        fn(state)
+        times[name].append(time.perf_counter() - t0)
+    return state
+
+
+def _measure_memory(source: str, strategy: str) -> Dict[str, Dict[str, int]]:
+    out: Dict[str, Dict[str, int]] = {}
+    state: Dict[str, Any] = {}
+    tracemalloc.start()
+    try:
+        for name, fn in _phases(source, strategy):
+            if name not in ("lex", "parse") and state["parse"].issues:
+                break
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn(state)
+            current, peak = tracemalloc.get_traced_memory()
+            out[name] = {"peak_bytes": peak - before, "retained_bytes": current - before}
+    finally:
+        tracemalloc.stop()
+    return out
+
+
+def bench_one(shape: str, errors: str, seed: int, size: int, depth: int, repeat: int,
+              strategy: str, memory: bool) -> Dict[str, Any]:
+    source = generate(shape, size, seed=seed, depth=depth, errors=errors)
+    times: Dict[str, List[float]] = {p: [] for p in PHASES}
+    state: Dict[str, Any] = {}
+    for _ in range(repeat):
+        state = _run_once(source, strategy, times)
+
+    result: Dict[str, Any] = {
+        "shape": shape, "errors": errors, "seed": seed, "size": size, "depth": depth,
+        "bytes": len(source.encode("utf-8")), "lines": source.count("\n"),
+        "tokens": len(state["tokens"]), "stage": state["parse"].stage,
+        "syntax_issues": len(state["parse"].issues),
+        "semantic_issues": state.get("semantic_issues"),
+        "phases": {},
+    }
+    mem = _measure_memory(source, strategy) if memory else {}
+    for name in PHASES:
+        if not times[name]:
+            continue
+        result["phases"][name] = {
+            "best_s": min(times[name]),
+            "median_s": statistics.median(times[name]),
+            "first_s": times[name][0],
+            **mem.get(name, {}),
+        }
+    return result
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=repo_root, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args) -> Dict[str, Any]:
+    try:
+        from importlib.metadata import version
+        antlr = version("antlr4-python3-runtime")
+    except Exception:
+        antlr = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "antlr4_runtime": antlr,
+        "strategy": args.strategy,
+        "repeat": args.repeat,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compara `best_s` por (forma, errores, semilla, tamaño, profundidad, fase).
+    Retorna las líneas de la tabla; las regresiones (ratio > threshold) van marcadas con '!'.
+    """
+    def key(r):
+        return (r["shape"], r["errors"], r["seed"], r["size"], r["depth"])
+
+    old = {key(r): r for r in baseline["results"]}
+    lines = [f"{'caso':<34} {'fase':<13} {'antes':>9} {'ahora':>9} {'ratio':>7}"]
+    for r in current["results"]:
+        b = old.get(key(r))
+        if b is None:
+            continue
+        case = f"{r['shape']}/{r['errors']}/s{r['seed']}"
+        for phase, data in r["phases"].items():
+            if phase not in b["phases"]:
+                continue
+            before, now = b["phases"][phase]["best_s"], data["best_s"]
+            ratio = now / before if before else float("inf")
+            mark = " !" if ratio > threshold else ""
+            lines.append(f"{case:<34} {phase:<13} {before * 1000:8.1f}ms {now * 1000:8.1f}ms {ratio:6.2f}x{mark}")
+    return lines
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark por fases del front-end de Compiscript")
+    ap.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    ap.add_argument("--errors", nargs="+", choices=ERROR_KINDS, default=["none", "semantic", "syntax"])
+    ap.add_argument("--seeds", nargs="+", type=int, default=[0])
+    ap.add_argument("--size", type=int, default=100, help="Unidades de nivel superior por programa.")
+    ap.add_argument("--depth", type=int, default=8, help="Profundidad propia de cada forma.")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--strategy", choices=STRATEGIES, default=STRATEGY_TWO_STAGE)
+    ap.add_argument("--no-memory", action="store_true", help="No hacer la corrida con tracemalloc.")
+    ap.add_argument("--json", metavar="PATH", help="Escribir los resultados en JSON ('-' = stdout).")
+    ap.add_argument("--baseline", metavar="PATH", help="JSON de una corrida anterior para comparar.")
+    ap.add_argument("--threshold", type=float, default=1.10,
+                    help="Ratio a partir del cual una fase cuenta como regresión (con --baseline).")
+    args = ap.parse_args()
+
+    # las formas profundas (nesting, paréntesis) recursan bastante en parser y visitors
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    warm_up()
+
+    results = []
+    for shape in args.shapes:
+        for errors in args.errors:
+            for seed in args.seeds:
+                r = bench_one(shape, errors, seed, args.size, args.depth, args.repeat,
+                              args.strategy, memory=not args.no_memory)
+                results.append(r)
+                phases = "  ".join(f"{p}={d['best_s'] * 1000:.1f}ms" for p, d in r["phases"].items())
+                print(f"{shape:<12} {errors:<9} s{seed}  {r['tokens']:>7} tokens  {r['stage']:<3}  {phases}",
+                      file=sys.stderr)
+
+    report = {"meta": metadata(args), "results": results}
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            lines = compare(json.load(f), report, args.threshold)
+        print("\n".join(lines), file=sys.stderr)
+        if any(line.endswith("!") for line in lines):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark de arranque: cuánto tarda un proceso nuevo antes de (y en) analizar
+un archivo chico, que es lo que domina las corridas de a un archivo (hooks de
+pre-commit, integraciones de editor sin daemon).
+
+Cada caso corre `--repeat` veces en un proceso de Python nuevo:
+
+    python    intérprete vacío (piso: lo que no depende de este repo)
+    antlr     import del runtime de ANTLR
+    grammar   import de CompiscriptLexer/CompiscriptParser (deserializa los ATN)
+    analysis  import de parser + analysis (lo que importa Driver.py)
+    driver    Driver.py -q sobre un programa de una línea, de punta a punta
+
+Con `--dfa-cache PATH` se agrega el caso `driver_dfa`: el mismo Driver.py
+arrancando con los DFA de predicción guardados (ver Driver.py --warm-dfa).
+`--file` reemplaza el programa de una línea por uno propio (con un archivo
+real se nota más el costo de los DFA fríos).
+
+Con `--imports` además se lista, con `python -X importtime`, qué módulos
+importa Driver.py y cuánto cuesta cada uno (acumulado, top 15).
+
+    python bench/startup.py --json startup-HEAD.json
+    python bench/startup.py --baseline startup-HEAD~1.json
+    python bench/startup.py --file program/program.cps --dfa-cache /tmp/cps.dfa
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PATHS = f"import sys; sys.path[:0] = [{os.path.join(repo_root, 'program')!r}, {os.path.join(repo_root, 'src')!r}]"
+DRIVER = os.path.join(repo_root, "program", "Driver.py")
+TINY_SOURCE = "let a: integer = 1;\n"
+
+CASES = {
+    "python": ["-c", "pass"],
+    "antlr": ["-c", "import antlr4"],
+    "grammar": ["-c", f"{_PATHS}; import CompiscriptLexer, CompiscriptParser"],
+    "analysis": ["-c", f"{_PATHS}; import parser.parser, analysis.analysis"],
+}
+
+
+def time_process(args: List[str], repeat: int, check: bool = True) -> List[float]:
+    # con --file el programa puede tener errores (exit 1): ahí no se exige exit 0
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=check)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def import_profile(path: str, top: int = 15) -> List[str]:
+    """
+    Módulos de primer nivel que importa Driver.py, por tiempo acumulado (µs).
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", DRIVER, path, "-q"],
+                          capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if len(name) - len(name.lstrip()) <= 3:        # nivel superior o primer hijo
+            rows.append((int(cumulative), name.rstrip()))
+    return [f"{us:>8} us {name}" for us, name in sorted(rows, reverse=True)[:top]]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Tiempo de arranque del front-end de Compiscript")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--imports", action="store_true", help="Listar el costo de import por módulo.")
+    ap.add_argument("--json", metavar="PATH", help="Escribir los resultados en JSON ('-' = stdout).")
+    ap.add_argument("--baseline", metavar="PATH", help="JSON de una corrida anterior para comparar.")
+    ap.add_argument("--file", metavar="PATH", help="Programa a analizar en vez del de una línea.")
+    ap.add_argument("--dfa-cache", metavar="PATH", help="Agregar el caso driver_dfa con estos DFA guardados.")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file
+        if path is None:
+            path = os.path.join(tmp, "tiny.cps")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(TINY_SOURCE)
+        cases = dict(CASES, driver=[DRIVER, path, "-q"])
+        if args.dfa_cache:
+            cases["driver_dfa"] = [DRIVER, path, "-q", "--dfa-cache", args.dfa_cache]
+
+        results: Dict[str, Dict[str, float]] = {}
+        for name, case in cases.items():
+            times = time_process(case, args.repeat, check=args.file is None)
+            results[name] = {"best_s": min(times), "median_s": statistics.median(times)}
+            print(f"{name:<10} best {min(times) * 1000:7.1f} ms   mediana {statistics.median(times) * 1000:7.1f} ms",
+                  file=sys.stderr)
+        if args.imports:
+            print("\n".join(import_profile(path)), file=sys.stderr)
+
+    report = {"python": sys.version.split()[0], "repeat": args.repeat, "results": results}
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            old = json.load(f)["results"]
+        for name, data in results.items():
+            if name in old:
+                before, now = old[name]["best_s"], data["best_s"]
+                print(f"{name:<10} {before * 1000:7.1f} ms -> {now * 1000:7.1f} ms  ({now / before:.2f}x)",
+                      file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
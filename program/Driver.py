@@ -1,4 +1,6 @@
 import argparse
+import glob
+import json
 import os
 import sys
 
@@ -9,45 +11,51 @@ sys.path.insert(0, os.path.dirname(__file__))
 repo_root = os.path.dirname(os.path.dirname(__file__))
 sys.path.insert(0, os.path.join(repo_root, "src"))
 
-from parser.parser import parse_file, tree_as_lisp
-from semantic.semantic import SemanticVisitor
+from parser.parser import parse_file, tree_as_lisp, STRATEGIES, STRATEGY_TWO_STAGE
+from analysis.analysis import run_semantic, analyze_file
+from stats.stats import AnalysisStats
+from sink.sink import JsonLinesSink, TextSink, KIND_SEMANTIC, KIND_SYNTAX
 
+# batch (multiprocessing), daemon (sockets) y la caché (tempfile) se importan
+# recién cuando se usan: un run de un solo archivo, p. ej. en un hook de
+# pre-commit, no paga esos imports al arrancar (ver bench/startup.py).
 
-def main():
-    ap = argparse.ArgumentParser(
-        description="Compiscript — parsea y realiza análisis semántico de un archivo .cps"
-    )
-    ap.add_argument("file", help="Ruta a archivo .cps (fuente Compiscript)")
-    ap.add_argument(
-        "--quiet", "-q",
-        action="store_true",
-        help="No imprimir el árbol si no hay errores."
-    )
-    args = ap.parse_args()
 
-    if not os.path.isfile(args.file):
-        print(f"ERROR: no existe el archivo: {args.file}", file=sys.stderr)
+def run_single(args, path: str, cache=None):
+    if not os.path.isfile(path):
+        print(f"ERROR: no existe el archivo: {path}", file=sys.stderr)
         sys.exit(2)
 
-    # 1) Parseo
-    result = parse_file(args.file)
+    # Con -q no hace falta el árbol: alcanza con el resultado (posiblemente cacheado).
+    # Con --stats siempre se analiza de verdad: una entrada de caché no tiene tiempos.
+    if cache is not None and args.quiet and not args.stats:
+        run_single_cached(args, path, cache)
+        return
+
+    stats = AnalysisStats() if args.stats else None
+    # los errores se imprimen a medida que aparecen, no al final de cada fase
+    sink = make_sink(args, path)
+
+    # 1) Parseo (los errores de sintaxis salen por el sink durante el parseo)
+    result = parse_file(path, strategy=args.parse_strategy, stats=stats, sink=sink, max_errors=args.max_errors)
+    print(f"Parseo terminado en etapa {result.stage}: {path}", file=sys.stderr)
 
     # 2) Errores de sintaxis
     if result.issues:
-        print("Errores de sintaxis:", file=sys.stderr)
-        for e in result.issues:
-            print(f"  línea {e.line}, col {e.column}: {e.message}", file=sys.stderr)
+        sink.finish(result.stage)
+        print_stats(stats)
         sys.exit(1)
 
     # 3) Análisis semántico
-    visitor = SemanticVisitor()
-    _ = result.tree.accept(visitor)
+    visitor = run_semantic(result.tree, use_ast=args.ast, stats=stats, sink=sink,
+                           suppress_cascades=args.suppress_cascades)
+    sink.finish(result.stage)
+    print_stats(stats)
 
     if visitor.issues:
-        print("Errores semánticos:", file=sys.stderr)
-        for e in visitor.issues:
-            print(f"  línea {e.line}, col {e.column}: {e.message}", file=sys.stderr)
         sys.exit(1)
+    if args.format == "json":
+        return             # stdout queda solo con las líneas JSON
 
     # 4) Dump opcional de la tabla de símbolos
     for line in visitor.symtab.export_as_lines():
@@ -58,5 +66,185 @@ def main():
         print(tree_as_lisp(result))
 
 
+def make_sink(args, path: str):
+    if args.format == "json":
+        return JsonLinesSink(sys.stdout, path, max_errors=args.max_errors)
+    return TextSink(sys.stderr, max_errors=args.max_errors)
+
+
+def print_stats(stats):
+    if stats is not None:
+        for line in stats.format_lines():
+            print(line, file=sys.stderr)
+
+
+def run_single_cached(args, path: str, cache):
+    report = analyze_file(path, strategy=args.parse_strategy, use_ast=args.ast, cache=cache,
+                          max_errors=args.max_errors, suppress_cascades=args.suppress_cascades)
+    if report.error is not None:
+        print(f"ERROR: {report.error}", file=sys.stderr)
+        sys.exit(2)
+    origin = "caché" if report.cached else "etapa"
+    print(f"Parseo terminado en {origin} {report.stage}: {path}", file=sys.stderr)
+
+    # el reporte ya está completo: se pasa por el mismo sink para tener la misma salida
+    sink = make_sink(args, path)
+    for kind, issues in ((KIND_SYNTAX, report.syntax_issues), (KIND_SEMANTIC, report.semantic_issues)):
+        for e in issues:
+            sink.emit(kind, e)
+    sink.finish(report.stage)
+    if not report.ok:
+        sys.exit(1)
+    if args.format == "json":
+        return
+
+    for line in report.symbols:
+        print(line)
+
+
+def run_many(args, paths, cache=None):
+    from batch.batch import run_batch, format_report, format_summary, combined_exit_code
+    from daemon.daemon import report_to_json
+
+    reports = []
+    for report in run_batch(paths, jobs=args.jobs, strategy=args.parse_strategy, use_ast=args.ast,
+                            cache=cache, max_errors=args.max_errors,
+                            suppress_cascades=args.suppress_cascades, dfa_path=args.dfa_cache):
+        reports.append(report)
+        if args.format == "json":
+            print(json.dumps(report_to_json(report), ensure_ascii=False), flush=True)
+            continue
+        for line in format_report(report):
+            print(line)
+    print(format_summary(reports), file=sys.stderr if args.format == "json" else sys.stdout)
+    sys.exit(combined_exit_code(reports))
+
+
+def warm_dfa_cache(args, paths):
+    # se parte de lo ya guardado (si es de esta gramática): cada corpus suma estados
+    from parser.dfa import load_dfa, save_dfa, warm_dfa
+    load_dfa(args.dfa_cache)
+    parsed = warm_dfa(paths, strategy=args.parse_strategy)
+    sizes = save_dfa(args.dfa_cache)
+    print(f"DFA calentado con {parsed} archivos -> {args.dfa_cache}: "
+          f"{sizes['lexer_states']} estados de lexer, {sizes['parser_states']} de parser", file=sys.stderr)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Compiscript — parsea y realiza análisis semántico de archivos .cps"
+    )
+    ap.add_argument(
+        "files", nargs="*",
+        help="Archivos .cps, directorios (se recorren buscando *.cps) o globs."
+    )
+    ap.add_argument(
+        "--quiet", "-q",
+        action="store_true",
+        help="No imprimir el árbol si no hay errores."
+    )
+    ap.add_argument(
+        "--parse-strategy",
+        choices=STRATEGIES,
+        default=STRATEGY_TWO_STAGE,
+        help="two-stage: SLL rápido y re-parseo LL solo si falla; ll: siempre LL completo."
+    )
+    ap.add_argument(
+        "--ast",
+        action="store_true",
+        help="Hacer el análisis semántico sobre el AST compacto en lugar del árbol de ANTLR."
+    )
+    ap.add_argument(
+        "--jobs", "-j",
+        type=int, default=os.cpu_count() or 1,
+        help="Procesos para el modo de varios archivos (por defecto: núcleos disponibles)."
+    )
+    ap.add_argument(
+        "--serve",
+        metavar="SOCKET",
+        help="Quedar como daemon atendiendo pedidos en este socket Unix (ver src/daemon/client.py)."
+    )
+    ap.add_argument(
+        "--cache-dir",
+        default=os.environ.get("CPS_CACHE_DIR"),
+        help="Directorio de la caché de resultados por contenido (por defecto: $CPS_CACHE_DIR; sin él, no se cachea)."
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignorar la caché de resultados aunque haya --cache-dir / $CPS_CACHE_DIR."
+    )
+    ap.add_argument(
+        "--stats",
+        action="store_true",
+        help="Mostrar en stderr tiempos por fase y contadores del análisis (solo con un archivo)."
+    )
+    ap.add_argument(
+        "--format",
+        choices=("text", "json"),
+        default="text",
+        help="text: errores legibles en stderr; json: una línea JSON por error (o por archivo en batch) en stdout."
+    )
+    ap.add_argument(
+        "--max-errors",
+        type=int,
+        metavar="N",
+        help="Cortar el análisis de cada archivo al llegar a N errores."
+    )
+    ap.add_argument(
+        "--suppress-cascades",
+        action="store_true",
+        help="Omitir errores que solo derivan de una expresión que ya tenía error (tipo ERROR)."
+    )
+    ap.add_argument(
+        "--dfa-cache",
+        metavar="PATH",
+        default=os.environ.get("CPS_DFA_CACHE"),
+        help="DFA de predicción de ANTLR guardados (ver --warm-dfa) que se cargan al arrancar "
+             "(por defecto: $CPS_DFA_CACHE)."
+    )
+    ap.add_argument(
+        "--warm-dfa",
+        action="store_true",
+        help="No analizar: parsear los archivos dados como corpus y guardar los DFA en --dfa-cache."
+    )
+    args = ap.parse_args()
+    if args.max_errors is not None and args.max_errors < 1:
+        ap.error("--max-errors debe ser mayor que 0")
+
+    cache = None
+    if args.cache_dir and not args.no_cache:
+        from cache.cache import ResultCache
+        cache = ResultCache(args.cache_dir)
+
+    if args.serve:
+        from daemon.daemon import serve
+        serve(args.serve, cache=cache, dfa_path=args.dfa_cache)
+        return
+    if not args.files:
+        ap.error("se requiere al menos un archivo (o --serve SOCKET)")
+
+    if args.warm_dfa:
+        if not args.dfa_cache:
+            ap.error("--warm-dfa requiere --dfa-cache (o $CPS_DFA_CACHE)")
+        from batch.batch import expand_inputs
+        warm_dfa_cache(args, expand_inputs(args.files))
+        return
+
+    # un único archivo: salida clásica (tabla de símbolos + árbol)
+    if len(args.files) == 1 and not os.path.isdir(args.files[0]) and not glob.has_magic(args.files[0]):
+        if args.dfa_cache:
+            from parser.dfa import load_dfa
+            load_dfa(args.dfa_cache)
+        run_single(args, args.files[0], cache)
+        return
+
+    # varios archivos / directorios / globs: reporte agregado
+    if args.stats:
+        ap.error("--stats solo está disponible para un único archivo")
+    from batch.batch import expand_inputs
+    run_many(args, expand_inputs(args.files), cache)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from parser.parser import parse_file, parse_source, ParseResult, SyntaxIssue, STRATEGY_LL, STRATEGY_TWO_STAGE
+from semantic.semantic import SemanticVisitor, SemanticIssue
+from semantic.lowering import lower
+from semantic.ast_semantic import AstSemanticVisitor
+from stats.stats import AnalysisStats, instrument
+from sink.sink import IssueSink
+
+if TYPE_CHECKING:
+    # la caché solo se importa si se usa (ver _cached_report): arranque más corto
+    from cache.cache import ResultCache
+
+
+@dataclass
+class FileReport:
+    """
+    Resultado de analizar un archivo: solo datos simples (serializable con
+    pickle/JSON), sin árbol ni parser, para poder viajar entre procesos.
+    """
+    path: str
+    stage: Optional[str] = None
+    syntax_issues: List[SyntaxIssue] = field(default_factory=list)
+    semantic_issues: List[SemanticIssue] = field(default_factory=list)
+    symbols: List[str] = field(default_factory=list)
+    error: Optional[str] = None   # no se pudo leer/analizar el archivo
+    cached: bool = False          # vino de la caché de resultados
+    truncated: bool = False       # se cortó en `max_errors`: puede haber más errores
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.syntax_issues and not self.semantic_issues
+
+    @property
+    def exit_code(self) -> int:
+        # mismo criterio que Driver.py: 2 = archivo inválido, 1 = errores
+        if self.error is not None:
+            return 2
+        return 0 if self.ok else 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FileReport":
+        return cls(
+            path=data["path"],
+            stage=data.get("stage"),
+            syntax_issues=[SyntaxIssue(**i) for i in data.get("syntax_issues", ())],
+            semantic_issues=[SemanticIssue(**i) for i in data.get("semantic_issues", ())],
+            symbols=list(data.get("symbols", ())),
+            error=data.get("error"),
+            cached=data.get("cached", False),
+            truncated=data.get("truncated", False),
+        )
+
+    def limited(self, max_errors: Optional[int]) -> "FileReport":
+        """
+        Recorta un reporte completo (p. ej. de la caché) a `max_errors` errores.
+        """
+        if max_errors is None or len(self.syntax_issues) + len(self.semantic_issues) < max_errors:
+            return self
+        syntax = self.syntax_issues[:max_errors]
+        semantic = self.semantic_issues[:max_errors - len(syntax)]
+        return replace(self, syntax_issues=syntax, semantic_issues=semantic, truncated=True)
+
+
+def run_semantic(tree, use_ast: bool = False, stats: Optional[AnalysisStats] = None,
+                 sink: Optional[IssueSink] = None, max_errors: Optional[int] = None,
+                 suppress_cascades: bool = False) -> SemanticVisitor:
+    """
+    Corre el análisis semántico sobre el árbol de `parse_file` y retorna el visitor.
+    Con `stats`, el visitor se instrumenta y se miden la bajada al AST y la semántica.
+    Con `sink`, los errores se emiten a medida que aparecen (ver src/sink/sink.py).
+    `max_errors` corta el análisis al llegar a esa cantidad de errores y
+    `suppress_cascades` omite los que solo derivan de un tipo ERROR previo.
+    """
+    options = dict(sink=sink, max_errors=max_errors, suppress_cascades=suppress_cascades)
+    if stats is None:
+        if use_ast:
+            visitor = AstSemanticVisitor(**options)
+            visitor.visit(lower(tree))
+        else:
+            visitor = SemanticVisitor(**options)
+            tree.accept(visitor)
+        return visitor
+
+    if use_ast:
+        with stats.phase("lower"):
+            ast = lower(tree)
+        visitor = instrument(AstSemanticVisitor(**options), stats)
+        with stats.phase("semantic"):
+            visitor.visit(ast)
+    else:
+        visitor = instrument(SemanticVisitor(**options), stats)
+        with stats.phase("semantic"):
+            visitor.visit(tree)
+    return visitor
+
+
+def analyze_file(path: str, strategy: str = STRATEGY_TWO_STAGE, use_ast: bool = False,
+                 cache: Optional[ResultCache] = None, max_errors: Optional[int] = None,
+                 suppress_cascades: bool = False) -> FileReport:
+    """
+    Parsea y analiza un archivo .cps. Como Driver.py, si hay errores de sintaxis
+    no se corre el análisis semántico. Con `cache`, un archivo con el mismo
+    contenido que uno ya analizado no se vuelve a parsear. Con `max_errors`,
+    el análisis se corta al llegar a esa cantidad de errores (`truncated`);
+    `suppress_cascades` como en `run_semantic`.
+
+    Un archivo que no se puede leer, o cuyo análisis levanta una excepción
+    (p. ej. RecursionError con un anidamiento extremo), queda como reporte con
+    `error`: en un lote no se pierden los reportes de los demás archivos.
+    """
+    try:
+        if cache is None:
+            result = parse_file(path, strategy=strategy, max_errors=max_errors)
+            return _report(path, result, use_ast, max_errors, suppress_cascades)
+        with open(path, "rb") as f:
+            data = f.read()
+        source = data.decode("utf-8")   # mismo decode estricto que FileStream
+        return _cached_report(data, source, path, strategy, use_ast, cache, max_errors, suppress_cascades)
+    except Exception as e:
+        return FileReport(path=path, error=f"{type(e).__name__}: {e}")
+
+
+def analyze_source(source: str, path: str = "<source>", strategy: str = STRATEGY_TWO_STAGE,
+                   use_ast: bool = False, cache: Optional[ResultCache] = None,
+                   max_errors: Optional[int] = None, suppress_cascades: bool = False) -> FileReport:
+    """
+    Igual que `analyze_file` pero sobre texto en memoria; `path` solo etiqueta el reporte.
+    """
+    if cache is None:
+        result = parse_source(source, path=path, strategy=strategy, max_errors=max_errors)
+        return _report(path, result, use_ast, max_errors, suppress_cascades)
+    return _cached_report(source.encode("utf-8"), source, path, strategy, use_ast, cache, max_errors,
+                          suppress_cascades)
+
+
+def _cached_report(data: bytes, source: str, path: str, strategy: str, use_ast: bool,
+                   cache: ResultCache, max_errors: Optional[int] = None,
+                   suppress_cascades: bool = False) -> FileReport:
+    from cache.cache import cache_key
+    key = cache_key(data, strategy, use_ast, suppress_cascades)
+    hit = load_report(cache, key, path)
+    if hit is not None:
+        return hit.limited(max_errors)
+    result = parse_source(source, path=path, strategy=strategy, max_errors=max_errors)
+    report = _report(path, result, use_ast, max_errors, suppress_cascades)
+    store_report(cache, key, report)
+    return report
+
+
+def load_report(cache: ResultCache, key: str, path: str) -> Optional[FileReport]:
+    """
+    Reporte guardado en `cache` bajo `key` (con `path` y `cached=True`), o
+    None si no hay entrada o es de otro formato (se recalcula y se pisa).
+    """
+    hit = cache.get(key)
+    if hit is None:
+        return None
+    try:
+        return FileReport.from_dict({**hit, "path": path, "cached": True})
+    except (KeyError, TypeError):
+        return None
+
+
+def store_report(cache: ResultCache, key: str, report: FileReport) -> None:
+    """
+    Guarda `report` como entrada de `cache` (sin path, cached ni truncated: la
+    misma entrada vale para cualquier archivo con ese contenido). Un reporte
+    cortado no se guarda: no sirve para otro `max_errors`.
+    """
+    if report.truncated:
+        return
+    entry = report.to_dict()
+    del entry["path"], entry["cached"], entry["truncated"]
+    cache.put(key, entry)
+
+
+def _report(path: str, result: ParseResult, use_ast: bool, max_errors: Optional[int] = None,
+            suppress_cascades: bool = False) -> FileReport:
+    report = FileReport(path=path, stage=result.stage, syntax_issues=list(result.issues),
+                        truncated=result.truncated)
+    if result.issues:
+        return report
+
+    visitor = run_semantic(result.tree, use_ast=use_ast, max_errors=max_errors,
+                           suppress_cascades=suppress_cascades)
+    report.semantic_issues = list(visitor.issues)
+    report.symbols = visitor.symtab.export_as_lines()
+    report.truncated = visitor.truncated
+    return report
+
+
+# Programa chico pero variado: recorre casi todas las decisiones de la gramática
+# para que la caché DFA compartida de ANTLR y las tablas de despacho de los
+# visitors queden calientes antes del primer archivo real.
+_WARMUP_SOURCE = """
+const K: integer = 1;
+let xs: integer[][] = [[1, 2], [3]];
+class A { let v: integer; function constructor(v: integer) { this.v = v; } function get(): integer { return this.v; } }
+class B : A { function get(): integer { return this.v * 2; } }
+function f(a: integer, b: string): boolean { return a > 0 && b != "" || !(a <= 1); }
+let b: B = new B(1);
+b.v = -b.get() + xs[0][1] % 2 - 1 / 1;
+let t = f(1, "x") ? "s" : null;
+if (true) { print(t); } else { print(false); }
+while (K < 0) { break; }
+do { continue; } while (false);
+for (let i = 0; i < 2; i = i + 1) { }
+foreach (row in xs) { }
+try { print(b); } catch (e) { }
+switch (K) { case 1: print(1); default: print(2); }
+"""
+
+
+def warm_up(dfa_path: Optional[str] = None) -> None:
+    """
+    Calienta en el proceso actual el ATN y la caché DFA del parser (SLL y LL)
+    y las tablas de despacho de ambos visitors semánticos. Con `dfa_path`,
+    antes se cargan los DFA guardados con `parser.dfa.save_dfa` (si el
+    archivo falta o es de otra gramática, se sigue igual que sin él).
+    """
+    if dfa_path:
+        from parser.dfa import load_dfa
+        load_dfa(dfa_path)
+    result = parse_source(_WARMUP_SOURCE, strategy=STRATEGY_TWO_STAGE)
+    parse_source(_WARMUP_SOURCE, strategy=STRATEGY_LL)
+    run_semantic(result.tree)
+    run_semantic(result.tree, use_ast=True)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, Iterator, List, Optional
+
+from parser.parser import STRATEGY_TWO_STAGE
+from analysis.analysis import FileReport, analyze_file, warm_up
+from cache.cache import ResultCache
+
+
+def expand_inputs(inputs: Iterable[str]) -> List[str]:
+    """
+    Expande archivos, directorios (recursivo, *.cps) y globs a una lista de rutas
+    sin duplicados, en orden estable. Un glob sin coincidencias se conserva tal
+    cual para que se reporte como archivo inexistente.
+    """
+    out: List[str] = []
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(glob.glob(os.path.join(item, "**", "*.cps"), recursive=True))
+        elif glob.has_magic(item):
+            matches = sorted(p for p in glob.glob(item, recursive=True) if os.path.isfile(p)) or [item]
+        else:
+            matches = [item]
+        for m in matches:
+            if m not in seen:
+                seen.add(m)
+                out.append(m)
+    return out
+
+
+def run_batch(paths: List[str], jobs: int = 1, strategy: str = STRATEGY_TWO_STAGE,
+              use_ast: bool = False, cache: Optional[ResultCache] = None,
+              max_errors: Optional[int] = None, suppress_cascades: bool = False,
+              dfa_path: Optional[str] = None) -> Iterator[FileReport]:
+    """
+    Analiza `paths` con un pool de `jobs` procesos (cada worker calienta su
+    parser una sola vez) y produce los reportes en el mismo orden de entrada.
+    Con `max_errors`, cada archivo deja de analizarse al llegar a ese límite
+    (un archivo basura no se come un worker entero). Con `dfa_path`, cada
+    worker arranca con los DFA guardados (ver src/parser/dfa.py).
+    """
+    analyze = partial(analyze_file, strategy=strategy, use_ast=use_ast, cache=cache, max_errors=max_errors,
+                      suppress_cascades=suppress_cascades)
+    if jobs <= 1 or len(paths) <= 1:
+        warm_up(dfa_path)
+        for path in paths:
+            yield analyze(path)
+        return
+
+    jobs = min(jobs, len(paths))
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=warm_up, initargs=(dfa_path,)) as pool:
+        yield from pool.map(analyze, paths, chunksize=chunksize)
+
+
+def format_report(report: FileReport) -> List[str]:
+    if report.error is not None:
+        return [f"[ERROR] {report.path}: {report.error}"]
+    if report.ok:
+        return [f"[OK]    {report.path} ({report.stage})"]
+    if report.syntax_issues:
+        head, issues = "errores de sintaxis", report.syntax_issues
+    else:
+        head, issues = "errores semánticos", report.semantic_issues
+    lines = [f"[FAIL]  {report.path} ({report.stage}): {len(issues)} {head}"]
+    for e in issues:
+        lines.append(f"  línea {e.line}, col {e.column}: {e.message}")
+    if report.truncated:
+        lines.append("  ... análisis cortado (--max-errors)")
+    return lines
+
+
+def format_summary(reports: List[FileReport]) -> str:
+    ok = sum(1 for r in reports if r.ok)
+    bad = sum(1 for r in reports if r.error is not None)
+    failed = len(reports) - ok - bad
+    cached = sum(1 for r in reports if r.cached)
+    tail = f", {cached} desde caché" if cached else ""
+    return f"== RESUMEN: {len(reports)} archivos, {ok} OK, {failed} con errores, {bad} ilegibles{tail} =="
+
+
+def combined_exit_code(reports: Iterable[FileReport]) -> int:
+    return max((r.exit_code for r in reports), default=0)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+# ========================
+# Caché de resultados por contenido
+# ========================
+# Guarda en disco el resultado del análisis (errores de sintaxis, errores
+# semánticos, tabla de símbolos exportada y etapa de parseo) como JSON, con
+# clave = sha256(versión del analizador + opciones + bytes del archivo). Así un
+# archivo que no cambió entre corridas no se vuelve a parsear ni a analizar.
+#
+# La "versión del analizador" es un hash de los fuentes de los que depende el
+# resultado (lexer/parser generados, src/parser, src/semantic, src/analysis):
+# regenerar la gramática o tocar una regla semántica invalida todo solo.
+#
+# Tamaño acotado con desalojo LRU: cada acierto actualiza el mtime de la
+# entrada y, al pasarse de `max_bytes`, se borran las más viejas hasta quedar
+# bajo el 80 % del límite. Varios procesos pueden compartir el directorio: las
+# escrituras son atómicas (archivo temporal + rename) y una entrada que
+# desaparece o está corrupta cuenta como fallo.
+#
+# Solo usa la biblioteca estándar; no importa el parser.
+
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PROGRAM_DIR = os.path.join(os.path.dirname(_SRC_DIR), "program")
+_FINGERPRINT_SOURCES = (
+    os.path.join(_PROGRAM_DIR, "Compiscript*.py"),
+    os.path.join(_SRC_DIR, "parser", "*.py"),
+    os.path.join(_SRC_DIR, "semantic", "*.py"),
+    os.path.join(_SRC_DIR, "analysis", "*.py"),
+)
+
+
+@lru_cache(maxsize=None)
+def analyzer_fingerprint() -> str:
+    h = hashlib.sha256(f"cps-cache-{CACHE_FORMAT}".encode())
+    for pattern in _FINGERPRINT_SOURCES:
+        for path in sorted(glob.glob(pattern)):
+            h.update(os.path.basename(path).encode() + b"\0")
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def cache_key(data: bytes, strategy: str, use_ast: bool, suppress_cascades: bool = False) -> str:
+    # la supresión de cascadas cambia los errores reportados: va en la clave
+    options = f"{strategy}\0{int(use_ast)}\0" + ("cascades=0\0" if suppress_cascades else "")
+    h = hashlib.sha256(f"{analyzer_fingerprint()}\0{options}".encode())
+    h.update(data)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Directorio de entradas `<dd>/<clave>.json`. Los valores son dicts JSON;
+    `analysis.FileReport` sabe convertirse desde/hacia ellos.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None   # bytes en disco; se calcula al primer put
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key[2:] + ".json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "rb") as f:
+                data = json.loads(f.read())
+            os.utime(entry)      # LRU: marcar como usada recientemente
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self._discard(entry)
+            return None
+        return data if isinstance(data, dict) else None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        entry = self._entry_path(key)
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(entry), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, entry)
+        except OSError:
+            return                # la caché es best-effort: nunca rompe el análisis
+
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += len(payload)
+        if self._size > self.max_bytes:
+            self.evict(int(self.max_bytes * 0.8))
+
+    def evict(self, target_bytes: int) -> None:
+        """
+        Borra las entradas menos usadas hasta que el total quede en `target_bytes` o menos.
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "??", "*.json")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            self._discard(path)
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        self.evict(0)
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in glob.glob(os.path.join(self.directory, "??", "*.json")):
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    @staticmethod
+    def _discard(path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, Iterator, List
+
+# ========================
+# Cliente liviano del daemon
+# ========================
+# Solo usa la biblioteca estándar: no importa antlr4 ni el parser, así que
+# arranca en milisegundos. Pensado para integraciones de editor y hooks de
+# pre-commit:
+#
+#   python src/daemon/client.py --socket /tmp/cps.sock program/*.cps
+#   cat buffer.cps | python src/daemon/client.py --socket /tmp/cps.sock --stdin
+#
+# Protocolo: ver src/daemon/daemon.py.
+
+
+class DaemonClient:
+    """
+    Conexión a un daemon de análisis. Reutiliza el mismo socket para todos los
+    pedidos; usar como context manager.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 60.0):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self._rfile = self.sock.makefile("rb")
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        line = self._rfile.readline()
+        if not line:
+            raise ConnectionError("el daemon cerró la conexión")
+        return json.loads(line)
+
+    def analyze_path(self, path: str, **options) -> Dict[str, Any]:
+        return self.request({"op": "analyze", "path": os.path.abspath(path), **options})
+
+    def analyze_source(self, source: str, path: str = "<source>", **options) -> Dict[str, Any]:
+        return self.request({"op": "analyze", "source": source, "path": path, **options})
+
+    def close(self) -> None:
+        self._rfile.close()
+        self.sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    # mismo formato que batch.format_report, pero sobre el JSON del daemon
+    if report["error"] is not None:
+        return [f"[ERROR] {report['path']}: {report['error']}"]
+    if report["ok"]:
+        return [f"[OK]    {report['path']} ({report['stage']})"]
+    if report["syntax_issues"]:
+        head, issues = "errores de sintaxis", report["syntax_issues"]
+    else:
+        head, issues = "errores semánticos", report["semantic_issues"]
+    lines = [f"[FAIL]  {report['path']} ({report['stage']}): {len(issues)} {head}"]
+    for e in issues:
+        lines.append(f"  línea {e['line']}, col {e['column']}: {e['message']}")
+    if report.get("truncated"):
+        lines.append("  ... análisis cortado (--max-errors)")
+    return lines
+
+
+def _responses(client: DaemonClient, args) -> Iterator[Dict[str, Any]]:
+    options = {"strategy": args.parse_strategy, "ast": args.ast, "suppress_cascades": args.suppress_cascades}
+    if args.max_errors is not None:
+        options["max_errors"] = args.max_errors
+    if args.stdin:
+        yield client.analyze_source(sys.stdin.read(), path=args.stdin_name, **options)
+    for path in args.files:
+        yield client.analyze_path(path, **options)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Cliente del daemon de análisis de Compiscript")
+    ap.add_argument("files", nargs="*", help="Archivos .cps a analizar.")
+    ap.add_argument("--socket", "-s", required=True, help="Socket Unix del daemon (Driver.py --serve).")
+    ap.add_argument("--stdin", action="store_true", help="Analizar el código leído de stdin.")
+    ap.add_argument("--stdin-name", default="<stdin>", help="Nombre con el que se reporta stdin.")
+    ap.add_argument("--parse-strategy", default="two-stage", choices=("two-stage", "ll"))
+    ap.add_argument("--ast", action="store_true", help="Análisis semántico sobre el AST compacto.")
+    ap.add_argument("--max-errors", type=int, help="Cortar el análisis de cada archivo tras N errores.")
+    ap.add_argument("--suppress-cascades", action="store_true",
+                    help="Omitir errores que solo derivan de una expresión que ya tenía error.")
+    ap.add_argument("--json", action="store_true", help="Imprimir las respuestas crudas (una por línea).")
+    ap.add_argument("--shutdown", action="store_true", help="Detener el daemon al terminar.")
+    args = ap.parse_args()
+
+    try:
+        client = DaemonClient(args.socket)
+    except OSError as e:
+        print(f"ERROR: no se pudo conectar al daemon en {args.socket}: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    code = 0
+    with client:
+        for resp in _responses(client, args):
+            if args.json:
+                print(json.dumps(resp, ensure_ascii=False))
+            if not resp.get("ok"):
+                if not args.json:
+                    print(f"ERROR: {resp.get('error')}", file=sys.stderr)
+                code = 2
+                continue
+            report = resp["report"]
+            if not args.json:
+                for line in format_report(report):
+                    print(line)
+            code = max(code, report["exit_code"])
+        if args.shutdown:
+            client.request({"op": "shutdown"})
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+from parser.parser import STRATEGIES, STRATEGY_TWO_STAGE
+from analysis.analysis import FileReport, analyze_file, analyze_source, warm_up
+from cache.cache import ResultCache
+from parser.dfa import dfa_sizes, reset_dfa
+
+# ========================
+# Daemon de análisis
+# ========================
+# Proceso de larga vida que mantiene importado el runtime de ANTLR, el ATN del
+# parser, la caché DFA compartida y las tablas de despacho de los visitors.
+# Atiende pedidos por un socket Unix con un protocolo de líneas JSON:
+#
+#   -> {"op": "analyze", "path": "/abs/archivo.cps"}
+#   -> {"op": "analyze", "source": "let x = 1;", "path": "buffer.cps"}
+#      (opcionales: "strategy": "two-stage"|"ll", "ast": true|false,
+#       "max_errors": N -> el reporte trae "truncated": true si se cortó,
+#       "suppress_cascades": true|false)
+#   <- {"ok": true, "report": {...FileReport..., "exit_code": 0}}
+#
+#   -> {"op": "ping"}      <- {"ok": true, "pid": 1234}
+#   -> {"op": "dfa"}       <- {"ok": true, "sizes": {...}}   (tamaños de la caché DFA)
+#   -> {"op": "dfa", "reset": true}   vacía la caché DFA y responde los tamaños
+#   -> {"op": "shutdown"}  <- {"ok": true}   (y el daemon termina)
+#
+# Cualquier pedido inválido responde {"ok": false, "error": "..."} sin cerrar
+# la conexión. Una conexión puede mandar varios pedidos, uno por línea, y
+# puede quedar abierta (un editor conectado) sin bloquear a otros clientes:
+# cada conexión tiene su hilo y los pedidos se atienden de a uno.
+#
+# Las rutas se resuelven en el daemon: el cliente debe mandarlas absolutas.
+
+
+def report_to_json(report: FileReport) -> Dict[str, Any]:
+    data = report.to_dict()
+    data["ok"] = report.ok
+    data["exit_code"] = report.exit_code
+    return data
+
+
+def handle_request(req: Any, cache: Optional[ResultCache] = None) -> Dict[str, Any]:
+    """
+    Procesa un pedido ya decodificado y retorna la respuesta (sin serializar).
+    """
+    if not isinstance(req, dict):
+        return {"ok": False, "error": "el pedido debe ser un objeto JSON"}
+
+    op = req.get("op", "analyze")
+    if op == "ping":
+        return {"ok": True, "pid": os.getpid()}
+    if op == "shutdown":
+        return {"ok": True}
+    if op == "dfa":
+        if req.get("reset"):
+            reset_dfa()
+        return {"ok": True, "sizes": dfa_sizes()}
+    if op != "analyze":
+        return {"ok": False, "error": f"operación desconocida: {op!r}"}
+
+    strategy = req.get("strategy", STRATEGY_TWO_STAGE)
+    if strategy not in STRATEGIES:
+        return {"ok": False, "error": f"estrategia de parseo desconocida: {strategy!r}"}
+    use_ast = bool(req.get("ast", False))
+    cascades = bool(req.get("suppress_cascades", False))
+    max_errors = req.get("max_errors")
+    if max_errors is not None and (type(max_errors) is not int or max_errors < 1):
+        return {"ok": False, "error": "'max_errors' debe ser un entero positivo"}
+
+    source, path = req.get("source"), req.get("path")
+    if source is not None:
+        if not isinstance(source, str):
+            return {"ok": False, "error": "'source' debe ser texto"}
+        report = analyze_source(source, path=path or "<source>", strategy=strategy, use_ast=use_ast,
+                                cache=cache, max_errors=max_errors, suppress_cascades=cascades)
+    elif isinstance(path, str):
+        report = analyze_file(path, strategy=strategy, use_ast=use_ast, cache=cache, max_errors=max_errors,
+                              suppress_cascades=cascades)
+    else:
+        return {"ok": False, "error": "falta 'path' o 'source'"}
+    return {"ok": True, "report": report_to_json(report)}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            if not raw.strip():
+                continue
+            try:
+                req = json.loads(raw)
+            except ValueError as e:
+                req, resp = None, {"ok": False, "error": f"JSON inválido: {e}"}
+            else:
+                try:
+                    with self.server.lock:
+                        resp = handle_request(req, cache=self.server.cache)
+                except Exception as e:  # un archivo raro no debe tumbar el daemon
+                    resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(resp, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if isinstance(req, dict) and req.get("op") == "shutdown":
+                # shutdown() espera a serve_forever: no se puede llamar desde este hilo
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class AnalysisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Un hilo por conexión, pero un pedido a la vez (`lock`): la caché DFA de
+    ANTLR, las tablas de despacho del visitor y las de tipos internados se
+    comparten a nivel de proceso y no son thread-safe.
+    """
+    allow_reuse_address = True
+    daemon_threads = True       # una conexión abierta no frena el shutdown
+    cache: Optional[ResultCache] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+
+    def server_bind(self):
+        _remove_stale_socket(self.server_address)
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(path: str) -> None:
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)      # socket huérfano de un daemon que murió
+    else:
+        raise OSError(f"ya hay un daemon escuchando en {path}")
+    finally:
+        probe.close()
+
+
+def serve(socket_path: str, ready=None, cache: Optional[ResultCache] = None,
+          dfa_path: Optional[str] = None) -> None:
+    """
+    Calienta parser y visitors (partiendo de los DFA de `dfa_path`, si hay), y
+    atiende pedidos en `socket_path` hasta recibir 'shutdown' (o Ctrl+C).
+    `ready` (threading.Event) se marca al empezar a escuchar.
+    """
+    warm_up(dfa_path)
+    with AnalysisServer(socket_path, _Handler) as server:
+        server.cache = cache
+        print(f"Daemon escuchando en {socket_path} (pid {os.getpid()})", file=sys.stderr)
+        if ready is not None:
+            ready.set()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -2,7 +2,6 @@
 import streamlit as st
 import os
 import sys
-import tempfile
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
 import plotly.graph_objects as go
@@ -15,8 +14,19 @@ sys.path.insert(0, str(repo_root))
 sys.path.insert(0, str(repo_root / "src"))
 sys.path.insert(0, str(repo_root / "program"))
 
-from src.parser.parser import parse_file, tree_as_lisp
-from src.semantic.semantic import SemanticVisitor, SemanticIssue
+# Same import root as Driver.py and the batch/daemon code: mixing in "src.*"
+# imports would load a second copy of the parser and semantic modules
+from parser.parser import parse_source, tree_as_lisp, STRATEGY_TWO_STAGE
+from semantic.semantic import SemanticVisitor, SemanticIssue
+from cache.cache import ResultCache, cache_key
+from incremental.incremental import IncrementalAnalyzer
+from analysis.analysis import FileReport, load_report, run_semantic, store_report
+from stats.stats import AnalysisStats
+from parser.dfa import dfa_sizes, limit_dfa, load_dfa, reset_dfa
+
+# The IDE process lives for the whole session: past this many ANTLR DFA states
+# (lexer + parser) the prediction caches are dropped and rebuilt on demand
+MAX_DFA_STATES = 50_000
 
 
 def load_file_content(file_path: str) -> Optional[str]:
@@ -29,30 +39,73 @@ def load_file_content(file_path: str) -> Optional[str]:
         return None
 
 
-def save_temp_file(content: str) -> str:
-    """Save content to a temporary .cps file and return the path"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.cps', delete=False, encoding='utf-8') as f:
-        f.write(content)
-        return f.name
+def get_result_cache() -> Optional[ResultCache]:
+    """Result cache shared with Driver.py, enabled through $CPS_CACHE_DIR"""
+    cache_dir = os.environ.get("CPS_CACHE_DIR")
+    return ResultCache(cache_dir) if cache_dir else None
+
+
+@st.cache_resource
+def load_dfa_cache() -> bool:
+    """Load the saved ANTLR prediction DFA once per IDE process, from $CPS_DFA_CACHE"""
+    path = os.environ.get("CPS_DFA_CACHE")
+    return bool(path) and load_dfa(path)
+
+
+def show_dfa_cache() -> None:
+    """Size of the shared ANTLR prediction DFA, with a button to drop it"""
+    with st.expander("🧠 Parser DFA cache", expanded=False):
+        sizes = dfa_sizes()
+        cols = st.columns(3)
+        cols[0].metric("lexer states", sizes["lexer_states"])
+        cols[1].metric("parser states", sizes["parser_states"])
+        cols[2].metric("contexts", sizes["parser_contexts"])
+        st.caption(f"Dropped automatically above {MAX_DFA_STATES:,} states")
+        if st.button("Reset DFA cache"):
+            reset_dfa()
+            st.rerun()
+
 
+def format_syntax_errors(issues) -> List[str]:
+    return [f"Line {e.line}, Col {e.column}: {e.message}" for e in issues]
 
-def run_compilation(file_path: str) -> Tuple[bool, List[str], List[SemanticIssue], Optional[str], Optional[ParserRuleContext]]:
+
+def run_compilation(content: str, path: Optional[str] = None, cache: Optional[ResultCache] = None, stats: Optional[AnalysisStats] = None) -> Tuple[bool, List[str], List[SemanticIssue], Optional[str], Optional[ParserRuleContext]]:
     """
-    Run compilation using the parser and semantic analyzer.
+    Run compilation using the parser and semantic analyzer, straight from the
+    editor buffer (no temporary file); path only names the source.
     Returns: (success, syntax_errors, semantic_errors, tree_output, parse_tree)
+
+    With a cache, a file already known to have syntax errors is not parsed
+    again. Valid files are always parsed: the tree views need the live tree.
+    Every fresh result is stored in the same format Driver.py uses.
+
+    With stats, phase timings and visitor counters are recorded into it (the
+    cache lookup is skipped so every phase actually runs).
     """
     try:
-        # Parse the file
-        result = parse_file(file_path)
+        key = None
+        name = path or "<source>"
+        if cache is not None and stats is None:
+            key = cache_key(content.encode('utf-8'), STRATEGY_TWO_STAGE, False)
+            hit = load_report(cache, key, name)
+            if hit is not None and hit.syntax_issues:
+                return False, format_syntax_errors(hit.syntax_issues), [], None, None
+
+        # Parse the buffer
+        result = parse_source(content, path=path, stats=stats)
         
         # Check for syntax errors
         if result.issues:
-            syntax_errors = [f"Line {e.line}, Col {e.column}: {e.message}" for e in result.issues]
-            return False, syntax_errors, [], None, None
+            if key is not None:
+                store_report(cache, key, FileReport(path=name, stage=result.stage, syntax_issues=list(result.issues)))
+            return False, format_syntax_errors(result.issues), [], None, None
         
         # Run semantic analysis
-        visitor = SemanticVisitor()
-        _ = result.tree.accept(visitor)
+        visitor = run_semantic(result.tree, stats=stats)
+        if key is not None:
+            store_report(cache, key, FileReport(path=name, stage=result.stage, semantic_issues=list(visitor.issues),
+                                                symbols=visitor.symtab.export_as_lines()))
         
         # Check for semantic errors
         if visitor.issues:
@@ -66,6 +119,34 @@ def run_compilation(file_path: str) -> Tuple[bool, List[str], List[SemanticIssue
         return False, [f"Compilation error: {str(e)}"], [], None, None
 
 
+def run_incremental_compilation(analyzer: IncrementalAnalyzer, content: str):
+    """
+    Same errors as run_compilation, but only the top-level declarations touched
+    since the previous call are re-parsed and re-checked. The full parse tree is
+    not built here: tree_output and parse_tree are always None, and the caller
+    builds them with build_tree only when the tree view is shown (that parse
+    covers the whole buffer, so it is not part of what this path saves).
+    Returns: (success, syntax_errors, semantic_errors, tree_output, parse_tree, visitor)
+    """
+    try:
+        report = analyzer.update(content)
+        if report.syntax_issues:
+            return False, format_syntax_errors(report.syntax_issues), [], None, None, None
+        if report.semantic_issues:
+            return False, [], report.semantic_issues, None, None, analyzer.visitor
+        return True, [], [], None, None, analyzer.visitor
+    except Exception as e:
+        return False, [f"Compilation error: {str(e)}"], [], None, None, None
+
+
+def build_tree(results: Dict[str, Any]) -> None:
+    """Parse results['source'] once and fill in 'tree_output' and 'parse_tree'"""
+    if results.get('parse_tree') is None and results.get('source') is not None:
+        result = parse_source(results['source'])
+        results['tree_output'] = tree_as_lisp(result)
+        results['parse_tree'] = result.tree
+
+
 def create_tree_graph(parse_tree: ParserRuleContext) -> go.Figure:
     """Create a visual syntax tree using Plotly"""
     nodes = []
@@ -164,6 +245,34 @@ def create_tree_graph(parse_tree: ParserRuleContext) -> go.Figure:
     return fig
 
 
+def show_stats(stats: AnalysisStats) -> None:
+    """Phase timings and analysis counters collected for the last compile"""
+    with st.expander("⏱ Analysis Stats", expanded=True):
+        cols = st.columns(len(stats.phases) + 1)
+        for col, (name, secs) in zip(cols, stats.phases.items()):
+            col.metric(name, f"{secs * 1000:.1f} ms")
+        cols[-1].metric("total", f"{stats.total_time * 1000:.1f} ms")
+
+        st.markdown(
+            f"**Stage:** {stats.stage} · **Tokens:** {stats.tokens} · **Nodes:** {stats.total_nodes}"
+            f" · **Visits:** {stats.total_visits} · **Scopes:** {stats.scope_pushes}"
+            f" (max depth {stats.max_scope_depth})"
+        )
+        tab_nodes, tab_visits, tab_lookups, tab_raw = st.tabs(["🌳 Nodes", "👣 Visits", "🔎 Lookups", "🧾 Raw"])
+        with tab_nodes:
+            st.dataframe(sorted(stats.nodes.items(), key=lambda kv: -kv[1]), use_container_width=True)
+        with tab_visits:
+            st.dataframe(sorted(stats.visits.items(), key=lambda kv: -kv[1]), use_container_width=True)
+        with tab_lookups:
+            st.dataframe([
+                {"lookup": f"resolve_{kind}", "count": l.count, "misses": l.misses,
+                 "mean depth": round(l.mean_depth, 2), "max depth": l.max_depth}
+                for kind, l in stats.lookups.items()
+            ], use_container_width=True)
+        with tab_raw:
+            st.json(stats.to_dict())
+
+
 def main():
     st.set_page_config(
         page_title="Compiscript IDE",
@@ -182,6 +291,9 @@ def main():
         st.session_state.current_file = None
     if 'compilation_results' not in st.session_state:
         st.session_state.compilation_results = None
+    if 'analyzer' not in st.session_state:
+        st.session_state.analyzer = IncrementalAnalyzer()
+    load_dfa_cache()
     
     # Sidebar for file operations
     with st.sidebar:
@@ -212,10 +324,23 @@ def main():
             else:
                 st.error("Example file not found")
         
+        incremental = st.checkbox(
+            "Incremental analysis",
+            value=True,
+            help="Only re-parse and re-check the top-level declarations changed since the last compile"
+        )
+        collect_stats = st.checkbox(
+            "Collect analysis stats",
+            value=False,
+            help="Time each phase and count nodes, visits, scopes and lookups (runs a full, non-incremental analysis)"
+        )
+        
         # File info
         if st.session_state.current_file:
             st.info(f"**Current file:** {st.session_state.current_file}")
             st.info(f"**Lines:** {len(st.session_state.file_content.splitlines())}")
+
+        show_dfa_cache()
     
     # Main content area
     col1, col2 = st.columns([3, 2])
@@ -259,33 +384,42 @@ def main():
         # Run compilation when button is clicked
         if compile_clicked and st.session_state.file_content.strip():
             with st.spinner("Compiling..."):
-                # Save content to temporary file
-                temp_file = save_temp_file(st.session_state.file_content)
-                
-                try:
-                    # Run compilation
-                    success, syntax_errors, semantic_errors, tree_output, parse_tree = run_compilation(temp_file)
-                    
+                if incremental and not collect_stats:
+                    success, syntax_errors, semantic_errors, tree_output, parse_tree, visitor = \
+                        run_incremental_compilation(st.session_state.analyzer, st.session_state.file_content)
+                    st.session_state.compilation_results = {
+                        'success': success,
+                        'syntax_errors': syntax_errors,
+                        'semantic_errors': semantic_errors,
+                        'tree_output': tree_output,
+                        'parse_tree': parse_tree,
+                        'visitor': visitor,
+                        # the tree is built from this only if it is shown (see build_tree)
+                        'source': st.session_state.file_content
+                    }
+                else:
+                    # Run compilation on the buffer itself
+                    stats = AnalysisStats() if collect_stats else None
+                    success, syntax_errors, semantic_errors, tree_output, parse_tree = run_compilation(
+                        st.session_state.file_content, st.session_state.current_file, get_result_cache(), stats)
+
                     # Get visitor for symbol table
                     visitor = None
                     if parse_tree and not syntax_errors:
                         visitor = SemanticVisitor()
                         _ = parse_tree.accept(visitor)
-                    
+
                     st.session_state.compilation_results = {
                         'success': success,
                         'syntax_errors': syntax_errors,
                         'semantic_errors': semantic_errors,
                         'tree_output': tree_output,
                         'parse_tree': parse_tree,
-                        'visitor': visitor
+                        'visitor': visitor,
+                        'stats': stats
                     }
-                finally:
-                    # Clean up temp file
-                    try:
-                        os.unlink(temp_file)
-                    except:
-                        pass
+            # keep the long-lived process bounded: dropped DFA states refill on later compiles
+            limit_dfa(MAX_DFA_STATES)
         
         # Display compilation results
         if st.session_state.compilation_results:
@@ -294,6 +428,11 @@ def main():
             if results['success']:
                 st.success("✅ Compilation successful!")
                 
+                # The incremental path leaves the full parse for when the tree is asked for
+                if results['parse_tree'] is None and results.get('source') is not None:
+                    if st.checkbox("Show syntax tree (parses the whole buffer)", key='show_tree'):
+                        build_tree(results)
+
                 # Show syntax tree options
                 if results['tree_output'] and results['parse_tree']:
                     tree_view_type = st.radio(
@@ -333,6 +472,10 @@ def main():
         else:
             st.info("👆 Click 'Compile & Analyze' to see results")
     
+    # Analysis stats (only when collected)
+    if st.session_state.compilation_results and st.session_state.compilation_results.get('stats'):
+        show_stats(st.session_state.compilation_results['stats'])
+
     # Symbol Table Section (below main columns)
     if st.session_state.compilation_results and st.session_state.compilation_results.get('visitor'):
         visitor = st.session_state.compilation_results['visitor']
@@ -0,0 +1,396 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from antlr4 import CommonTokenStream, InputStream, Token
+from antlr4.ListTokenSource import ListTokenSource
+
+from CompiscriptLexer import CompiscriptLexer
+from parser.parser import parse_tokens, STAGE_LL, STAGE_SLL, STRATEGY_TWO_STAGE
+from semantic.semantic import Scope, SemanticIssue, SymbolTable
+from semantic.ast_nodes import Program
+from semantic.lowering import lower
+from semantic.ast_semantic import AstSemanticVisitor
+from analysis.analysis import FileReport, analyze_source
+
+# ========================
+# Análisis incremental por declaración de nivel superior
+# ========================
+# `program: statement* EOF` parte el archivo en unidades naturales: cada
+# función, clase o sentencia de nivel superior. Entre una versión y la
+# siguiente del mismo archivo:
+#
+#   1. Se lexea el archivo completo (barato) y los tokens se cortan en
+#      unidades contando llaves/paréntesis/corchetes.
+#   2. Una unidad cuyo texto (y columna inicial) no cambió reutiliza su AST;
+#      solo las nuevas o modificadas se parsean (con la regla `program`) y se
+#      bajan a AST.
+#   3. El análisis semántico recorre las unidades en orden sobre una tabla de
+#      símbolos que registra, por unidad, qué nombres globales consultó (y con
+#      qué firma los encontró) y qué símbolos aportó. Una unidad ya chequeada
+#      cuyas consultas siguen resolviendo a lo mismo no se vuelve a visitar: se
+#      re-aplican sus aportes y sus errores (corridos si la unidad se movió).
+#
+# Así, cambiar el cuerpo de una función solo re-chequea esa función; cambiar
+# su firma re-chequea además las unidades que la llaman; renombrar una clase,
+# las que hacen `new` de ella, etc.
+#
+# Si alguna unidad tiene errores de sintaxis (o el corte no cierra) se cae al
+# análisis completo de `analyze_source`, para reportar exactamente los mismos
+# errores que Driver.py.
+
+_LITERALS = CompiscriptLexer.literalNames
+_OPEN = {_LITERALS.index(t) for t in ("'{'", "'('", "'['")}
+_CLOSE = {_LITERALS.index(t) for t in ("'}'", "')'", "']'")}
+_SEMI = _LITERALS.index("';'")
+_RBRACE = _LITERALS.index("'}'")
+_ELSE = _LITERALS.index("'else'")
+_CATCH = _LITERALS.index("'catch'")
+_WHILE = _LITERALS.index("'while'")
+_DO = _LITERALS.index("'do'")
+
+ReadKey = Tuple[str, str]          # (diccionario, nombre)
+
+
+def split_units(tokens: List[Token], next_type: int = Token.EOF) -> Optional[List[Tuple[int, int]]]:
+    """
+    Corta los tokens (sin EOF) en unidades de nivel superior y retorna sus
+    rangos [inicio, fin) de índices. None si los delimitadores no balancean.
+    `next_type` es el tipo del token que sigue a los dados (EOF si no hay más).
+    """
+    spans: List[Tuple[int, int]] = []
+    start, depth = 0, 0
+    n = len(tokens)
+    for i, tok in enumerate(tokens):
+        t = tok.type
+        if t in _OPEN:
+            depth += 1
+        elif t in _CLOSE:
+            depth -= 1
+            if depth < 0:
+                return None
+        if depth != 0 or (t != _SEMI and t != _RBRACE):
+            continue
+        nxt = tokens[i + 1].type if i + 1 < n else next_type
+        if nxt == _ELSE or nxt == _CATCH:
+            continue                      # if ... else / try ... catch
+        if t == _RBRACE and nxt == _WHILE and tokens[start].type == _DO:
+            continue                      # do { ... } while (...);
+        spans.append((start, i + 1))
+        start = i + 1
+    if depth != 0 or start != n:
+        return None
+    return spans
+
+
+class _RecordingDict(dict):
+    """
+    Diccionario global de la tabla de símbolos que avisa al tracker de cada
+    lectura y escritura hecha por el visitor.
+    """
+    def __init__(self, name: str, tracker: "_Tracker"):
+        super().__init__()
+        self.name = name
+        self.tracker = tracker
+
+    def get(self, key, default=None):
+        self.tracker.read(self, key)
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        self.tracker.read(self, key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self.tracker.read(self, key)
+        return super().__contains__(key)
+
+    def __setitem__(self, key, value):
+        self.tracker.write(self, key, value)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        # un símbolo global pisado por otro de distinta clase sale de su espacio
+        self.tracker.write(self, key, _DELETED)
+        super().__delitem__(key)
+
+
+_DELETED = object()     # valor de una escritura que borra la clave
+
+
+def _fingerprint(value: Any) -> Optional[str]:
+    # los símbolos son dataclasses: el repr incluye tipos, parámetros y miembros
+    return None if value is None else repr(value)
+
+
+class _Tracker:
+    def __init__(self):
+        self.active = False
+        self.reads: Dict[ReadKey, Optional[str]] = {}
+        self.writes: List[Tuple[str, str, Any]] = []
+        self._written: Set[ReadKey] = set()
+
+    def begin(self) -> None:
+        self.active = True
+        self.reads, self.writes, self._written = {}, [], set()
+
+    def end(self) -> Tuple[Dict[ReadKey, Optional[str]], List[Tuple[str, str, Any]]]:
+        self.active = False
+        return self.reads, self.writes
+
+    def read(self, d: _RecordingDict, key: str) -> None:
+        k = (d.name, key)
+        # solo importa lo que la unidad encontró al empezar, no lo que ella misma definió
+        if self.active and k not in self.reads and k not in self._written:
+            self.reads[k] = _fingerprint(dict.get(d, key))
+
+    def write(self, d: _RecordingDict, key: str, value: Any) -> None:
+        if self.active:
+            self._written.add((d.name, key))
+            self.writes.append((d.name, key, value))
+
+
+class TrackingSymbolTable(SymbolTable):
+    """
+    SymbolTable cuyos diccionarios globales (ámbito global, funciones y clases)
+    registran las consultas y aportes de cada unidad.
+    """
+    # cada unidad tiene que leer por sí misma la cadena de bases que usa: con
+    # la jerarquía cacheada, la dependencia quedaría en la unidad que llenó la
+    # caché (y la re-aplicación escribe clases sin pasar por define_class)
+    cache_hierarchy = False
+    def __init__(self):
+        super().__init__()
+        self.tracker = _Tracker()
+        spaces = {f"globals.{ns}": _RecordingDict(f"globals.{ns}", self.tracker)
+                  for ns in ("vars", "funcs", "classes", "symbols")}
+        self.globals = Scope(*spaces.values())
+        self.scopes = [self.globals]
+        self.classes = _RecordingDict("classes", self.tracker)
+        self.functions = _RecordingDict("functions", self.tracker)
+        self._dicts = {**spaces, "classes": self.classes, "functions": self.functions}
+
+    def still_valid(self, reads: Dict[ReadKey, Optional[str]]) -> bool:
+        return all(_fingerprint(dict.get(self._dicts[d], name)) == fp for (d, name), fp in reads.items())
+
+    def replay(self, writes: List[Tuple[str, str, Any]]) -> None:
+        for d, name, value in writes:
+            if value is _DELETED:
+                dict.pop(self._dicts[d], name, None)
+            else:
+                dict.__setitem__(self._dicts[d], name, value)
+
+
+@dataclass
+class _Unit:
+    key: Tuple[str, int]                 # (texto de la unidad, columna inicial)
+    first_type: int                      # tipo del primer token
+    line: int                            # línea inicial en la versión actual
+    start: int                           # rango [start, end) de caracteres en la versión actual
+    end: int
+    ast: Program
+    ast_line: int                        # línea inicial cuando se bajó `ast`
+    stage: str
+    checked: bool = False
+    reads: Dict[ReadKey, Optional[str]] = field(default_factory=dict)
+    writes: List[Tuple[str, str, Any]] = field(default_factory=list)
+    issues: List[Tuple[int, int, str]] = field(default_factory=list)   # línea relativa a `line`
+
+
+@dataclass
+class UpdateStats:
+    units: int = 0
+    lexed_chars: int = 0  # caracteres re-lexeados
+    parsed: int = 0       # unidades parseadas (nuevas o con texto distinto)
+    checked: int = 0      # unidades visitadas por el análisis semántico
+    reused: int = 0       # unidades cuyo resultado se re-aplicó sin visitarlas
+    fallback: bool = False
+
+
+def _common_prefix(a: str, b: str) -> int:
+    # búsqueda binaria comparando rebanadas: O(n log n), pero en C
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    lo, hi = 0, min(len(a), len(b), limit)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _lex_from(source: str, start: int, stop: Optional[int]) -> Tuple[List[Token], bool]:
+    """
+    Lexea `source` desde `start` (que debe ser un borde de token) hasta el
+    token que empieza exactamente en `stop`, sin incluirlo. Retorna los tokens
+    y si se llegó a `stop`; si un token lo cruza, se sigue hasta EOF.
+    """
+    lexer = CompiscriptLexer(InputStream(source))
+    lexer.inputStream.seek(start)
+    lexer._interp.line = source.count("\n", 0, start) + 1
+    lexer._interp.column = start - (source.rfind("\n", 0, start) + 1)
+    tokens: List[Token] = []
+    while True:
+        tok = lexer.nextToken()
+        if tok.type == Token.EOF:
+            return tokens, False
+        if stop is not None and tok.start == stop:
+            return tokens, True
+        tokens.append(tok)
+
+
+class IncrementalAnalyzer:
+    """
+    Analizador de un archivo que cambia seguido (p. ej. el buffer del IDE).
+    Cada `update(source)` retorna el mismo FileReport que `analyze_source`,
+    pero rehace solo el trabajo de las unidades afectadas por la edición.
+    """
+
+    def __init__(self, strategy: str = STRATEGY_TWO_STAGE):
+        self.strategy = strategy
+        self._source: Optional[str] = None   # versión a la que corresponde `_units`
+        self._units: List[_Unit] = []
+        self.visitor: Optional[AstSemanticVisitor] = None   # el de la última actualización
+        self.stats = UpdateStats()
+
+    def update(self, source: str, path: str = "<source>") -> FileReport:
+        self.stats = UpdateStats()
+        units = self._units_for(source)
+        if units is None:
+            self.stats.fallback = True
+            self.visitor = None
+            return analyze_source(source, path=path, strategy=self.strategy)
+
+        self._source, self._units = source, units
+        self.stats.units = len(units)
+        stage = STAGE_SLL if all(u.stage == STAGE_SLL for u in units) else STAGE_LL
+        issues = self._check(units)
+        return FileReport(path=path, stage=stage, semantic_issues=issues,
+                          symbols=self.visitor.symtab.export_as_lines())
+
+    # ---- léxico: re-lexear solo la zona editada
+    def _units_for(self, source: str) -> Optional[List[_Unit]]:
+        old, units = self._source, self._units
+        prefix: List[_Unit] = []
+        suffix: List[_Unit] = []
+        start, stop = 0, None
+        if old is not None and units:
+            p = _common_prefix(old, source)
+            s = _common_suffix(old, source, min(len(old), len(source)) - p)
+            # la última unidad del prefijo y la primera del sufijo se re-lexean
+            # igual: si cortan o no depende del token vecino (else, catch, while)
+            i = sum(1 for u in units if u.end <= p) - 1
+            prefix = units[:max(i, 0)]
+            start = prefix[-1].end if prefix else 0
+            shift = len(source) - len(old)
+            j = len(prefix)
+            while j < len(units) and units[j].start < len(old) - s:
+                j += 1
+            j += 1
+            # solo sirven desde la primera cuya columna no cambió con la edición
+            while j < len(units):
+                pos = units[j].start + shift
+                if pos - (source.rfind("\n", 0, pos) + 1) == units[j].key[1]:
+                    break
+                j += 1
+            if j < len(units):
+                suffix = units[j:]
+                stop = suffix[0].start + shift
+            pool_units = units[len(prefix):j]
+        else:
+            pool_units = units
+
+        tokens, reached = _lex_from(source, start, stop)
+        spans = split_units(tokens, suffix[0].first_type if reached else Token.EOF)
+        if not reached:
+            suffix = []
+        self.stats.lexed_chars = (stop if reached else len(source)) - start
+        if spans is None:
+            self._source = None
+            return None
+
+        if suffix:
+            shift = len(source) - len(old)
+            lines = source.count("\n", 0, stop) + 1 - suffix[0].line
+            for u in suffix:
+                u.start += shift
+                u.end += shift
+                u.line += lines
+
+        middle, leftovers, failed = self._middle_units(source, tokens, spans, pool_units)
+        if failed:
+            # se guardan todas las que parsearon: al corregir el error se reutilizan
+            self._source, self._units = None, prefix + middle + leftovers + suffix
+            return None
+        return prefix + middle + suffix
+
+    # ---- sintaxis: reutilizar o parsear cada unidad
+    def _middle_units(self, source: str, tokens: List[Token], spans,
+                      old: List[_Unit]) -> Tuple[List[_Unit], List[_Unit], bool]:
+        pool: Dict[Tuple[str, int], List[_Unit]] = {}
+        for u in old:
+            pool.setdefault(u.key, []).append(u)
+
+        units: List[_Unit] = []
+        failed = False
+        for start, end in spans:
+            first, last = tokens[start], tokens[end - 1]
+            key = (source[first.start:last.stop + 1], first.column)
+            candidates = pool.get(key)
+            if candidates:
+                unit = candidates.pop(0)
+                unit.line = first.line
+            else:
+                unit = self._parse_unit(key, tokens[start:end])
+                self.stats.parsed += 1
+                if unit is None:
+                    failed = True
+                    continue
+            unit.start, unit.end = first.start, last.stop + 1
+            units.append(unit)
+
+        leftovers = [u for candidates in pool.values() for u in candidates]
+        return units, leftovers, failed
+
+    def _parse_unit(self, key: Tuple[str, int], tokens: List[Token]) -> Optional[_Unit]:
+        result = parse_tokens(CommonTokenStream(ListTokenSource(tokens)), strategy=self.strategy)
+        if result.issues:
+            return None
+        first, last = tokens[0], tokens[-1]
+        return _Unit(key=key, first_type=first.type, line=first.line, start=first.start, end=last.stop + 1,
+                     ast=lower(result.tree), ast_line=first.line, stage=result.stage)
+
+    # ---- semántica: re-chequear solo lo afectado
+    def _check(self, units: List[_Unit]) -> List[SemanticIssue]:
+        visitor = AstSemanticVisitor()
+        symtab = visitor.symtab = TrackingSymbolTable()
+        out: List[SemanticIssue] = []
+
+        for unit in units:
+            if unit.checked and symtab.still_valid(unit.reads):
+                symtab.replay(unit.writes)
+                self.stats.reused += 1
+            else:
+                symtab.tracker.begin()
+                visitor.visit(unit.ast)
+                unit.reads, unit.writes = symtab.tracker.end()
+                # las posiciones del AST son las de cuando se bajó (ast_line)
+                unit.issues = [(i.line - unit.ast_line, i.column, i.message) for i in visitor.issues]
+                visitor.issues.clear()
+                unit.checked = True
+                self.stats.checked += 1
+            out.extend(SemanticIssue(unit.line + rel, col, msg) for rel, col, msg in unit.issues)
+
+        self.visitor = visitor
+        return out
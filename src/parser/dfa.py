@@ -0,0 +1,370 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from antlr4.PredictionContext import (ArrayPredictionContext, PredictionContext,
+                                      SingletonPredictionContext)
+from antlr4.atn.ATNConfig import ATNConfig, LexerATNConfig
+from antlr4.atn.ATNConfigSet import ATNConfigSet, OrderedATNConfigSet
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.LexerActionExecutor import LexerActionExecutor
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+from antlr4.atn.SemanticContext import AND, OR, PrecedencePredicate, Predicate, SemanticContext
+from antlr4.dfa.DFA import DFA
+from antlr4.dfa.DFAState import DFAState, PredPrediction
+
+from CompiscriptLexer import CompiscriptLexer, serializedATN as _lexer_atn
+from CompiscriptParser import CompiscriptParser, serializedATN as _parser_atn
+
+from .parser import parse_file, STRATEGY_TWO_STAGE
+
+# ========================
+# Caché DFA de predicción de ANTLR
+# ========================
+# El lexer y el parser generados guardan a nivel de clase
+# (`decisionsToDFA`) los DFA que ANTLR arma mientras parsea: la primera vez
+# que una decisión ve cierta entrada hay que simular el ATN; después, la
+# predicción es seguir aristas del DFA. Cada proceso nuevo empieza con esos
+# DFA vacíos y los primeros archivos se parsean bastante más lento.
+#
+#   warm_dfa(paths)          parsea un corpus representativo para llenarlos
+#   save_dfa(path)           los escribe en disco (JSON, escritura atómica)
+#   load_dfa(path)           los reemplaza por los guardados -> bool
+#   dfa_sizes()              estados/configuraciones por recognizer
+#   reset_dfa()              vuelve a DFA vacíos (libera la memoria)
+#   limit_dfa(max_states)    reset_dfa() si se pasaron de `max_states`
+#
+# El archivo lleva un hash de los ATN serializados del lexer y del parser: si
+# se regenera la gramática, `load_dfa` lo ignora. Los objetos se reconstruyen
+# con los constructores del runtime (no con pickle) porque varios hashes que
+# ANTLR cachea dependen de hash() de strings, que cambia entre procesos.
+#
+# No es thread-safe, igual que los DFA compartidos de ANTLR: cargar o
+# resetear solo entre parseos.
+
+DFA_FORMAT = 1
+
+_NO_STATE = -1      # arista sin calcular
+_ERROR_STATE = -2   # arista al estado ERROR del simulador
+_EMPTY_CONTEXT = -1
+
+
+@lru_cache(maxsize=None)
+def grammar_fingerprint() -> str:
+    h = hashlib.sha256(f"cps-dfa-{DFA_FORMAT}".encode())
+    for atn in (_lexer_atn(), _parser_atn()):
+        h.update(",".join(map(str, atn)).encode() + b"\0")
+    return h.hexdigest()
+
+
+# ========================
+# Tamaños, reset y límite
+# ========================
+def dfa_sizes() -> Dict[str, int]:
+    """
+    Estados y configuraciones ATN en los DFA de lexer y parser, y contextos en
+    la caché compartida del parser: lo que crece con cada entrada nueva.
+    """
+    sizes = {}
+    for name, dfas in (("lexer", CompiscriptLexer.decisionsToDFA), ("parser", CompiscriptParser.decisionsToDFA)):
+        states = [s for dfa in dfas for s in dfa.states]
+        sizes[f"{name}_decisions"] = sum(1 for dfa in dfas if dfa.states)
+        sizes[f"{name}_states"] = len(states)
+        sizes[f"{name}_configs"] = sum(len(s.configs) for s in states)
+    sizes["parser_contexts"] = len(CompiscriptParser.sharedContextCache)
+    return sizes
+
+
+def reset_dfa() -> None:
+    """
+    Vacía los DFA de lexer y parser y la caché de contextos. Las listas se
+    reemplazan en el lugar: los parsers ya creados ven los DFA nuevos.
+    """
+    for recognizer in (CompiscriptLexer, CompiscriptParser):
+        atn = recognizer.atn
+        recognizer.decisionsToDFA[:] = [DFA(ds, i) for i, ds in enumerate(atn.decisionToState)]
+    CompiscriptParser.sharedContextCache.cache.clear()
+
+
+def limit_dfa(max_states: int) -> bool:
+    """
+    Para procesos de larga vida (IDE, daemon): si entre lexer y parser hay más
+    de `max_states` estados DFA, los vacía. Retorna si hubo reset.
+    """
+    sizes = dfa_sizes()
+    if sizes["lexer_states"] + sizes["parser_states"] <= max_states:
+        return False
+    reset_dfa()
+    return True
+
+
+def warm_dfa(paths: Iterable[str], strategy: Optional[str] = None) -> int:
+    """
+    Parsea (sin análisis semántico) cada archivo de `paths` para llenar los
+    DFA. Los que no se pueden leer se saltean. Retorna cuántos se parsearon.
+    """
+    parsed = 0
+    for path in paths:
+        try:
+            parse_file(path, strategy=strategy or STRATEGY_TWO_STAGE)
+        except (OSError, UnicodeDecodeError):
+            continue
+        parsed += 1
+    return parsed
+
+
+# ========================
+# Guardar
+# ========================
+class _Writer:
+    """
+    Pasa los DFA de un recognizer a listas JSON. Los contextos de predicción se
+    comparten entre configuraciones: van en una tabla aparte, por índice.
+    """
+
+    def __init__(self, atn, error_state: DFAState):
+        self.atn = atn
+        self.error_state = error_state
+        self.contexts: List[list] = []
+        self._context_ids: Dict[int, int] = {}
+        self._actions = {id(a): i for i, a in enumerate(atn.lexerActions or ())}
+
+    def context(self, ctx: Optional[PredictionContext]) -> Optional[int]:
+        if ctx is None:
+            return None
+        if ctx is PredictionContext.EMPTY:
+            return _EMPTY_CONTEXT
+        # post-orden iterativo: los padres quedan en la tabla antes que los hijos
+        stack = [ctx]
+        while stack:
+            top = stack[-1]
+            if id(top) in self._context_ids:
+                stack.pop()
+                continue
+            parents = top.parents if isinstance(top, ArrayPredictionContext) else [top.parentCtx]
+            pending = [p for p in parents
+                       if p is not None and p is not PredictionContext.EMPTY and id(p) not in self._context_ids]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            if isinstance(top, ArrayPredictionContext):
+                entry = ["a", [self.context(p) for p in top.parents], list(top.returnStates)]
+            else:
+                entry = ["s", self.context(top.parentCtx), top.returnState]
+            self._context_ids[id(top)] = len(self.contexts)
+            self.contexts.append(entry)
+        return self._context_ids[id(ctx)]
+
+    def semantic(self, sem: SemanticContext):
+        if sem is SemanticContext.NONE:
+            return None
+        if isinstance(sem, PrecedencePredicate):
+            return ["prec", sem.precedence]
+        if isinstance(sem, Predicate):
+            return ["pred", sem.ruleIndex, sem.predIndex, sem.isCtxDependent]
+        if isinstance(sem, (AND, OR)):
+            return ["and" if isinstance(sem, AND) else "or", [self.semantic(s) for s in sem.opnds]]
+        raise ValueError(f"contexto semántico no serializable: {sem!r}")
+
+    def executor(self, executor: Optional[LexerActionExecutor]):
+        if executor is None:
+            return None
+        try:
+            return [self._actions[id(a)] for a in executor.lexerActions]
+        except KeyError:
+            raise ValueError("acción de lexer que no está en el ATN (acción dependiente de posición)") from None
+
+    def config(self, c: ATNConfig) -> list:
+        row = [c.state.stateNumber, c.alt, self.context(c.context), self.semantic(c.semanticContext),
+               c.reachesIntoOuterContext, c.precedenceFilterSuppressed]
+        if isinstance(c, LexerATNConfig):
+            row += [self.executor(c.lexerActionExecutor), c.passedThroughNonGreedyDecision]
+        return row
+
+    def config_set(self, configs: ATNConfigSet) -> list:
+        conflicting = sorted(configs.conflictingAlts) if configs.conflictingAlts is not None else None
+        return [isinstance(configs, OrderedATNConfigSet), configs.fullCtx, configs.uniqueAlt, conflicting,
+                configs.hasSemanticContext, configs.dipsIntoOuterContext,
+                [self.config(c) for c in configs.configs]]
+
+    def edge(self, target: Optional[DFAState], index: Dict[int, int]) -> int:
+        if target is None:
+            return _NO_STATE
+        if target is self.error_state:
+            return _ERROR_STATE
+        return index[id(target)]
+
+    def dfa(self, dfa: DFA) -> list:
+        states = sorted(dfa.states, key=lambda s: s.stateNumber)
+        index = {id(s): i for i, s in enumerate(states)}
+        rows = []
+        for s in states:
+            predicates = None
+            if s.predicates is not None:
+                predicates = [[self.semantic(p.pred), p.alt] for p in s.predicates]
+            edges = None if s.edges is None else [self.edge(t, index) for t in s.edges]
+            rows.append([s.stateNumber, self.config_set(s.configs), edges, s.isAcceptState, s.prediction,
+                         self.executor(s.lexerActionExecutor), s.requiresFullContext, predicates])
+        if dfa.precedenceDfa:
+            # s0 es un estado ficticio (fuera de `states`): sus aristas son los s0 por precedencia
+            start = [self.edge(t, index) for t in dfa.s0.edges]
+        else:
+            start = self.edge(dfa.s0, index)
+        return [dfa.decision, start, rows]
+
+
+def _export(recognizer, error_state: DFAState) -> Dict[str, Any]:
+    writer = _Writer(recognizer.atn, error_state)
+    dfas = [writer.dfa(dfa) for dfa in recognizer.decisionsToDFA if dfa.states]
+    return {"dfas": dfas, "contexts": writer.contexts}
+
+
+def save_dfa(path: str) -> Dict[str, int]:
+    """
+    Escribe los DFA actuales de lexer y parser en `path` (atómico: archivo
+    temporal + rename). Retorna `dfa_sizes()` de lo guardado.
+    """
+    data = {
+        "format": DFA_FORMAT,
+        "grammar": grammar_fingerprint(),
+        "lexer": _export(CompiscriptLexer, LexerATNSimulator.ERROR),
+        "parser": _export(CompiscriptParser, ParserATNSimulator.ERROR),
+    }
+    payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return dfa_sizes()
+
+
+# ========================
+# Cargar
+# ========================
+class _Reader:
+    def __init__(self, atn, error_state: DFAState, contexts: List[list]):
+        self.atn = atn
+        self.error_state = error_state
+        self.contexts: List[PredictionContext] = []
+        for entry in contexts:
+            if entry[0] == "a":
+                self.contexts.append(ArrayPredictionContext([self.context(p) for p in entry[1]], list(entry[2])))
+            else:
+                self.contexts.append(SingletonPredictionContext(self.context(entry[1]), entry[2]))
+
+    def context(self, i: Optional[int]) -> Optional[PredictionContext]:
+        if i is None:
+            return None
+        if i == _EMPTY_CONTEXT:
+            return PredictionContext.EMPTY
+        return self.contexts[i]
+
+    def semantic(self, data) -> SemanticContext:
+        if data is None:
+            return SemanticContext.NONE
+        kind = data[0]
+        if kind == "prec":
+            return PrecedencePredicate(data[1])
+        if kind == "pred":
+            return Predicate(data[1], data[2], data[3])
+        sem = (AND if kind == "and" else OR).__new__(AND if kind == "and" else OR)
+        sem.opnds = [self.semantic(s) for s in data[1]]
+        return sem
+
+    def executor(self, data) -> Optional[LexerActionExecutor]:
+        if data is None:
+            return None
+        return LexerActionExecutor([self.atn.lexerActions[i] for i in data])
+
+    def config(self, row: list) -> ATNConfig:
+        lexer = len(row) > 6
+        c = (LexerATNConfig if lexer else ATNConfig).__new__(LexerATNConfig if lexer else ATNConfig)
+        c.state = self.atn.states[row[0]]
+        c.alt = row[1]
+        c.context = self.context(row[2])
+        c.semanticContext = self.semantic(row[3])
+        c.reachesIntoOuterContext = row[4]
+        c.precedenceFilterSuppressed = row[5]
+        if lexer:
+            c.lexerActionExecutor = self.executor(row[6])
+            c.passedThroughNonGreedyDecision = row[7]
+        return c
+
+    def config_set(self, row: list) -> ATNConfigSet:
+        ordered, full_ctx, unique_alt, conflicting, has_semantic, dips, configs = row
+        cs = OrderedATNConfigSet() if ordered else ATNConfigSet(full_ctx)
+        cs.fullCtx = full_ctx
+        cs.configs = [self.config(c) for c in configs]
+        cs.uniqueAlt = unique_alt
+        cs.conflictingAlts = set(conflicting) if conflicting is not None else None
+        cs.hasSemanticContext = has_semantic
+        cs.dipsIntoOuterContext = dips
+        cs.setReadonly(True)      # como quedan al entrar al DFA
+        return cs
+
+    def dfa(self, data: list) -> DFA:
+        decision, start, rows = data
+        dfa = DFA(self.atn.decisionToState[decision], decision)
+        states = []
+        for number, configs, _, accept, prediction, executor, full_ctx, predicates in rows:
+            s = DFAState(number, self.config_set(configs))
+            s.isAcceptState = accept
+            s.prediction = prediction
+            s.lexerActionExecutor = self.executor(executor)
+            s.requiresFullContext = full_ctx
+            if predicates is not None:
+                s.predicates = [PredPrediction(self.semantic(p), alt) for p, alt in predicates]
+            states.append(s)
+        target = lambda i: None if i == _NO_STATE else self.error_state if i == _ERROR_STATE else states[i]
+        for s, row in zip(states, rows):
+            if row[2] is not None:
+                s.edges = [target(i) for i in row[2]]
+            dfa.states[s] = s
+        if dfa.precedenceDfa:
+            dfa.s0.edges = [target(i) for i in start]
+        else:
+            dfa.s0 = target(start)
+        return dfa
+
+
+def _import(recognizer, error_state: DFAState, data: Dict[str, Any]) -> List[DFA]:
+    reader = _Reader(recognizer.atn, error_state, data["contexts"])
+    dfas = [DFA(ds, i) for i, ds in enumerate(recognizer.atn.decisionToState)]
+    for entry in data["dfas"]:
+        dfa = reader.dfa(entry)
+        dfas[dfa.decision] = dfa
+    return dfas
+
+
+def load_dfa(path: str) -> bool:
+    """
+    Reemplaza los DFA de lexer y parser por los guardados en `path`. Si el
+    archivo no existe, está corrupto o es de otra gramática, no toca nada y
+    retorna False.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+        if data.get("format") != DFA_FORMAT or data.get("grammar") != grammar_fingerprint():
+            return False
+        lexer = _import(CompiscriptLexer, LexerATNSimulator.ERROR, data["lexer"])
+        parser = _import(CompiscriptParser, ParserATNSimulator.ERROR, data["parser"])
+    except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return False
+    CompiscriptLexer.decisionsToDFA[:] = lexer
+    CompiscriptParser.decisionsToDFA[:] = parser
+    CompiscriptParser.sharedContextCache.cache.clear()
+    return True
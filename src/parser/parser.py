@@ -1,13 +1,20 @@
 from __future__ import annotations
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from antlr4 import FileStream, CommonTokenStream, ParserRuleContext, Token
+from antlr4 import CommonTokenStream, ParserRuleContext, Token
+from antlr4.atn.PredictionMode import PredictionMode
 from antlr4.error.ErrorListener import ErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
 
 from CompiscriptLexer import CompiscriptLexer
 from CompiscriptParser import CompiscriptParser
 
+from .stream import CompactInputStream
+from .tokens import CompactTokenStream
+
 
 @dataclass
 class SyntaxIssue:
@@ -16,42 +23,229 @@ class SyntaxIssue:
     message: str
 
 
+class ErrorBudgetExceeded(ParseCancellationException):
+    """
+    Se agotó el presupuesto de errores (`max_errors` del parseo o del lexer, o
+    el sink se llenó): el parseo se abandona sin árbol.
+    """
+
+
 class CollectingErrorListener(ErrorListener):
-    def __init__(self) -> None:
+    """
+    Junta los errores de sintaxis y, si hay `sink` (ver src/sink/sink.py), se
+    los pasa a medida que aparecen. Al llegar a `max_errors` (o al llenarse
+    el sink) cancela el parseo con ErrorBudgetExceeded.
+    """
+
+    def __init__(self, sink=None, max_errors: Optional[int] = None) -> None:
         super().__init__()
         self.issues: List[SyntaxIssue] = []
+        self.sink = sink
+        self.max_errors = max_errors
 
     def syntaxError(self, recognizer, offendingSymbol: Optional[Token], line, column, msg, e):
-        self.issues.append(SyntaxIssue(line=line, column=column, message=str(msg)))
+        issue = SyntaxIssue(line=line, column=column, message=str(msg))
+        self.issues.append(issue)
+        sink = self.sink
+        if sink is not None:
+            sink.emit("syntax", issue)
+            if sink.full:
+                raise ErrorBudgetExceeded(f"se alcanzó el máximo de {sink.max_errors} errores")
+        if self.max_errors is not None and len(self.issues) >= self.max_errors:
+            raise ErrorBudgetExceeded(f"se alcanzó el máximo de {self.max_errors} errores")
+
+
+class LexerErrorBudget(ErrorListener):
+    """
+    Cuenta los errores del lexer (siguen saliendo por la consola de ANTLR y no
+    entran en `issues`) y abandona el parseo al llegar a `max_errors`: un
+    archivo basura no se lexea entero carácter por carácter.
+    """
+
+    def __init__(self, max_errors: int) -> None:
+        super().__init__()
+        self.max_errors = max_errors
+        self.count = 0
+        self.where = (0, 0)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.count >= self.max_errors
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.count += 1
+        if self.count >= self.max_errors:
+            self.where = (line, column)
+            raise ErrorBudgetExceeded(f"se alcanzó el máximo de {self.max_errors} errores léxicos")
+
+
+# Estrategias de parseo
+STRATEGY_TWO_STAGE = "two-stage"   # SLL + bail; si falla, re-parseo LL completo
+STRATEGY_LL = "ll"                 # siempre LL completo con recuperación de errores
+STRATEGIES = (STRATEGY_TWO_STAGE, STRATEGY_LL)
+
+# Desde este tamaño (en caracteres) los tokens van a un CompactTokenStream:
+# ocupan varias veces menos, pero el parser y el análisis leen sus campos a
+# través de vistas, un ~10% más lento. En archivos chicos no vale la pena.
+COMPACT_TOKENS_MIN_CHARS = 1 << 20
+
+# Etapa en la que terminó el parseo
+STAGE_SLL = "SLL"
+STAGE_LL = "LL"
 
 
 @dataclass
 class ParseResult:
-    tree: ParserRuleContext
+    tree: Optional[ParserRuleContext]     # None solo si el parseo se cortó (truncated)
     parser: CompiscriptParser
     issues: List[SyntaxIssue]
+    stage: str = STAGE_LL
+    truncated: bool = False       # el parseo se cortó por `max_errors` del sink
 
 
-def parse_file(path: str) -> ParseResult:
+def parse_file(path: str, strategy: str = STRATEGY_TWO_STAGE, stats=None, sink=None,
+               max_errors: Optional[int] = None) -> ParseResult:
     """
     Parsea un archivo .cps y retorna el árbol, el parser y los errores sintácticos (si hay).
+
+    Con `strategy="two-stage"` primero se intenta un parseo SLL que aborta en el
+    primer error; solo si falla se re-parsea en modo LL completo con el listener
+    que recolecta errores. `ParseResult.stage` indica en qué etapa terminó.
+
+    Con `stats` (un `stats.AnalysisStats`) se registran los tiempos de lexer y
+    parser por separado, la cantidad de tokens y los nodos por tipo.
+
+    Con `sink` (ver src/sink/sink.py) cada error de sintaxis se emite apenas
+    aparece. Con `max_errors` (o un sink con límite) el parseo se corta al
+    llegar a esa cantidad de errores (`ParseResult.truncated`, sin árbol): un
+    archivo basura no se recorre entero con recuperación de errores.
+
+    El archivo se lee a un char stream compacto (ver src/parser/stream.py):
+    un .cps ASCII queda en memoria como sus bytes, sin decodificar. Desde
+    `COMPACT_TOKENS_MIN_CHARS` caracteres los tokens quedan en arrays paralelos
+    (ver src/parser/tokens.py) en vez de un objeto por token.
+    """
+    return parse_stream(CompactInputStream.from_file(path), strategy=strategy, stats=stats, sink=sink,
+                        max_errors=max_errors)
+
+
+def parse_source(source: Union[str, bytes, bytearray, memoryview], path: Optional[str] = None,
+                 strategy: str = STRATEGY_TWO_STAGE, stats=None, sink=None,
+                 max_errors: Optional[int] = None) -> ParseResult:
+    """
+    Igual que `parse_file`, pero sobre código en memoria (buffer del IDE,
+    pedido del daemon, tests): sin pasar por un archivo temporal.
+
+    `source` es texto, o bytes UTF-8 (bytes, bytearray o memoryview) que se
+    decodifican con el mismo criterio estricto que `parse_file`
+    (UnicodeDecodeError si no es UTF-8 válido); bytes ASCII se usan tal cual.
+    `path` es solo metadato: queda como nombre del stream para los diagnósticos.
+    """
+    name = path if path is not None else "<empty>"
+    if isinstance(source, str):
+        stream = CompactInputStream.from_text(source, name)
+    else:
+        stream = CompactInputStream.from_bytes(source, name)
+    return parse_stream(stream, strategy=strategy, stats=stats, sink=sink, max_errors=max_errors)
+
+
+def parse_stream(stream, strategy: str = STRATEGY_TWO_STAGE, stats=None, sink=None,
+                 max_errors: Optional[int] = None) -> ParseResult:
     """
+    Igual que `parse_file`, pero a partir de un char stream de ANTLR ya construido
+    (para código en memoria, `parse_source`).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estrategia de parseo desconocida: {strategy}")
+
     # 1) stream -> lexer -> tokens
-    stream = FileStream(path, encoding="utf-8")
     lexer = CompiscriptLexer(stream)
-    tokens = CommonTokenStream(lexer)
+    budget = None
+    if max_errors is not None:
+        budget = LexerErrorBudget(max_errors)
+        lexer.addErrorListener(budget)
+    if stream.size >= COMPACT_TOKENS_MIN_CHARS:
+        tokens = CompactTokenStream(lexer)
+    else:
+        tokens = CommonTokenStream(lexer)
+    if stats is not None:
+        # sin fill() el lexer corre a demanda dentro del parser y su tiempo se mezcla
+        with stats.phase("lex"):
+            try:
+                tokens.fill()
+            except ErrorBudgetExceeded:
+                pass          # el parser vuelve a toparse con el lexer agotado y corta
+        stats.tokens = len(tokens.tokens)
+    result = parse_tokens(tokens, strategy=strategy, stats=stats, sink=sink, max_errors=max_errors)
+    if budget is not None and budget.exhausted:
+        line, column = budget.where
+        issue = SyntaxIssue(line=line, column=column,
+                            message=f"se alcanzó el máximo de {max_errors} errores léxicos: se abandona el archivo")
+        result.issues.append(issue)
+        if sink is not None:
+            sink.emit("syntax", issue)
+    return result
+
+
+def parse_tokens(tokens: CommonTokenStream, strategy: str = STRATEGY_TWO_STAGE, stats=None,
+                 sink=None, max_errors: Optional[int] = None) -> ParseResult:
+    """
+    Igual que `parse_stream`, pero sobre un token stream (p. ej. sobre un
+    `ListTokenSource` con parte de los tokens de un archivo ya lexeado).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estrategia de parseo desconocida: {strategy}")
+    result = _parse_tokens(tokens, strategy, stats.phase if stats is not None else _no_phase, sink, max_errors)
+    if stats is not None:
+        stats.stage = result.stage
+        stats.count_tree(result.tree)
+    return result
+
 
-    # 2) parser + listener de errores
+def _no_phase(name: str):
+    return nullcontext()
+
+
+def _parse_tokens(tokens: CommonTokenStream, strategy: str, phase, sink=None,
+                  max_errors: Optional[int] = None) -> ParseResult:
     parser = CompiscriptParser(tokens)
-    listener = CollectingErrorListener()
+
+    # 2) etapa rápida: SLL + bail (sin listeners: el error solo dispara el fallback)
+    if strategy == STRATEGY_TWO_STAGE:
+        parser.removeErrorListeners()
+        parser._errHandler = BailErrorStrategy()
+        parser._interp.predictionMode = PredictionMode.SLL
+        try:
+            with phase("parse_sll"):
+                tree = parser.program()
+            return ParseResult(tree=tree, parser=parser, issues=[], stage=STAGE_SLL)
+        except ErrorBudgetExceeded:
+            # el lexer agotó su presupuesto: no tiene sentido re-parsear en LL
+            return ParseResult(tree=None, parser=parser, issues=[], stage=STAGE_SLL, truncated=True)
+        except ParseCancellationException:
+            # los tokens ya están en el buffer: se rebobina sin volver a lexear
+            tokens.seek(0)
+            parser.reset()
+            parser._errHandler = DefaultErrorStrategy()
+            parser._interp.predictionMode = PredictionMode.LL
+
+    # 3) etapa LL completa + listener de errores
+    listener = CollectingErrorListener(sink, max_errors)
     parser.removeErrorListeners()
     parser.addErrorListener(listener)
 
-    # 3) regla inicial (ajusta si tu gramática usa otro nombre)
+    # regla inicial (ajusta si tu gramática usa otro nombre)
     #   Suele ser 'program' en este proyecto.
-    tree = parser.program()
-
-    return ParseResult(tree=tree, parser=parser, issues=listener.issues)
+    with phase("parse_ll"):
+        try:
+            tree = parser.program()
+        except ErrorBudgetExceeded:
+            # se agotó el presupuesto de errores; los finally de las reglas ya desarmaron
+            # la pila de contextos, así que no queda árbol que devolver
+            return ParseResult(tree=None, parser=parser, issues=listener.issues, stage=STAGE_LL,
+                               truncated=True)
+
+    return ParseResult(tree=tree, parser=parser, issues=listener.issues, stage=STAGE_LL)
 
 
 def tree_as_lisp(result: ParseResult) -> str:
@@ -0,0 +1,116 @@
+from __future__ import annotations
+import sys
+from array import array
+from typing import Tuple, Union
+
+from antlr4 import InputStream
+
+# ========================
+# Char stream compacto
+# ========================
+# `InputStream` de ANTLR guarda el texto dos veces: el str original y una
+# lista con un int por carácter (8 bytes de puntero cada uno, más el objeto
+# int para los que no son de 0..255). Para un archivo de varios MB eso es
+# ~10 veces su tamaño, que además queda vivo mientras viva un token.
+#
+# `CompactInputStream` guarda solo los code points, en el buffer más chico
+# que los contiene (como los str de Python):
+#
+#   ASCII / Latin-1    bytes        1 byte por carácter (un .cps ASCII leído
+#                                   de disco se usa tal cual, sin decodificar)
+#   BMP                array('H')   2 bytes
+#   resto              array('I')   4 bytes
+#
+# `LA` indexa el buffer igual que antes la lista (hereda la lógica de
+# InputStream): indexar bytes o array cuesta unos ns más por carácter que la
+# lista, contra ~1 µs que el lexer gasta en cada uno. `getText` decodifica
+# solo el tramo pedido.
+
+_UTF16 = "utf-16-le" if sys.byteorder == "little" else "utf-16-be"
+_UTF32 = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+_WIDE = "I" if array("I").itemsize == 4 else "L"
+_CHUNK = 1 << 16
+
+CodePoints = Union[bytes, array]
+
+
+def _compact(text: str) -> Tuple[CodePoints, str]:
+    """
+    Buffer de code points de `text` y el codec que decodifica un tramo de él.
+    """
+    if text.isascii():
+        return text.encode("ascii"), "latin-1"
+    try:
+        return text.encode("latin-1"), "latin-1"
+    except UnicodeEncodeError:
+        pass
+    if max(text) <= "\uffff":
+        return _encoded_array(text, "H", _UTF16), _UTF16
+    return _encoded_array(text, _WIDE, _UTF32), _UTF32
+
+
+def _encoded_array(text: str, typecode: str, codec: str) -> array:
+    # por tramos: encodear todo de una vez sumaría al pico otra copia del texto
+    buf = array(typecode)
+    for i in range(0, len(text), _CHUNK):
+        # surrogatepass: un str puede traer surrogates sueltos (no desde UTF-8 válido)
+        buf.frombytes(text[i:i + _CHUNK].encode(codec, "surrogatepass"))
+    return buf
+
+
+class CompactInputStream(InputStream):
+    """
+    Char stream para `CompiscriptLexer` con los code points en bytes o en un
+    array (ver arriba). Se construye con `from_text`,
+    `from_bytes` o `from_file`.
+    """
+    __slots__ = ("_codec",)
+
+    def __init__(self, data: CodePoints, codec: str, name: str = "<empty>"):
+        # no se llama a InputStream.__init__: armaría la lista de ints
+        self.name = name
+        self.strdata = None
+        self.data = data
+        self._codec = codec
+        self._index = 0
+        self._size = len(data)
+
+    @classmethod
+    def from_text(cls, text: str, name: str = "<empty>") -> "CompactInputStream":
+        data, codec = _compact(text)
+        return cls(data, codec, name)
+
+    @classmethod
+    def from_bytes(cls, raw: Union[bytes, bytearray, memoryview], name: str = "<empty>") -> "CompactInputStream":
+        """
+        `raw` en UTF-8 (decode estricto, como FileStream: UnicodeDecodeError si
+        no es válido). Si es ASCII los bytes ya son los code points: no se copia.
+        """
+        if not isinstance(raw, bytes):
+            raw = bytes(raw)
+        if raw.isascii():
+            return cls(raw, "latin-1", name)
+        return cls.from_text(str(raw, "utf-8"), name)
+
+    @classmethod
+    def from_file(cls, path: str) -> "CompactInputStream":
+        with open(path, "rb") as f:
+            raw = f.read()
+        if raw.isascii():
+            return cls(raw, "latin-1", path)
+        text = str(raw, "utf-8")
+        del raw                 # única referencia: se libera antes de compactar el texto
+        return cls.from_text(text, path)
+
+    def getText(self, start: int, stop: int) -> str:
+        if stop >= self._size:
+            stop = self._size - 1
+        if start >= self._size:
+            return ""
+        chunk = self.data[start:stop + 1]
+        if isinstance(chunk, array):
+            chunk = chunk.tobytes()
+        return chunk.decode(self._codec, "surrogatepass")
+
+    def __str__(self) -> str:
+        return self.getText(0, self._size - 1)
@@ -0,0 +1,308 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, Iterator, Optional, Tuple
+
+from antlr4 import CommonTokenStream, Token
+from antlr4.CommonTokenFactory import TokenFactory
+
+# ========================
+# Buffer de tokens compacto
+# ========================
+# `CommonTokenStream` guarda un `CommonToken` por token: un objeto con 9
+# slots (~100 bytes con el encabezado del GC) más el puntero de la lista. En
+# un archivo grande los tokens son lo que más ocupa antes de armar el árbol.
+#
+# `TokenBuffer` guarda los mismos campos en arrays paralelos (~20 bytes por
+# token) y `CompactTokenStream` lo llena pidiéndole al lexer que emita a los
+# arrays en vez de construir objetos. El parser ve `TokenView`s: subclases
+# de `Token` que solo usan dos slots (buffer e índice), se crean al pedir un
+# token (LT, get) y leen los campos de los arrays. Lo que el árbol no
+# referencia no se crea nunca: `LA`, que es lo que más consulta la
+# predicción, lee el array de tipos directamente.
+#
+# Leer un campo de una vista es una property en vez de un slot: parsear y
+# recorrer el árbol es ~10% más lento. Por eso parse_stream lo usa solo
+# desde COMPACT_TOKENS_MIN_CHARS (ver src/parser/parser.py).
+#
+# Los WS y comentarios son `-> skip` en la gramática: el lexer los recorre
+# pero no emite nada, así que no ocupan lugar en el buffer.
+
+SourcePair = Tuple[object, object]     # (lexer, char stream), como Token.source
+
+
+class TokenView(Token):
+    """
+    Token `index` de un `TokenBuffer`, de solo lectura. Tiene los atributos de
+    `CommonToken` que usan el runtime y el análisis (type, channel, start,
+    stop, tokenIndex, line, column, text); dos vistas del mismo token son iguales.
+
+    Es un `Token` porque el runtime distingue tokens con isinstance (p. ej.
+    Trees.getNodeText, BufferedTokenStream.getText). Hereda los slots de
+    `Token`, pero solo usa `tokenIndex`: los demás campos son properties que
+    tapan los slots y leen el buffer. No llama a `Token.__init__`, que los
+    asignaría.
+    """
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buffer: "TokenBuffer", index: int):
+        self._buffer = buffer
+        self.tokenIndex = index
+
+    @property
+    def type(self) -> int:
+        return self._buffer.types[self.tokenIndex]
+
+    @property
+    def channel(self) -> int:
+        return self._buffer.channels[self.tokenIndex]
+
+    @property
+    def start(self) -> int:
+        return self._buffer.starts[self.tokenIndex]
+
+    @property
+    def stop(self) -> int:
+        return self._buffer.stops[self.tokenIndex]
+
+    @property
+    def line(self) -> int:
+        return self._buffer.lines[self.tokenIndex]
+
+    @property
+    def column(self) -> int:
+        return self._buffer.columns[self.tokenIndex]
+
+    @property
+    def source(self) -> SourcePair:
+        return self._buffer.source
+
+    @property
+    def text(self) -> Optional[str]:
+        # como CommonToken.text: el texto se saca del char stream al pedirlo
+        buffer, index = self._buffer, self.tokenIndex
+        text = buffer.texts.get(index)
+        if text is not None:
+            return text
+        stream = buffer.source[1]
+        if stream is None:
+            return None
+        start, stop = buffer.starts[index], buffer.stops[index]
+        if start < stream.size and stop < stream.size:
+            return stream.getText(start, stop)
+        return "<EOF>"
+
+    def getTokenSource(self):
+        return self._buffer.source[0]
+
+    def getInputStream(self):
+        return self._buffer.source[1]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TokenView):
+            return NotImplemented
+        return self._buffer is other._buffer and self.tokenIndex == other.tokenIndex
+
+    def __hash__(self) -> int:
+        return hash((id(self._buffer), self.tokenIndex))
+
+    def __str__(self) -> str:
+        # mismo formato que CommonToken
+        text = self.text
+        if text is None:
+            text = "<no text>"
+        else:
+            text = text.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+        channel = f",channel={self.channel}" if self.channel > 0 else ""
+        return (f"[@{self.tokenIndex},{self.start}:{self.stop}='{text}',<{self.type}>{channel},"
+                f"{self.line}:{self.column}]")
+
+    __repr__ = __str__
+
+
+class TokenBuffer:
+    """
+    Tokens de un lexer en arrays paralelos. Se indexa como la lista de
+    `BufferedTokenStream.tokens` (`len`, `buffer[i]`, iteración) y devuelve
+    `TokenView`s nuevas en cada acceso.
+    """
+    __slots__ = ("source", "types", "channels", "starts", "stops", "lines", "columns", "texts")
+
+    def __init__(self, source: SourcePair):
+        self.source = source
+        self.types = array("h")
+        self.channels = array("h")
+        self.starts = array("i")
+        self.stops = array("i")
+        self.lines = array("i")
+        self.columns = array("i")
+        # texto fijado por una acción del lexer (`setText`); la gramática no
+        # tiene ninguna, así que casi siempre queda vacío
+        self.texts: Dict[int, str] = {}
+
+    def append(self, type: int, text: Optional[str], channel: int, start: int, stop: int,
+               line: int, column: int) -> int:
+        index = len(self.types)
+        self.types.append(type)
+        self.channels.append(channel)
+        self.starts.append(start)
+        self.stops.append(stop)
+        self.lines.append(line)
+        self.columns.append(column)
+        if text is not None:
+            self.texts[index] = text
+        return index
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TokenView(self, i) for i in range(*index.indices(len(self.types)))]
+        if index < 0:
+            index += len(self.types)
+        if not 0 <= index < len(self.types):
+            raise IndexError("token index out of range")
+        return TokenView(self, index)
+
+    def __iter__(self) -> Iterator[TokenView]:
+        for i in range(len(self.types)):
+            yield TokenView(self, i)
+
+    def memory_bytes(self) -> int:
+        """
+        Bytes que ocupan los arrays (sin contar las vistas ni `texts`).
+        """
+        return sum(a.buffer_info()[1] * a.itemsize
+                   for a in (self.types, self.channels, self.starts, self.stops, self.lines, self.columns))
+
+
+class _BufferFactory(TokenFactory):
+    # se instala en el lexer solo mientras CompactTokenStream.fetch lexea: el
+    # token que "crea" es su índice en el buffer. El parser sigue viendo la
+    # factory original del lexer (la usa para los tokens que inventa al
+    # recuperarse de un error).
+    __slots__ = ("buffer",)
+
+    def __init__(self, buffer: TokenBuffer):
+        self.buffer = buffer
+
+    def create(self, source, type: int, text: str, channel: int, start: int, stop: int, line: int, column: int):
+        return self.buffer.append(type, text, channel, start, stop, line, column)
+
+
+class CompactTokenStream(CommonTokenStream):
+    """
+    `CommonTokenStream` que guarda los tokens en un `TokenBuffer`: mismo
+    protocolo para el parser (LT, LA, consume, seek, fill), con `LA` y el
+    salteo de canales leyendo los arrays.
+    """
+    __slots__ = ("_factory", "_last", "_previous")
+
+    def __init__(self, lexer, channel: int = Token.DEFAULT_CHANNEL):
+        super().__init__(lexer, channel)
+        self.setTokenSource(lexer)
+
+    def setTokenSource(self, tokenSource):
+        super().setTokenSource(tokenSource)
+        self.tokens = TokenBuffer(tokenSource._tokenFactorySourcePair)
+        self._factory = _BufferFactory(self.tokens)
+        # últimas dos vistas entregadas: el parser pide el token actual varias
+        # veces (start de cada regla que empieza en él, match, consume) y el
+        # anterior al cerrar la regla (stop); sin esto el árbol guardaría una
+        # vista distinta por cada pedido
+        self._last = self._previous = TokenView(self.tokens, -1)
+
+    def _view(self, i: int) -> TokenView:
+        last = self._last
+        if last.tokenIndex == i:
+            return last
+        if self._previous.tokenIndex == i:
+            return self._previous
+        view = self._last = TokenView(self.tokens, i)
+        self._previous = last
+        return view
+
+    def fetch(self, n: int) -> int:
+        if self.fetchedEOF:
+            return 0
+        lexer = self.tokenSource
+        types = self.tokens.types
+        saved, lexer._factory = lexer._factory, self._factory
+        try:
+            for i in range(n):
+                lexer.nextToken()
+                if types[-1] == Token.EOF:
+                    self.fetchedEOF = True
+                    return i + 1
+        finally:
+            lexer._factory = saved
+        return n
+
+    # Los métodos de abajo repiten la lógica de BufferedTokenStream y
+    # CommonTokenStream leyendo los arrays: las versiones heredadas pasan por
+    # `len(self.tokens)` y `self.tokens[i].channel`, que acá crearían vistas.
+
+    def sync(self, i: int) -> bool:
+        n = i - len(self.tokens.types) + 1
+        return n <= 0 or self.fetch(n) >= n
+
+    def consume(self):
+        index = self.index
+        if index < 0 or self.tokens.types[index] == Token.EOF:
+            super().consume()             # inicializa el stream o levanta "cannot consume EOF"
+            return
+        if self.sync(index + 1):
+            self.index = self.nextTokenOnChannel(index + 1, self.channel)
+
+    def LA(self, i: int) -> int:
+        index = self.index
+        if i == 1 and index >= 0:
+            # el caso caliente: tokens[index] ya está sincronizado y en el canal
+            return self.tokens.types[index]
+        return self.LT(i).type
+
+    def LT(self, k: int):
+        i = self.index
+        if k == 1 and i >= 0:
+            last = self._last
+            return last if last.tokenIndex == i else self._view(i)
+        self.lazyInit()
+        if k == 0:
+            return None
+        if k < 0:
+            return self.LB(-k)
+        i = self.index
+        for _ in range(k - 1):
+            if self.sync(i + 1):
+                i = self.nextTokenOnChannel(i + 1, self.channel)
+        return self._view(i)
+
+    def LB(self, k: int):
+        if k == 0 or self.index - k < 0:
+            return None
+        i = self.index
+        if k == 1 and self.tokens.channels[i - 1] == self.channel:
+            return self._view(i - 1)       # LT(-1): stop de la regla que se cierra
+        for _ in range(k):
+            i = self.previousTokenOnChannel(i - 1, self.channel)
+        if i < 0:
+            return None
+        return self._view(i)
+
+    def nextTokenOnChannel(self, i: int, channel: int) -> int:
+        self.sync(i)
+        types, channels = self.tokens.types, self.tokens.channels
+        if i >= len(types):
+            return len(types) - 1
+        while channels[i] != channel:
+            if types[i] == Token.EOF:
+                return i
+            i += 1
+            self.sync(i)
+        return i
+
+    def previousTokenOnChannel(self, i: int, channel: int) -> int:
+        channels = self.tokens.channels
+        while i >= 0 and channels[i] != channel:
+            i -= 1
+        return i
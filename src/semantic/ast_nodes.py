@@ -0,0 +1,188 @@
+from __future__ import annotations
+from enum import Enum
+from typing import Tuple
+
+# ========================
+# AST compacto de Compiscript
+# ========================
+# Lo produce `lowering.lower` a partir del árbol de ANTLR. Cada nodo usa
+# __slots__ (sin __dict__), guarda identificadores como str, operadores como
+# enums y su posición de origen; no referencia tokens, parser ni streams.
+#
+# La posición (line, column) es la del `start` del contexto de ANTLR del que
+# viene el nodo, así los diagnósticos coinciden con los del visitor sobre el
+# parse tree. En los sufijos (Call, Index, Member) es la del '(', '[' o '.'.
+
+class BinOp(Enum):
+    OR = "||"
+    AND = "&&"
+    EQ = "=="
+    NE = "!="
+    LT = "<"
+    LE = "<="
+    GT = ">"
+    GE = ">="
+    ADD = "+"
+    SUB = "-"
+    MUL = "*"
+    DIV = "/"
+    MOD = "%"
+
+class UnaryOp(Enum):
+    NEG = "-"
+    NOT = "!"
+
+class LiteralKind(Enum):
+    INTEGER = "integer"
+    STRING = "string"
+    NULL = "null"
+    TRUE = "true"
+    FALSE = "false"
+
+LOGICAL_OPS = frozenset((BinOp.OR, BinOp.AND))
+EQUALITY_OPS = frozenset((BinOp.EQ, BinOp.NE))
+RELATIONAL_OPS = frozenset((BinOp.LT, BinOp.LE, BinOp.GT, BinOp.GE))
+ADDITIVE_OPS = frozenset((BinOp.ADD, BinOp.SUB))
+MULTIPLICATIVE_OPS = frozenset((BinOp.MUL, BinOp.DIV, BinOp.MOD))
+
+NO_SPAN = (-1, -1, -1, -1)
+
+
+class Node:
+    __slots__ = ("line", "column", "end_line", "end_column")
+    _fields: Tuple[str, ...] = ()
+
+    def __init__(self, *values, span=NO_SPAN):
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+        self.line, self.column, self.end_line, self.end_column = span
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._fields)
+        return f"{type(self).__name__}({args})"
+
+class Stmt(Node):
+    __slots__ = ()
+
+class Expr(Node):
+    __slots__ = ()
+
+# ------- tipos -------
+class TypeRef(Node):
+    # baseType ('[' ']')*  ->  base="integer", dims=2
+    __slots__ = _fields = ("base", "dims")
+
+# ------- programa / sentencias -------
+class Program(Node):
+    __slots__ = _fields = ("statements",)
+
+class Block(Stmt):
+    __slots__ = _fields = ("statements",)
+
+class VarDecl(Stmt):
+    # let/var (is_const=False) y const (is_const=True)
+    __slots__ = _fields = ("name", "type", "init", "is_const")
+
+class AssignStmt(Stmt):
+    # Identifier '=' expression ';'
+    __slots__ = _fields = ("name", "value")
+
+class PropertyAssignStmt(Stmt):
+    # expression '.' Identifier '=' expression ';'
+    __slots__ = _fields = ("target", "name", "value")
+
+class ExprStmt(Stmt):
+    __slots__ = _fields = ("expr",)
+
+class Print(Stmt):
+    __slots__ = _fields = ("expr",)
+
+class If(Stmt):
+    __slots__ = _fields = ("cond", "then", "else_")
+
+class While(Stmt):
+    __slots__ = _fields = ("cond", "body")
+
+class DoWhile(Stmt):
+    __slots__ = _fields = ("body", "cond")
+
+class For(Stmt):
+    # init: VarDecl | AssignStmt | PropertyAssignStmt | None
+    __slots__ = _fields = ("init", "cond", "update", "body")
+
+class Foreach(Stmt):
+    __slots__ = _fields = ("name", "iterable", "body")
+
+class Break(Stmt):
+    __slots__ = ()
+
+class Continue(Stmt):
+    __slots__ = ()
+
+class Return(Stmt):
+    __slots__ = _fields = ("value",)
+
+class TryCatch(Stmt):
+    __slots__ = _fields = ("body", "name", "handler")
+
+class SwitchCase(Node):
+    __slots__ = _fields = ("value", "statements")
+
+class Switch(Stmt):
+    # default: lista de sentencias o None si no hay 'default'
+    __slots__ = _fields = ("subject", "cases", "default")
+
+class Param(Node):
+    __slots__ = _fields = ("name", "type")
+
+class FuncDecl(Stmt):
+    __slots__ = _fields = ("name", "params", "return_type", "body")
+
+class ClassDecl(Stmt):
+    # members: FuncDecl | VarDecl
+    __slots__ = _fields = ("name", "base", "members")
+
+# ------- expresiones -------
+class Assign(Expr):
+    # leftHandSide '=' assignmentExpr
+    __slots__ = _fields = ("target", "value")
+
+class PropertyAssign(Expr):
+    # leftHandSide '.' Identifier '=' assignmentExpr
+    __slots__ = _fields = ("target", "name", "value")
+
+class Ternary(Expr):
+    __slots__ = _fields = ("cond", "then", "else_")
+
+class Binary(Expr):
+    __slots__ = _fields = ("op", "left", "right")
+
+class Unary(Expr):
+    __slots__ = _fields = ("op", "operand")
+
+class Literal(Expr):
+    # kind None: literal irreconocible (árbol recuperado de un error)
+    __slots__ = _fields = ("kind", "text")
+
+class ArrayLiteral(Expr):
+    __slots__ = _fields = ("elements",)
+
+class Name(Expr):
+    __slots__ = _fields = ("name",)
+
+class New(Expr):
+    __slots__ = _fields = ("class_name", "args")
+
+class This(Expr):
+    __slots__ = ()
+
+class Call(Expr):
+    __slots__ = _fields = ("target", "args")
+
+class Index(Expr):
+    __slots__ = _fields = ("target", "index")
+
+class Member(Expr):
+    __slots__ = _fields = ("target", "name")
+
+SUFFIX_NODES = (Call, Index, Member)
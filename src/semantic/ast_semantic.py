@@ -0,0 +1,596 @@
+from __future__ import annotations
+from typing import Any, List, Optional, Tuple
+
+from .ast_nodes import (
+    LiteralKind, SUFFIX_NODES,
+    Binary, Unary, FuncDecl, VarDecl, Name, This, Call, Index, Member,
+)
+from .semantic import (
+    SemanticVisitor, SemanticIssue, TypeKind, _IssueLimitReached, ClassMember, ClassSymbol,
+    FunctionSymbol, VariableSymbol, array_of, elem_type_of, is_object, object_type, same_type,
+)
+
+# ========================
+# Visitor semántico sobre el AST compacto
+# ========================
+# Mismas reglas y mensajes que `SemanticVisitor` (hereda tabla de símbolos,
+# asignabilidad, resolución de miembros, chequeo de argumentos), pero recorre
+# los nodos de `ast_nodes` en lugar de los contextos de ANTLR: sin getText(),
+# sin hasattr y sin atributos pegados a los nodos (el receptor y el callee se
+# pasan explícitamente por la cadena de sufijos).
+
+class AstSemanticVisitor(SemanticVisitor):
+    def __init__(self, sink=None, max_errors: Optional[int] = None, suppress_cascades: bool = False):
+        super().__init__(collapse_passthroughs=False, sink=sink, max_errors=max_errors,
+                         suppress_cascades=suppress_cascades)
+
+    @classmethod
+    def _handler_for(cls, node_type: type, collapse: bool):
+        fn = getattr(cls, f"visit{node_type.__name__}", None)
+        if fn is None:
+            raise TypeError(f"Nodo AST sin visit*: {node_type.__name__}")
+        cls._dispatch_tables[collapse][node_type] = fn
+        return fn
+
+    # ---- utilidades
+    def error(self, node, msg: str, *operands):
+        if operands and self.suppress_cascades and self._is_cascade(operands):
+            return
+        self._emit(SemanticIssue(node.line, node.column, msg))
+
+    def type_from_ref(self, ref) -> Any:
+        if ref is None:
+            return TypeKind.ERROR
+        bl = ref.base.lower()
+        if bl == 'integer': cur: Any = TypeKind.INTEGER
+        elif bl == 'boolean': cur = TypeKind.BOOLEAN
+        elif bl == 'string': cur = TypeKind.STRING
+        else:
+            cls = self.symtab.resolve_class(ref.base)
+            cur = object_type(ref.base) if cls else TypeKind.ERROR
+        for _ in range(ref.dims):
+            cur = array_of(cur)
+        return cur
+
+    def _type_of_simple_identifier_var_only(self, node, fallback_type):
+        # equivalente estructural del chequeo por texto del visitor de ANTLR
+        if isinstance(node, Name):
+            name = node.name
+        elif isinstance(node, This):
+            name = "this"
+        else:
+            return fallback_type
+        var = self.symtab.resolve_var(name)
+        return var.type if var else fallback_type
+
+    def _params(self, fd) -> List[Tuple[str, Any]]:
+        return [(p.name, self.type_from_ref(p.type)) for p in fd.params]
+
+    # ========================
+    # program / block / statements
+    # ========================
+    # sentencias con bloques: generadores _walk* que recorre `_walk` (pila explícita)
+    def visitProgram(self, node):
+        try:
+            return self._walk(node)
+        except _IssueLimitReached:
+            self.truncated = True
+            return None
+
+    def _walkProgram(self, node):
+        yield from node.statements
+
+    def visitBlock(self, node):
+        return self._walk(node)
+
+    def _walkBlock(self, node):
+        self.symtab.push_scope()
+        yield from node.statements
+        self.symtab.pop_scope()
+
+    def visitVarDecl(self, node):
+        name = node.name
+        vtype = self.type_from_ref(node.type) if node.type is not None else TypeKind.ERROR
+        if node.is_const:
+            rhs_t = self.visit(node.init)
+            if vtype == TypeKind.ERROR:
+                vtype = rhs_t
+            if not self.is_assignable(vtype, rhs_t):
+                self.error(node, f"No se puede inicializar const {name}: se esperaba {self.symtab._tname(vtype)}, llegó {self.symtab._tname(rhs_t)}.", rhs_t)
+            if not self.symtab.define_var(VariableSymbol(name, vtype, is_const=True)):
+                self.error(node, f"Constante '{name}' ya está definida en este ámbito.")
+            return None
+        init_t = None
+        if node.init is not None:
+            init_t = self.visit(node.init)
+            if vtype == TypeKind.ERROR and init_t is not None:
+                vtype = init_t
+        if init_t is not None and not self.is_assignable(vtype, init_t):
+            self.error(node, f"No se puede asignar {self.symtab._tname(init_t)} a variable {name}: {self.symtab._tname(vtype)}.", init_t)
+        if not self.symtab.define_var(VariableSymbol(name, vtype, is_const=False)):
+            self.error(node, f"Variable '{name}' ya está definida en este ámbito.")
+        return None
+
+    def _assign_to_name(self, node, name, rhs):
+        var = self.symtab.resolve_var(name)
+        if not var:
+            self.error(node, f"Variable '{name}' no existe.")
+            return TypeKind.ERROR
+        if var.is_const:
+            self.error(node, f"No se puede asignar a constante '{name}'.")
+            return var.type
+        rhs_t = self.visit(rhs)
+        if not self.is_assignable(var.type, rhs_t):
+            self.error(node, f"Tipos incompatibles en asignación: {self.symtab._tname(var.type)} = {self.symtab._tname(rhs_t)}.", var.type, rhs_t)
+        return var.type
+
+    def visitAssignStmt(self, node):
+        return self._assign_to_name(node, node.name, node.value)
+
+    def visitPropertyAssignStmt(self, node):
+        # `visitAssignment` siempre entra por la rama de asignación simple
+        # (Identifier() existe en ambas alternativas): toma el Identifier y la
+        # primera expresión, que aquí es el receptor.
+        return self._assign_to_name(node, node.name, node.target)
+
+    def visitExprStmt(self, node):
+        self.visit(node.expr)
+        return None
+
+    def visitPrint(self, node):
+        self.visit(node.expr)
+        return None
+
+    def visitIf(self, node):
+        return self._walk(node)
+
+    def _walkIf(self, node):
+        cond_t = self.visit(node.cond)
+        self.expect_boolean(node, cond_t, "if")
+        yield node.then
+        if node.else_ is not None:
+            yield node.else_
+
+    def visitWhile(self, node):
+        return self._walk(node)
+
+    def _walkWhile(self, node):
+        cond_t = self.visit(node.cond)
+        self.expect_boolean(node, cond_t, "while")
+        self.loop_depth += 1
+        yield node.body
+        self.loop_depth -= 1
+
+    def visitDoWhile(self, node):
+        return self._walk(node)
+
+    def _walkDoWhile(self, node):
+        self.loop_depth += 1
+        yield node.body
+        self.loop_depth -= 1
+        cond_t = self.visit(node.cond)
+        self.expect_boolean(node, cond_t, "do-while")
+
+    def visitFor(self, node):
+        return self._walk(node)
+
+    def _walkFor(self, node):
+        self.visit(node.init)
+        if node.cond is not None:
+            cond_t = self.visit(node.cond)
+            self.expect_boolean(node, cond_t, "for")
+        if node.update is not None:
+            self.visit(node.update)
+        self.loop_depth += 1
+        yield node.body
+        self.loop_depth -= 1
+
+    def visitForeach(self, node):
+        return self._walk(node)
+
+    def _walkForeach(self, node):
+        coll_t = self.visit(node.iterable)
+        elem_t = self.array_element_type_of(coll_t)
+        if elem_t is None:
+            self.error(node, "foreach requiere un arreglo como colección.", coll_t)
+            elem_t = TypeKind.ERROR
+        self.symtab.push_scope()
+        self.symtab.define_var(VariableSymbol(node.name, elem_t, is_const=False))
+        self.loop_depth += 1
+        yield node.body
+        self.loop_depth -= 1
+        self.symtab.pop_scope()
+
+    def visitBreak(self, node):
+        if self.loop_depth == 0:
+            self.error(node, "break solo puede usarse dentro de un bucle.")
+        return None
+
+    def visitContinue(self, node):
+        if self.loop_depth == 0:
+            self.error(node, "continue solo puede usarse dentro de un bucle.")
+        return None
+
+    def visitReturn(self, node):
+        if self.current_function is None:
+            self.error(node, "return no puede usarse fuera de una función.")
+            return None
+        if self.current_function.return_type == TypeKind.VOID:
+            if node.value is not None:
+                self.error(node, "Esta función es void: 'return' no debe tener expresión.")
+        else:
+            if node.value is None:
+                self.error(node, f"Falta expresión en return; se esperaba {self.symtab._tname(self.current_function.return_type)}.")
+            else:
+                et = self.visit(node.value)
+                if not self.is_assignable(self.current_function.return_type, et):
+                    self.error(node, f"Tipo de retorno incompatible: se esperaba {self.symtab._tname(self.current_function.return_type)}, se obtuvo {self.symtab._tname(et)}.", et)
+        self.current_function_has_return = True
+        return None
+
+    def visitSwitch(self, node):
+        return self._walk(node)
+
+    def _walkSwitch(self, node):
+        self.visit(node.subject)
+        for c in node.cases:
+            yield from c.statements
+        if node.default is not None:
+            yield from node.default
+
+    def visitTryCatch(self, node):
+        return self._walk(node)
+
+    def _walkTryCatch(self, node):
+        yield node.body
+        self.symtab.push_scope()
+        self.symtab.define_var(VariableSymbol(node.name, TypeKind.STRING, is_const=False))
+        yield node.handler
+        self.symtab.pop_scope()
+
+    # ========================
+    # Funciones
+    # ========================
+    def visitFuncDecl(self, node):
+        return self._walk(node)
+
+    def _walkFuncDecl(self, node):
+        name = node.name
+        params = self._params(node)
+        ret_t = self.type_from_ref(node.return_type)
+
+        fsym = FunctionSymbol(name, params, ret_t)
+        if not self.symtab.define_func(fsym):
+            self.error(node, f"Función '{name}' ya está declarada.")
+
+        outer_fn, outer_has = self.current_function, self.current_function_has_return
+        self.current_function, self.current_function_has_return = fsym, False
+
+        self.symtab.push_scope()
+        for pname, ptype in params:
+            if not self.symtab.define_var(VariableSymbol(pname, ptype, is_const=False)):
+                self.error(node, f"Parámetro '{pname}' duplicado.")
+        yield node.body
+        self.symtab.pop_scope()
+
+        if fsym.return_type != TypeKind.VOID and not self.current_function_has_return:
+            self.error(node, f"La función '{name}' debe retornar {self.symtab._tname(ret_t)} en todos los caminos.")
+        self.current_function, self.current_function_has_return = outer_fn, outer_has
+
+    # ========================
+    # Clases / miembros / métodos / ctor / herencia
+    # ========================
+    def visitClassDecl(self, node):
+        csym = ClassSymbol(name=node.name, members={}, _base_name=node.base)
+        if not self.symtab.define_class(csym):
+            self.error(node, f"Clase '{node.name}' ya está declarada.")
+            return None
+
+        prev_class = self.current_class
+        self.current_class = csym
+        self.symtab.push_scope()
+
+        for m in node.members:
+            self._declare_member(m)
+
+        self.symtab.pop_scope()
+        self.current_class = prev_class
+        return None
+
+    def _declare_member(self, m):
+        if isinstance(m, FuncDecl):
+            if m.name == "constructor":
+                self._declare_ctor(m)
+            else:
+                self._declare_method(m)
+        elif isinstance(m, VarDecl):
+            vtype = self.type_from_ref(m.type) if m.type is not None else TypeKind.ERROR
+            if m.name in self.current_class.members:
+                self.error(m, f"Miembro duplicado '{m.name}'.")
+            else:
+                self.symtab.add_member(self.current_class, ClassMember(name=m.name, type=vtype, is_method=False))
+
+    def _declare_method(self, fd):
+        mname = fd.name
+        params = self._params(fd)
+        ret_t = self.type_from_ref(fd.return_type)
+
+        # registra o sobrescribe (permitimos override simple)
+        self.symtab.add_member(self.current_class, ClassMember(
+            name=mname, type=TypeKind.VOID, is_method=True, params=params, return_type=ret_t
+        ))
+
+        outer_fn, outer_has = self.current_function, self.current_function_has_return
+        self.current_function, self.current_function_has_return = \
+            FunctionSymbol(f"{self.current_class.name}.{mname}", params, ret_t), False
+
+        self.symtab.push_scope()
+        self.symtab.define_var(VariableSymbol("this", object_type(self.current_class.name), is_const=True))
+        for pname, ptype in params:
+            self.symtab.define_var(VariableSymbol(pname, ptype, is_const=False))
+        self.visit(fd.body)
+        self.symtab.pop_scope()
+
+        if ret_t != TypeKind.VOID and not self.current_function_has_return:
+            self.error(fd, f"El método '{mname}' debe retornar {self.symtab._tname(ret_t)} en todos los caminos.")
+
+        self.current_function, self.current_function_has_return = outer_fn, outer_has
+
+    def _declare_ctor(self, fd):
+        params = self._params(fd)
+        if "__ctor__" in self.current_class.members:
+            self.error(fd, f"La clase '{self.current_class.name}' ya tiene constructor.")
+        else:
+            self.symtab.add_member(self.current_class, ClassMember(
+                name="__ctor__", type=TypeKind.VOID, is_method=True,
+                params=params, return_type=TypeKind.VOID
+            ))
+        self.in_constructor = True
+        self.symtab.push_scope()
+        self.symtab.define_var(VariableSymbol("this", object_type(self.current_class.name), is_const=True))
+        for pname, ptype in params:
+            self.symtab.define_var(VariableSymbol(pname, ptype, is_const=False))
+        self.visit(fd.body)
+        self.symtab.pop_scope()
+        self.in_constructor = False
+
+    # ========================
+    # Expresiones
+    # ========================
+    def visitAssign(self, node):
+        _, var = self._visit_chain(node.target)
+        rhs_t = self.visit(node.value)
+        if var is None:
+            self.error(node, "Lado izquierdo de '=' no es una variable asignable.")
+            return TypeKind.ERROR
+        if var.is_const:
+            self.error(node, f"No se puede asignar a constante '{var.name}'.")
+            return var.type
+        if not self.is_assignable(var.type, rhs_t):
+            self.error(node, f"Tipos incompatibles en asignación: {self.symtab._tname(var.type)} = {self.symtab._tname(rhs_t)}.", var.type, rhs_t)
+        return var.type
+
+    def visitPropertyAssign(self, node):
+        base_t, _ = self._visit_chain(node.target)
+        if not is_object(base_t):
+            self.error(node, "Asignación a propiedad requiere objeto a la izquierda del '.'.", base_t)
+            return TypeKind.ERROR
+        csym = self.symtab.resolve_class(base_t.class_name)
+        if not csym:
+            self.error(node, f"Clase '{base_t.class_name}' no está declarada.")
+            return TypeKind.ERROR
+        mname = node.name
+        member, owner = self._resolve_member(csym, mname)
+        if not member:
+            self.error(node, f"'{base_t.class_name}' no tiene miembro '{mname}'.")
+            return TypeKind.ERROR
+        if member.is_method:
+            self.error(node, f"No se puede asignar a método '{mname}'.")
+            return TypeKind.ERROR
+        rhs_t = self.visit(node.value)
+        rhs_t = self._type_of_simple_identifier_var_only(node.value, rhs_t)
+        if not self.is_assignable(member.type, rhs_t):
+            self.error(node, f"Tipos incompatibles al asignar {mname}: {self.symtab._tname(member.type)} = {self.symtab._tname(rhs_t)}.", member.type, rhs_t)
+        return member.type
+
+    def visitTernary(self, node):
+        cond_t = self.visit(node.cond)
+        self.expect_boolean(node, cond_t, "?:")
+        t_t = self.visit(node.then)
+        f_t = self.visit(node.else_)
+        if same_type(t_t, f_t):
+            return t_t
+        if TypeKind.is_numeric(t_t) and TypeKind.is_numeric(f_t):
+            return TypeKind.common_numeric(t_t, f_t)
+        if TypeKind.STRING in (t_t, f_t):
+            return TypeKind.STRING
+        return TypeKind.ERROR
+
+    def visitBinary(self, node):
+        # bucle por la espina izquierda (los árboles de lowering anidan a la izquierda)
+        spine = []
+        hook = self._node_hook
+        while type(node) is Binary:
+            if hook is not None and spine:
+                hook(node)
+            spine.append(node)
+            node = node.left
+        t = self.visit(node)
+        for b in reversed(spine):
+            t = self._binary_type(b, b.op, t, self.visit(b.right))
+        return t
+
+    def visitUnary(self, node):
+        ops = []
+        while type(node) is Unary:
+            ops.append(node)
+            node = node.operand
+        t = self.visit(node)
+        for u in reversed(ops):
+            t = self._unary_type(u, u.op, t)
+        return t
+
+    def visitLiteral(self, node):
+        kind = node.kind
+        if kind is LiteralKind.NULL:
+            return TypeKind.NULL
+        if kind is LiteralKind.TRUE or kind is LiteralKind.FALSE:
+            return TypeKind.BOOLEAN
+        if kind is LiteralKind.STRING:
+            return TypeKind.STRING
+        if kind is LiteralKind.INTEGER:
+            return TypeKind.INTEGER
+        return TypeKind.ERROR
+
+    def visitArrayLiteral(self, node):
+        elems = [self.visit(e) for e in node.elements]
+        if not elems:
+            return array_of(TypeKind.ERROR)  # arreglo vacío: tipo desconocido
+        et = elems[0]
+        for t in elems[1:]:
+            if not same_type(t, et):
+                self.error(node, "Todos los elementos del arreglo deben ser del mismo tipo.", t, et)
+                return array_of(TypeKind.ERROR)
+        return array_of(et)
+
+    # átomos y sufijos: todos pasan por la cadena completa
+    def visitName(self, node): return self._visit_chain(node)[0]
+    def visitNew(self, node): return self._visit_chain(node)[0]
+    def visitThis(self, node): return self._visit_chain(node)[0]
+    def visitCall(self, node): return self._visit_chain(node)[0]
+    def visitIndex(self, node): return self._visit_chain(node)[0]
+    def visitMember(self, node): return self._visit_chain(node)[0]
+
+    def _visit_chain(self, node) -> Tuple[Any, Optional[VariableSymbol]]:
+        """
+        Recorre átomo + sufijos (equivalente a visitLeftHandSide) y retorna
+        (tipo, variable asignable o None).
+        """
+        suffixes = []
+        while isinstance(node, SUFFIX_NODES):
+            suffixes.append(node)
+            node = node.target
+        suffixes.reverse()
+
+        hook = self._node_hook
+        if hook is not None and suffixes:
+            # el sufijo externo llegó por visit(); el átomo y los demás no
+            for n in [node] + suffixes[:-1]:
+                hook(n)
+
+        # átomo
+        lhs_var: Optional[VariableSymbol] = None
+        as_func: Optional[FunctionSymbol] = None
+        if isinstance(node, Name):
+            var = self.symtab.resolve_var(node.name)
+            if var:
+                cur_t = var.type
+                lhs_var = var
+            else:
+                # función global: un CallExpr posterior la invoca
+                as_func = self.symtab.resolve_func(node.name)
+                cur_t = TypeKind.ERROR
+        elif isinstance(node, This):
+            if self.current_class is None:
+                self.error(node, "Uso de 'this' fuera de método/constructor.")
+                cur_t = TypeKind.ERROR
+            else:
+                cur_t = object_type(self.current_class.name)
+        elif node is not None:
+            cur_t = self._visit_new(node)
+        else:
+            cur_t = None
+
+        # sufijos: el último manejador de método viaja explícito por la cadena
+        handle = None
+        for sfx in suffixes:
+            lhs_var = None
+            if isinstance(sfx, Member):
+                cur_t, h = self._visit_member(sfx, cur_t)
+                if h is not None:
+                    handle = h
+            elif isinstance(sfx, Index):
+                cur_t = self._visit_index(sfx, cur_t)
+            else:
+                if as_func is not None:
+                    callee = as_func
+                elif isinstance(cur_t, ClassMember) and cur_t.is_method:
+                    callee = ("method", None, cur_t)
+                else:
+                    callee = handle
+                cur_t = self._visit_call(sfx, callee)
+        return cur_t, lhs_var
+
+    def _visit_new(self, node):
+        cname = node.class_name
+        csym = self.symtab.resolve_class(cname)
+        if not csym:
+            self.error(node, f"Clase '{cname}' no existe.")
+            return TypeKind.ERROR
+
+        arg_types = [self.visit(e) for e in node.args]
+
+        # 1) ctor local
+        ctor = csym.members.get("__ctor__")
+        if ctor:
+            self._check_args(node, ctor.params or [], arg_types, f"{cname}.constructor")
+            return object_type(cname)
+
+        # 2) si no hay, busca en la base
+        base_name = csym._base_name
+        while ctor is None and base_name:
+            base_cls = self.symtab.resolve_class(base_name)
+            if base_cls:
+                ctor = base_cls.members.get("__ctor__")
+                if ctor:
+                    self._check_args(node, ctor.params or [], arg_types, f"{base_cls.name}.constructor")
+                    break
+                base_name = base_cls._base_name
+            else:
+                break
+
+        if ctor is None and arg_types:
+            self.error(node, f"'{cname}' no tiene constructor que acepte argumentos.")
+        return object_type(cname)
+
+    def _visit_call(self, node, callee):
+        args_types = [self.visit(e) for e in node.args]
+
+        if isinstance(callee, FunctionSymbol):
+            self._check_args(node, callee.params, args_types, callee.name)
+            return callee.return_type
+
+        if callee is not None:
+            (_tag, class_sym, member) = callee
+            self._check_args(node, member.params or [], args_types, f"{(class_sym.name if class_sym else '?')}.{member.name}")
+            return member.return_type or TypeKind.VOID
+
+        self.error(node, "Llamada sin callee resoluble.")
+        return TypeKind.ERROR
+
+    def _visit_index(self, node, base_t):
+        idx_t = self.visit(node.index)
+        if idx_t != TypeKind.INTEGER:
+            self.error(node, "El índice de un arreglo debe ser integer.", idx_t)
+        et = elem_type_of(base_t)
+        if et is None:
+            self.error(node, "Indexación sobre un no-arreglo.", base_t)
+            return TypeKind.ERROR
+        return et
+
+    def _visit_member(self, node, lhs_t):
+        if not is_object(lhs_t):
+            self.error(node, "Acceso a miembro sobre algo que no es objeto.", lhs_t)
+            return TypeKind.ERROR, None
+        csym = self.symtab.resolve_class(lhs_t.class_name)
+        if not csym:
+            self.error(node, f"Clase '{lhs_t.class_name}' no está declarada.")
+            return TypeKind.ERROR, None
+        member, owner = self._resolve_member(csym, node.name)
+        if not member:
+            self.error(node, f"'{lhs_t.class_name}' no tiene miembro '{node.name}'.")
+            return TypeKind.ERROR, None
+        if member.is_method:
+            # el ClassMember viaja como "tipo" hasta el CallExpr siguiente
+            return member, ("method", owner, member)
+        return member.type, None
@@ -0,0 +1,330 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+
+from .ast_nodes import (
+    NO_SPAN, BinOp, UnaryOp, LiteralKind,
+    Program, Block, VarDecl, AssignStmt, PropertyAssignStmt, ExprStmt, Print,
+    If, While, DoWhile, For, Foreach, Break, Continue, Return, TryCatch,
+    SwitchCase, Switch, Param, FuncDecl, ClassDecl, TypeRef,
+    Assign, PropertyAssign, Ternary, Binary, Unary, Literal, ArrayLiteral,
+    Name, New, This, Call, Index, Member,
+)
+
+# ========================
+# Lowering: parse tree de ANTLR -> AST compacto
+# ========================
+# Trabaja por nombre de clase de contexto (no importa el parser generado).
+# Las cadenas passthrough se colapsan, y las cadenas de operadores binarios
+# (recursivas por la izquierda), de unarios y de sufijos se bajan con bucles,
+# así la profundidad de recursión no crece con la longitud de la expresión.
+
+def lower(tree) -> Program:
+    """
+    Baja el árbol de `parser.program()` a un `Program` del AST compacto.
+    """
+    return Lowerer().lower_program(tree)
+
+
+def _span(ctx):
+    start = ctx.start
+    if start is None:
+        return NO_SPAN
+    stop = ctx.stop if ctx.stop is not None else start
+    return (start.line, start.column, stop.line, stop.column + max(stop.stop - stop.start + 1, 0))
+
+
+def _text(terminal) -> Optional[str]:
+    return terminal.getText() if terminal is not None else None
+
+
+# Contextos que solo reenvían a un único hijo
+_PASSTHROUGH = frozenset((
+    "ExpressionContext", "ExprNoAssignContext", "TernaryExprContext",
+    "LogicalOrPassthroughContext", "LogicalAndPassthroughContext",
+    "EqualityPassthroughContext", "RelationalPassthroughContext",
+    "AdditivePassthroughContext", "MultiplicativePassthroughContext",
+    "UnaryPassthroughContext", "LiteralPrimaryContext", "LeftHandSidePrimaryContext",
+    "StatementContext",
+))
+
+# etiqueta -> (operador fijo o None si viene en `op`, getter izquierdo, getter derecho)
+_BINARY: Dict[str, tuple] = {
+    "LogicalOrOpContext": (BinOp.OR, "logicalOrExpr", "logicalAndExpr"),
+    "LogicalAndOpContext": (BinOp.AND, "logicalAndExpr", "equalityExpr"),
+    "EqualityOpContext": (None, "equalityExpr", "relationalExpr"),
+    "RelationalOpContext": (None, "relationalExpr", "additiveExpr"),
+    "AdditiveOpContext": (None, "additiveExpr", "multiplicativeExpr"),
+    "MultiplicativeOpContext": (None, "multiplicativeExpr", "unaryExpr"),
+}
+
+_NOT_PASSTHROUGH = object()
+
+
+def _passthrough_child(ctx):
+    """Hijo único si `ctx` es passthrough; `_NOT_PASSTHROUGH` si no lo es."""
+    name = type(ctx).__name__
+    if name == "ParenthesizedExprContext":
+        return ctx.expression()
+    if name not in _PASSTHROUGH:
+        return _NOT_PASSTHROUGH
+    children = ctx.children
+    if not children:
+        return None
+    if len(children) != 1:
+        return _NOT_PASSTHROUGH  # ternario con '?'
+    return children[0]
+
+
+class Lowerer:
+    def __init__(self):
+        self._handlers: Dict[type, Any] = {}
+
+    def _handler(self, ctx):
+        fn = self._handlers.get(type(ctx))
+        if fn is None:
+            fn = getattr(self, f"_lower{type(ctx).__name__[:-len('Context')]}", None)
+            if fn is None:
+                raise TypeError(f"No se puede bajar el contexto {type(ctx).__name__}")
+            self._handlers[type(ctx)] = fn
+        return fn
+
+    # ========================
+    # program / sentencias
+    # ========================
+    def lower_program(self, ctx) -> Program:
+        return Program(self._statements(ctx.statement()), span=_span(ctx))
+
+    def stmt(self, ctx):
+        while ctx is not None and type(ctx).__name__ == "StatementContext":
+            ctx = ctx.getChild(0) if ctx.getChildCount() else None
+        if ctx is None:
+            return None
+        return self._handler(ctx)(ctx)
+
+    def _statements(self, ctxs) -> List[Any]:
+        out = []
+        for c in ctxs:
+            st = self.stmt(c)
+            if st is not None:
+                out.append(st)
+        return out
+
+    def block(self, ctx) -> Optional[Block]:
+        if ctx is None:
+            return None
+        return Block(self._statements(ctx.statement()), span=_span(ctx))
+
+    def _lowerBlock(self, ctx):
+        return self.block(ctx)
+
+    def type_ref(self, tctx) -> Optional[TypeRef]:
+        if tctx is None:
+            return None
+        base_ctx = tctx.baseType()
+        base = base_ctx.start.text if base_ctx else ""
+        dims = (tctx.getChildCount() - 1) // 2          # type: baseType ('[' ']')*
+        return TypeRef(base, dims, span=_span(tctx))
+
+    def _annotation(self, ctx) -> Optional[TypeRef]:
+        ann = ctx.typeAnnotation()
+        return self.type_ref(ann.type_()) if ann is not None else None
+
+    def _lowerVariableDeclaration(self, ctx):
+        init = ctx.initializer()
+        return VarDecl(_text(ctx.Identifier()), self._annotation(ctx),
+                       self.expr(init.expression()) if init is not None else None,
+                       False, span=_span(ctx))
+
+    def _lowerConstantDeclaration(self, ctx):
+        return VarDecl(_text(ctx.Identifier()), self._annotation(ctx),
+                       self.expr(ctx.expression()), True, span=_span(ctx))
+
+    def _lowerAssignment(self, ctx):
+        exprs = ctx.expression()
+        first = ctx.getChild(0) if ctx.getChildCount() else None
+        if first is not None and hasattr(first, "getRuleIndex"):
+            # expression '.' Identifier '=' expression ';'
+            return PropertyAssignStmt(self.expr(exprs[0]), _text(ctx.Identifier()),
+                                      self.expr(exprs[1]) if len(exprs) > 1 else None,
+                                      span=_span(ctx))
+        return AssignStmt(_text(ctx.Identifier()), self.expr(exprs[0]) if exprs else None,
+                          span=_span(ctx))
+
+    def _lowerExpressionStatement(self, ctx):
+        return ExprStmt(self.expr(ctx.expression()), span=_span(ctx))
+
+    def _lowerPrintStatement(self, ctx):
+        return Print(self.expr(ctx.expression()), span=_span(ctx))
+
+    def _lowerIfStatement(self, ctx):
+        blocks = ctx.block()
+        return If(self.expr(ctx.expression()),
+                  self.block(blocks[0]) if len(blocks) >= 1 else None,
+                  self.block(blocks[1]) if len(blocks) == 2 else None,
+                  span=_span(ctx))
+
+    def _lowerWhileStatement(self, ctx):
+        return While(self.expr(ctx.expression()), self.block(ctx.block()), span=_span(ctx))
+
+    def _lowerDoWhileStatement(self, ctx):
+        return DoWhile(self.block(ctx.block()), self.expr(ctx.expression()), span=_span(ctx))
+
+    def _lowerForStatement(self, ctx):
+        if ctx.variableDeclaration():
+            init = self._lowerVariableDeclaration(ctx.variableDeclaration())
+        elif ctx.assignment():
+            init = self._lowerAssignment(ctx.assignment())
+        else:
+            init = None
+        # como en el visitor: la 1ª expresión presente es la condición, la 2ª el update
+        exprs = ctx.expression()
+        return For(init,
+                   self.expr(exprs[0]) if len(exprs) >= 1 else None,
+                   self.expr(exprs[1]) if len(exprs) >= 2 else None,
+                   self.block(ctx.block()), span=_span(ctx))
+
+    def _lowerForeachStatement(self, ctx):
+        return Foreach(_text(ctx.Identifier()), self.expr(ctx.expression()),
+                       self.block(ctx.block()), span=_span(ctx))
+
+    def _lowerBreakStatement(self, ctx):
+        return Break(span=_span(ctx))
+
+    def _lowerContinueStatement(self, ctx):
+        return Continue(span=_span(ctx))
+
+    def _lowerReturnStatement(self, ctx):
+        return Return(self.expr(ctx.expression()), span=_span(ctx))
+
+    def _lowerTryCatchStatement(self, ctx):
+        return TryCatch(self.block(ctx.block(0)), _text(ctx.Identifier()),
+                        self.block(ctx.block(1)), span=_span(ctx))
+
+    def _lowerSwitchStatement(self, ctx):
+        cases = [SwitchCase(self.expr(c.expression()), self._statements(c.statement()), span=_span(c))
+                 for c in ctx.switchCase()]
+        default = ctx.defaultCase()
+        return Switch(self.expr(ctx.expression()), cases,
+                      self._statements(default.statement()) if default is not None else None,
+                      span=_span(ctx))
+
+    def _lowerFunctionDeclaration(self, ctx):
+        params: List[Param] = []
+        if ctx.parameters():
+            for p in ctx.parameters().parameter():
+                params.append(Param(_text(p.Identifier()), self.type_ref(p.type_()), span=_span(p)))
+        return FuncDecl(_text(ctx.Identifier()), params, self.type_ref(ctx.type_()),
+                        self.block(ctx.block()), span=_span(ctx))
+
+    def _lowerClassDeclaration(self, ctx):
+        ids = ctx.Identifier()
+        members = []
+        for m in ctx.classMember():
+            inner = m.functionDeclaration() or m.variableDeclaration() or m.constantDeclaration()
+            if inner is not None:
+                members.append(self._handler(inner)(inner))
+        return ClassDecl(_text(ids[0]) if ids else None,
+                         _text(ids[1]) if len(ids) == 2 else None,
+                         members, span=_span(ctx))
+
+    # ========================
+    # Expresiones
+    # ========================
+    def expr(self, ctx):
+        while ctx is not None:
+            nxt = _passthrough_child(ctx)
+            if nxt is _NOT_PASSTHROUGH:
+                break
+            ctx = nxt
+        if ctx is None:
+            return None
+        if type(ctx).__name__ in _BINARY:
+            return self._binary(ctx)
+        return self._handler(ctx)(ctx)
+
+    def _args(self, args_ctx) -> List[Any]:
+        if args_ctx is None:
+            return []
+        return [self.expr(e) for e in args_ctx.expression()]
+
+    def _lowerAssignExpr(self, ctx):
+        return Assign(self.expr(ctx.leftHandSide()), self.expr(ctx.assignmentExpr()), span=_span(ctx))
+
+    def _lowerPropertyAssignExpr(self, ctx):
+        return PropertyAssign(self.expr(ctx.leftHandSide()), _text(ctx.Identifier()),
+                              self.expr(ctx.assignmentExpr()), span=_span(ctx))
+
+    def _lowerTernaryExpr(self, ctx):
+        return Ternary(self.expr(ctx.logicalOrExpr()),
+                       self.expr(ctx.expression(0)), self.expr(ctx.expression(1)),
+                       span=_span(ctx))
+
+    def _binary(self, ctx):
+        # baja por la espina izquierda sin recursión: a + b + ... + z
+        spine = []
+        cur = ctx
+        while cur is not None:
+            info = _BINARY.get(type(cur).__name__)
+            if info is not None:
+                spine.append((cur, info))
+                cur = getattr(cur, info[1])()
+                continue
+            nxt = _passthrough_child(cur)
+            if nxt is _NOT_PASSTHROUGH:
+                break
+            cur = nxt
+        node = self.expr(cur)
+        for c, (op, _left, right) in reversed(spine):
+            if op is None:
+                op = BinOp(c.op.text) if c.op is not None else None
+            node = Binary(op, node, self.expr(getattr(c, right)()), span=_span(c))
+        return node
+
+    def _lowerUnaryOp(self, ctx):
+        ops = []
+        cur = ctx
+        while cur is not None and type(cur).__name__ == "UnaryOpContext":
+            ops.append(cur)
+            cur = cur.unaryExpr()
+        node = self.expr(cur)
+        for c in reversed(ops):
+            node = Unary(UnaryOp(c.op.text) if c.op is not None else None, node, span=_span(c))
+        return node
+
+    def _lowerLiteralExpr(self, ctx):
+        if ctx.arrayLiteral():
+            arr = ctx.arrayLiteral()
+            return ArrayLiteral([self.expr(e) for e in arr.expression()], span=_span(arr))
+        text = ctx.start.text                           # un solo token
+        if text == "null":
+            return Literal(LiteralKind.NULL, text, span=_span(ctx))
+        if text == "true" or text == "false":
+            return Literal(LiteralKind.TRUE if text == "true" else LiteralKind.FALSE, text, span=_span(ctx))
+        if ctx.Literal() is not None:
+            if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+                return Literal(LiteralKind.STRING, text, span=_span(ctx))
+            return Literal(LiteralKind.INTEGER, text, span=_span(ctx))
+        return Literal(None, text, span=_span(ctx))
+
+    # leftHandSide: primaryAtom (suffixOp)*  ->  sufijos anidados sobre el átomo
+    def _lowerLeftHandSide(self, ctx):
+        prim = ctx.primaryAtom()
+        node = self._handler(prim)(prim) if prim is not None else None
+        for sfx in ctx.suffixOp():
+            kind = type(sfx).__name__
+            if kind == "CallExprContext":
+                node = Call(node, self._args(sfx.arguments()), span=_span(sfx))
+            elif kind == "IndexExprContext":
+                node = Index(node, self.expr(sfx.expression()), span=_span(sfx))
+            else:
+                node = Member(node, _text(sfx.Identifier()), span=_span(sfx))
+        return node
+
+    def _lowerIdentifierExpr(self, ctx):
+        return Name(_text(ctx.Identifier()), span=_span(ctx))
+
+    def _lowerNewExpr(self, ctx):
+        return New(_text(ctx.Identifier()), self._args(ctx.arguments()), span=_span(ctx))
+
+    def _lowerThisExpr(self, ctx):
+        return This(span=_span(ctx))
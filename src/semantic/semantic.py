@@ -1,7 +1,11 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Dict, List, Optional, Tuple, Any
+from types import MappingProxyType
+from weakref import WeakValueDictionary
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Any
+
+from .ast_nodes import BinOp, UnaryOp, LOGICAL_OPS, EQUALITY_OPS, RELATIONAL_OPS
 
 # Nota: No heredamos del visitor generado. ANTLR igual invocará
 # visit<NombreContexto> si el método existe en esta clase.
@@ -27,6 +31,10 @@ class TypeKind(Enum):
     NULL = auto()
     ERROR = auto()
 
+    # Enum hashea por nombre (en Python); la igualdad ya es identidad, así que
+    # el hash de identidad es equivalente y mucho más barato como clave de dict
+    __hash__ = object.__hash__
+
     @staticmethod
     def is_numeric(t: "TypeKind") -> bool:
         return t in (TypeKind.INTEGER, TypeKind.FLOAT)
@@ -41,23 +49,101 @@ class TypeKind(Enum):
             return TypeKind.INTEGER
         return TypeKind.ERROR
 
-@dataclass(frozen=True)
+# Los tipos compuestos están internados: hay una sola instancia por tipo
+# distinto (tabla canónica por proceso), así que la igualdad es identidad, el
+# hash es el de identidad (sin recorrer la estructura) y construir un tipo que
+# ya existe es una búsqueda en un dict, sin asignar memoria. `ArrayType(e)` y
+# `ObjectType(n)` siempre retornan la instancia canónica; `array_of` y
+# `object_type` son el camino rápido. Son inmutables.
+#
+# Las tablas guardan referencias débiles: un tipo que ya nadie usa (p. ej. el
+# de una clase de un archivo anterior en el daemon o el IDE) sale de la tabla,
+# y la tabla no crece con cada análisis. Mientras alguien lo tenga, sigue
+# siendo la instancia canónica.
+
+_ARRAY_TYPES: "WeakValueDictionary[Any, ArrayType]" = WeakValueDictionary()     # elem -> ArrayType(elem)
+_OBJECT_TYPES: "WeakValueDictionary[str, ObjectType]" = WeakValueDictionary()   # nombre de clase -> ObjectType
+# los dicts de referencias de las tablas, para los caminos rápidos: leer
+# `tabla[k]` pasa por código Python de WeakValueDictionary en cada búsqueda
+_ARRAY_REFS = _ARRAY_TYPES.data
+_OBJECT_REFS = _OBJECT_TYPES.data
+
 class ArrayType:
-    elem: Any  # TypeKind | ArrayType
+    """
+    `elem[]`. `depth` es la cantidad de dimensiones y `base` el tipo no
+    arreglo del fondo (integer[][] -> depth 2, base INTEGER).
+    """
+    __slots__ = ("elem", "depth", "base", "__weakref__")
 
-def is_array(t) -> bool: return isinstance(t, ArrayType)
-def array_of(elem) -> ArrayType: return ArrayType(elem)
-def elem_type_of(t): return t.elem if isinstance(t, ArrayType) else None
+    def __new__(cls, elem: Any) -> "ArrayType":
+        try:
+            t = _ARRAY_TYPES.get(elem)
+        except TypeError:
+            # elemento no hasheable (el ClassMember que queda como placeholder
+            # de un método): arreglo sin internar, solo igual a sí mismo
+            return _build_array(cls, elem)
+        if t is None:
+            t = _ARRAY_TYPES[elem] = _build_array(cls, elem)
+        return t
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def __reduce__(self):
+        return (ArrayType, (self.elem,))
+
+    def __repr__(self) -> str:
+        return f"ArrayType(elem={self.elem!r})"
+
+def _build_array(cls, elem: Any) -> ArrayType:
+    t = object.__new__(cls)
+    object.__setattr__(t, "elem", elem)
+    if isinstance(elem, ArrayType):
+        object.__setattr__(t, "depth", elem.depth + 1)
+        object.__setattr__(t, "base", elem.base)
+    else:
+        object.__setattr__(t, "depth", 1)
+        object.__setattr__(t, "base", elem)
+    return t
 
-@dataclass(frozen=True)
 class ObjectType:
-    class_name: str
+    """Instancia de la clase `class_name`."""
+    __slots__ = ("class_name", "__weakref__")
+
+    def __new__(cls, class_name: str) -> "ObjectType":
+        t = _OBJECT_TYPES.get(class_name)
+        if t is None:
+            t = object.__new__(cls)
+            object.__setattr__(t, "class_name", class_name)
+            _OBJECT_TYPES[class_name] = t
+        return t
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def __reduce__(self):
+        return (ObjectType, (self.class_name,))
+
+    def __repr__(self) -> str:
+        return f"ObjectType(class_name={self.class_name!r})"
+
+def is_array(t) -> bool: return isinstance(t, ArrayType)
+def array_of(elem) -> ArrayType:
+    try:
+        t = _ARRAY_REFS[elem]()
+    except (KeyError, TypeError):
+        return ArrayType(elem)
+    return t if t is not None else ArrayType(elem)
+def elem_type_of(t): return t.elem if isinstance(t, ArrayType) else None
 
 def is_object(t) -> bool: return isinstance(t, ObjectType)
+def object_type(class_name: str) -> ObjectType:
+    ref = _OBJECT_REFS.get(class_name)
+    t = ref() if ref is not None else None
+    return t if t is not None else ObjectType(class_name)
 
 def same_type(a, b) -> bool:
-    if isinstance(a, ArrayType) and isinstance(b, ArrayType):
-        return same_type(a.elem, b.elem)
+    # tipos internados y TypeKind: `==` es identidad
     return a == b
 
 @dataclass
@@ -95,67 +181,304 @@ class ClassSymbol:
     members: Dict[str, ClassMember] = field(default_factory=dict)
     _base_name: Optional[str] = None
 
+_NO_SYMBOLS: Mapping[str, Any] = MappingProxyType({})
+_NO_MEMBER: Tuple[None, None] = (None, None)
+
+class Scope:
+    """
+    Un ámbito con un espacio de nombres por clase de símbolo (`vars`, `funcs`,
+    `classes`) y `symbols` con todos juntos en orden de definición, que es lo
+    que recorren export_as_lines y el IDE (Scope se comporta como ese dict).
+    Los dicts se crean en la primera definición de cada clase. Un nombre vive
+    en un solo espacio por ámbito, como cuando el ámbito era un único dict.
+    """
+    __slots__ = ("vars", "funcs", "classes", "symbols")
+
+    def __init__(self, vars: Mapping[str, Any] = _NO_SYMBOLS, funcs: Mapping[str, Any] = _NO_SYMBOLS,
+                 classes: Mapping[str, Any] = _NO_SYMBOLS, symbols: Mapping[str, Any] = _NO_SYMBOLS):
+        self.vars = vars
+        self.funcs = funcs
+        self.classes = classes
+        self.symbols = symbols
+
+    def define(self, kind: str, name: str, sym: Any) -> Optional[Any]:
+        """
+        Liga `name` en el espacio `kind` ("vars" | "funcs" | "classes").
+        Retorna el símbolo que se pisó en este ámbito, si había uno.
+        """
+        symbols = self.symbols
+        if symbols is _NO_SYMBOLS:
+            symbols = self.symbols = {}
+            old = None
+        else:
+            old = symbols.get(name)
+            if old is not None:
+                for ns in (self.vars, self.funcs, self.classes):
+                    if name in ns:
+                        del ns[name]
+        ns = getattr(self, kind)
+        if ns is _NO_SYMBOLS:
+            ns = {}
+            setattr(self, kind, ns)
+        ns[name] = sym
+        symbols[name] = sym
+        return old
+
+    # vista de dict nombre -> símbolo
+    def __len__(self) -> int:
+        return len(self.symbols)
+    def __iter__(self):
+        return iter(self.symbols)
+    def __contains__(self, name) -> bool:
+        return name in self.symbols
+    def __getitem__(self, name):
+        return self.symbols[name]
+    def get(self, name, default=None):
+        return self.symbols.get(name, default)
+    def items(self):
+        return self.symbols.items()
+    def keys(self):
+        return self.symbols.keys()
+    def values(self):
+        return self.symbols.values()
+
+def _unindex(names: Mapping[str, Any], index: Dict[str, List[Any]]) -> None:
+    for name in names:
+        stack = index[name]
+        stack.pop()
+        if not stack:
+            del index[name]
+
+# Los bloques que no definen nada (la mayoría) comparten este ámbito vacío;
+# SymbolTable lo reemplaza por uno propio en la primera definición.
+_EMPTY_SCOPE = Scope()
+
 class SymbolTable:
+    """
+    Pila de ámbitos (`scopes`; el 0 es `globals`) más un índice por clase de
+    símbolo nombre -> pila de símbolos con las ligaduras de los ámbitos
+    anidados, de la más externa a la más interna. El índice se actualiza en
+    define/pop_scope, así que resolver un nombre es mirar el tope de su pila
+    local o, si no tiene, el espacio correspondiente de `globals`: ni se
+    recorre la cadena de ámbitos ni se filtra por isinstance.
+
+    El ámbito global queda fuera del índice a propósito: ya es una tabla hash
+    por clase, y el análisis incremental la arma con dicts que registran
+    lecturas/escrituras y escribe en ellos directamente al re-aplicar unidades.
+
+    También es el oráculo de subtipos: el conjunto de ancestros de cada clase
+    se calcula una vez y `assignable_memo` guarda resultados de
+    `is_assignable`; ambos se descartan al declarar una clase (la jerarquía
+    visible cambió).
+
+    Los miembros se resuelven con una tabla aplanada por clase (propios más
+    heredados, con la clase dueña) que se arma la primera vez que se consulta;
+    lo mismo para "tiene toString(): string". Ambas se descartan al declarar
+    una clase o al agregarle un miembro a cualquiera (`add_member`), porque
+    el cambio puede venir de una base. Con `cache_hierarchy = False` no se
+    cachea nada y cada consulta recorre la cadena de bases con resolve_class.
+    """
+    cache_hierarchy = True
+    ASSIGNABLE_MEMO_MAX = 4096
     def __init__(self):
-        self.globals: Dict[str, Any] = {}
-        self.scopes: List[Dict[str, Any]] = [self.globals]
+        self.globals = Scope({}, {}, {}, {})
+        self.scopes: List[Scope] = [self.globals]
         self.classes: Dict[str, ClassSymbol] = {}
         self.functions: Dict[str, FunctionSymbol] = {}
+        self._local_vars: Dict[str, List[VariableSymbol]] = {}
+        self._local_funcs: Dict[str, List[FunctionSymbol]] = {}
+        self._local_classes: Dict[str, List[ClassSymbol]] = {}
+        self._local_index = {"vars": self._local_vars, "funcs": self._local_funcs,
+                             "classes": self._local_classes}
+        self._ancestors: Dict[str, frozenset] = {}
+        self.assignable_memo: Optional[Dict[Tuple[Any, Any], bool]] = {} if self.cache_hierarchy else None
+        self._member_tables: Dict[str, Dict[str, Tuple[ClassMember, ClassSymbol]]] = {}
+        self._to_string: Dict[str, bool] = {}
 
     # Ámbitos
     def push_scope(self):
-        self.scopes.append({})
+        self.scopes.append(_EMPTY_SCOPE)
     def pop_scope(self):
-        self.scopes.pop()
-    def current_scope(self) -> Dict[str, Any]:
+        scope = self.scopes.pop()
+        if scope is _EMPTY_SCOPE:
+            return
+        if scope.vars:
+            _unindex(scope.vars, self._local_vars)
+        if scope.funcs:
+            _unindex(scope.funcs, self._local_funcs)
+        if scope.classes:
+            _unindex(scope.classes, self._local_classes)
+    def current_scope(self) -> Scope:
         return self.scopes[-1]
 
+    def _bind(self, kind: str, name: str, sym: Any) -> None:
+        # liga en el ámbito actual y, si es anidado, en el índice de su clase
+        scope = self.scopes[-1]
+        if scope is _EMPTY_SCOPE:
+            # primera definición del bloque: no hay nada que pisar
+            scope = self.scopes[-1] = Scope()
+            scope.symbols = {name: sym}
+            setattr(scope, kind, {name: sym})
+        elif scope is self.globals:
+            scope.define(kind, name, sym)
+            return
+        else:
+            old = scope.define(kind, name, sym)
+            if old is not None:
+                # lo pisado era lo más interno de su clase: sale del tope de su pila
+                for index in (self._local_vars, self._local_funcs, self._local_classes):
+                    stack = index.get(name)
+                    if stack and stack[-1] is old:
+                        stack.pop()
+                        if not stack:
+                            del index[name]
+                        break
+        index = self._local_index[kind]
+        stack = index.get(name)
+        if stack is None:
+            index[name] = [sym]
+        else:
+            stack.append(sym)
+
     # Definir/Resolver
     def define_var(self, sym: VariableSymbol) -> bool:
-        scope = self.current_scope()
-        if sym.name in scope:
+        if sym.name in self.scopes[-1].symbols:
             return False
-        scope[sym.name] = sym
+        self._bind("vars", sym.name, sym)
         return True
 
     def resolve_var(self, name: str) -> Optional[VariableSymbol]:
-        for scope in reversed(self.scopes):
-            sym = scope.get(name)
-            if isinstance(sym, VariableSymbol):
-                return sym
-        return None
+        stack = self._local_vars.get(name)
+        if stack:
+            return stack[-1]
+        return self.globals.vars.get(name)
 
     def define_func(self, f: FunctionSymbol) -> bool:
         if f.name in self.functions:
             return False
         self.functions[f.name] = f
-        self.current_scope()[f.name] = f
+        self._bind("funcs", f.name, f)
         return True
 
     def resolve_func(self, name: str) -> Optional[FunctionSymbol]:
         if name in self.functions:
             return self.functions[name]
-        for scope in reversed(self.scopes):
-            sym = scope.get(name)
-            if isinstance(sym, FunctionSymbol):
-                return sym
-        return None
+        stack = self._local_funcs.get(name)
+        if stack:
+            return stack[-1]
+        return self.globals.funcs.get(name)
 
     def define_class(self, c: ClassSymbol) -> bool:
         if c.name in self.classes:
             return False
         self.classes[c.name] = c
-        self.current_scope()[c.name] = c
+        self._bind("classes", c.name, c)
+        if self._ancestors:
+            self._ancestors.clear()
+        if self.assignable_memo:
+            self.assignable_memo.clear()
+        self._members_changed()
         return True
 
     def resolve_class(self, name: str) -> Optional[ClassSymbol]:
         if name in self.classes:
             return self.classes[name]
-        for scope in reversed(self.scopes):
-            sym = scope.get(name)
-            if isinstance(sym, ClassSymbol):
-                return sym
-        return None
+        stack = self._local_classes.get(name)
+        if stack:
+            return stack[-1]
+        return self.globals.classes.get(name)
+
+    # Subtipos
+    def ancestors(self, name: str) -> frozenset:
+        """
+        `name` y los nombres de toda su cadena de bases (declaradas o no). Una
+        herencia circular corta la cadena en vez de colgarse.
+        """
+        if self.cache_hierarchy:
+            names = self._ancestors.get(name)
+            if names is not None:
+                return names
+        seen = {name}
+        sc = self.resolve_class(name)
+        while sc and sc._base_name and sc._base_name not in seen:
+            seen.add(sc._base_name)
+            sc = self.resolve_class(sc._base_name)
+        names = frozenset(seen)
+        if self.cache_hierarchy:
+            self._ancestors[name] = names
+        return names
+
+    def is_subclass(self, source_cls: str, target_cls: str) -> bool:
+        return source_cls == target_cls or target_cls in self.ancestors(source_cls)
+
+    # Miembros
+    def add_member(self, c: ClassSymbol, member: ClassMember) -> None:
+        """
+        Agrega (o sobrescribe) un miembro de `c`. Los miembros se agregan por
+        acá para que las tablas aplanadas no queden viejas.
+        """
+        c.members[member.name] = member
+        self._members_changed()
+
+    def _members_changed(self) -> None:
+        if self._member_tables:
+            self._member_tables.clear()
+        if self._to_string:
+            self._to_string.clear()
+
+    def _base_chain(self, c: ClassSymbol) -> Iterator[ClassSymbol]:
+        # `c` y sus bases declaradas, de la más derivada a la raíz; un ciclo corta
+        seen = set()
+        while c is not None and c.name not in seen:
+            seen.add(c.name)
+            yield c
+            c = self.resolve_class(c._base_name) if c._base_name else None
+
+    def member_table(self, c: ClassSymbol) -> Dict[str, Tuple[ClassMember, ClassSymbol]]:
+        """
+        Todos los miembros visibles en `c`: nombre -> (miembro, clase dueña).
+        Un miembro propio tapa al heredado con el mismo nombre.
+        """
+        table = self._member_tables.get(c.name) if self.cache_hierarchy else None
+        if table is None:
+            table = {}
+            for cls in self._base_chain(c):
+                for name, member in cls.members.items():
+                    if name not in table:
+                        table[name] = (member, cls)
+            if self.cache_hierarchy:
+                self._member_tables[c.name] = table
+        return table
+
+    def resolve_member(self, c: ClassSymbol, name: str) -> Tuple[Optional[ClassMember], Optional[ClassSymbol]]:
+        if self.cache_hierarchy:
+            return self.member_table(c).get(name, _NO_MEMBER)
+        # sin caché: solo se consulta la cadena hasta la clase dueña
+        for cls in self._base_chain(c):
+            member = cls.members.get(name)
+            if member is not None:
+                return member, cls
+        return _NO_MEMBER
+
+    def has_to_string(self, name: str) -> bool:
+        """
+        Si la clase `name` o alguna de sus bases tiene `toString(): string` sin parámetros.
+        """
+        if self.cache_hierarchy:
+            found = self._to_string.get(name)
+            if found is not None:
+                return found
+        found = False
+        c = self.resolve_class(name)
+        if c is not None:
+            for cls in self._base_chain(c):
+                m = cls.members.get("toString")
+                if m is not None and m.is_method and not m.params and m.return_type == TypeKind.STRING:
+                    found = True
+                    break
+        if self.cache_hierarchy:
+            self._to_string[name] = found
+        return found
 
     def export_as_lines(self) -> List[str]:
         lines: List[str] = []
@@ -195,12 +518,75 @@ class SymbolTable:
         if isinstance(t, TypeKind): return t.name
         return str(t)
 
+def _accept_or_children(visitor, node):
+    if hasattr(node, "accept"):
+        return node.accept(visitor)
+    return visitor.visitChildren(node)
+
+def _simple_name(node) -> Optional[str]:
+    """
+    Texto del único token de `node` si el subárbol es una cadena de nodos de un
+    solo hijo que termina en un token (un identificador, `this`, un literal...);
+    si no, None. Reemplaza a mirar `node.getText()` sin armar el texto.
+    """
+    while node is not None:
+        children = getattr(node, "children", None)
+        if not children:
+            symbol = getattr(node, "symbol", None)      # TerminalNode
+            return symbol.text if symbol is not None else None
+        if len(children) != 1:
+            return None
+        node = children[0]
+    return None
+
+# Cadenas de operadores binarios: etiqueta -> (operador fijo o None si viene
+# en `op`, getter del hijo izquierdo, getter del derecho)
+_BINARY_RULES: Dict[str, Tuple[Optional[BinOp], str, str]] = {
+    "LogicalOrOpContext": (BinOp.OR, "logicalOrExpr", "logicalAndExpr"),
+    "LogicalAndOpContext": (BinOp.AND, "logicalAndExpr", "equalityExpr"),
+    "EqualityOpContext": (None, "equalityExpr", "relationalExpr"),
+    "RelationalOpContext": (None, "relationalExpr", "additiveExpr"),
+    "AdditiveOpContext": (None, "additiveExpr", "multiplicativeExpr"),
+    "MultiplicativeOpContext": (None, "multiplicativeExpr", "unaryExpr"),
+}
+_BINOPS: Dict[str, BinOp] = {op.value: op for op in BinOp}
+_PASSTHROUGH_CONTEXTS = frozenset((
+    "LogicalOrPassthroughContext", "LogicalAndPassthroughContext", "EqualityPassthroughContext",
+    "RelationalPassthroughContext", "AdditivePassthroughContext",
+    "MultiplicativePassthroughContext", "UnaryPassthroughContext",
+))
+
+class _IssueLimitReached(Exception):
+    """
+    Se agotó el presupuesto de errores (`max_errors` del visitor o del sink):
+    corta el recorrido hasta visitProgram.
+    """
+
+# Centinelas de `_walk`
+_DONE = object()      # el generador terminó
+_VISIT = object()     # nodo sin _walk*: visit() normal
+_UNWRAP = object()    # statement: se baja a su único hijo
+
 # ========================
 # Visitor semántico
 # ========================
 class SemanticVisitor(CompiscriptVisitor):
-    def __init__(self):
+    def __init__(self, collapse_passthroughs: bool = True, sink=None, max_errors: Optional[int] = None,
+                 suppress_cascades: bool = False):
+        self.collapse_passthroughs = collapse_passthroughs
+        self._dispatch = self._dispatch_tables[collapse_passthroughs]
         self.issues: List[SemanticIssue] = []
+        # con sink (ver src/sink/sink.py) cada error se emite al encontrarlo;
+        # al llegar a `max_errors` (o al llenarse el sink) el análisis del
+        # programa se corta (`truncated`)
+        self.sink = sink
+        self.max_errors = max_errors
+        self.truncated = False
+        # con suppress_cascades, un error causado por un operando ERROR en una
+        # sentencia que ya reportó algo se omite (y se cuenta en `suppressed`)
+        self.suppress_cascades = suppress_cascades
+        self.suppressed = 0
+        self._stmt_mark = 0          # len(issues) al empezar la sentencia actual
         self.symtab = SymbolTable()
         self.loop_depth: int = 0
         self.current_function: Optional[FunctionSymbol] = None
@@ -209,10 +595,31 @@ class SemanticVisitor(CompiscriptVisitor):
         self.in_constructor: bool = False
 
     # ---- utilidades
-    def error(self, ctx, msg: str):
+    def error(self, ctx, msg: str, *operands):
+        # `operands`: tipos de los que depende el error, para detectar cascadas
+        if operands and self.suppress_cascades and self._is_cascade(operands):
+            return
         line = getattr(ctx, "start", None).line if hasattr(ctx, "start") else -1
         col  = getattr(ctx, "start", None).column if hasattr(ctx, "start") else -1
-        self.issues.append(SemanticIssue(line, col, msg))
+        self._emit(SemanticIssue(line, col, msg))
+
+    def _is_cascade(self, operands) -> bool:
+        # un ERROR no siempre vino con su error (p. ej. un nombre sin declarar):
+        # solo es cascada si la sentencia ya reportó algo
+        if TypeKind.ERROR in operands and len(self.issues) > self._stmt_mark:
+            self.suppressed += 1
+            return True
+        return False
+
+    def _emit(self, issue: SemanticIssue):
+        self.issues.append(issue)
+        sink = self.sink
+        if sink is not None:
+            sink.emit("semantic", issue)
+            if sink.full:
+                raise _IssueLimitReached()
+        if self.max_errors is not None and len(self.issues) >= self.max_errors:
+            raise _IssueLimitReached()
 
     def expect_boolean(self, ctx, t: Any, where: str):
         if t != TypeKind.BOOLEAN and t != TypeKind.ERROR:
@@ -235,11 +642,8 @@ class SemanticVisitor(CompiscriptVisitor):
         return False
     
     def _type_of_simple_identifier(self, node, fallback_type):
-        try:
-            txt = node.getText()
-        except Exception:
-            return fallback_type
-        if not txt or any(ch in txt for ch in ".([)]"):
+        txt = _simple_name(node)
+        if not txt:
             return fallback_type
 
         # variable/parámetro
@@ -257,15 +661,12 @@ class SemanticVisitor(CompiscriptVisitor):
     
     def _type_of_simple_identifier_var_only(self, node, fallback_type):
         """
-        Si `node` textual es un identificador simple (sin '.', '(', '['),
-        devuelve el tipo de la variable/parámetro en el scope, si existe.
+        Si `node` es un identificador simple (sin '.', '(', '['), devuelve el
+        tipo de la variable/parámetro en el scope, si existe.
         No intenta resolver miembros de clase.
         """
-        try:
-            txt = node.getText()
-        except Exception:
-            return fallback_type
-        if not txt or any(ch in txt for ch in ".([)]"):
+        txt = _simple_name(node)
+        if not txt:
             return fallback_type
         var = self.symtab.resolve_var(txt)
         return var.type if var else fallback_type
@@ -275,17 +676,26 @@ class SemanticVisitor(CompiscriptVisitor):
     # ========================
     # program / block / statements
     # ========================
+    # Las sentencias que contienen bloques se recorren con `_walk` (pila
+    # explícita): cada _walk<Etiqueta> es un generador que hace sus chequeos y
+    # entrega (yield) sus sentencias/bloques hijos en orden.
     def visitProgram(self, ctx):
-        for st in ctx.statement():
-            self.visit(st)
-        return None
+        try:
+            return self._walk(ctx)
+        except _IssueLimitReached:
+            self.truncated = True
+            return None
+
+    def _walkProgram(self, ctx):
+        yield from ctx.statement()
 
     def visitBlock(self, ctx):
+        return self._walk(ctx)
+
+    def _walkBlock(self, ctx):
         self.symtab.push_scope()
-        for st in ctx.statement():
-            self.visit(st)
+        yield from ctx.statement()
         self.symtab.pop_scope()
-        return None
 
     # variableDeclaration: ('let' | 'var') Identifier typeAnnotation? initializer? ';'
     def visitVariableDeclaration(self, ctx):
@@ -299,7 +709,7 @@ class SemanticVisitor(CompiscriptVisitor):
             if vtype == TypeKind.ERROR and init_t is not None:
                 vtype = init_t
         if init_t is not None and not self.is_assignable(vtype, init_t):
-            self.error(ctx, f"No se puede asignar {self.symtab._tname(init_t)} a variable {name}: {self.symtab._tname(vtype)}.")
+            self.error(ctx, f"No se puede asignar {self.symtab._tname(init_t)} a variable {name}: {self.symtab._tname(vtype)}.", init_t)
         if not self.symtab.define_var(VariableSymbol(name, vtype, is_const=False)):
             self.error(ctx, f"Variable '{name}' ya está definida en este ámbito.")
         return None
@@ -313,7 +723,7 @@ class SemanticVisitor(CompiscriptVisitor):
         if vtype == TypeKind.ERROR:
             vtype = rhs_t
         if not self.is_assignable(vtype, rhs_t):
-            self.error(ctx, f"No se puede inicializar const {name}: se esperaba {self.symtab._tname(vtype)}, llegó {self.symtab._tname(rhs_t)}.")
+            self.error(ctx, f"No se puede inicializar const {name}: se esperaba {self.symtab._tname(vtype)}, llegó {self.symtab._tname(rhs_t)}.", rhs_t)
         if not self.symtab.define_var(VariableSymbol(name, vtype, is_const=True)):
             self.error(ctx, f"Constante '{name}' ya está definida en este ámbito.")
         return None
@@ -331,13 +741,13 @@ class SemanticVisitor(CompiscriptVisitor):
                 return var.type
             rhs_t = self.visit(ctx.expression(0))
             if not self.is_assignable(var.type, rhs_t):
-                self.error(ctx, f"Tipos incompatibles en asignación: {self.symtab._tname(var.type)} = {self.symtab._tname(rhs_t)}.")
+                self.error(ctx, f"Tipos incompatibles en asignación: {self.symtab._tname(var.type)} = {self.symtab._tname(rhs_t)}.", var.type, rhs_t)
             return var.type
         else:
             # asignación a propiedad: expr '.' Id '=' expr ';'
             recv_t = self.visit(ctx.expression(0))
             if not is_object(recv_t):
-                self.error(ctx, "Asignación a propiedad requiere objeto a la izquierda del '.'.")
+                self.error(ctx, "Asignación a propiedad requiere objeto a la izquierda del '.'.", recv_t)
                 return TypeKind.ERROR
             csym = self.symtab.resolve_class(recv_t.class_name)
             if not csym:
@@ -358,7 +768,7 @@ class SemanticVisitor(CompiscriptVisitor):
             # rhs_t = self._type_of_simple_identifier(ctx.expression(1), rhs_t)
 
             if not self.is_assignable(member.type, rhs_t):
-                self.error(ctx, f"Tipos incompatibles al asignar {mname}: {self.symtab._tname(member.type)} = {self.symtab._tname(rhs_t)}.")
+                self.error(ctx, f"Tipos incompatibles al asignar {mname}: {self.symtab._tname(member.type)} = {self.symtab._tname(rhs_t)}.", member.type, rhs_t)
             return member.type
 
 
@@ -373,30 +783,39 @@ class SemanticVisitor(CompiscriptVisitor):
 
     # if/while/do-while/for/foreach
     def visitIfStatement(self, ctx):
+        return self._walk(ctx)
+
+    def _walkIfStatement(self, ctx):
         cond_t = self.visit(ctx.expression())
         self.expect_boolean(ctx, cond_t, "if")
         blocks = ctx.block()
-        if len(blocks) >= 1: self.visit(blocks[0])
-        if len(blocks) == 2: self.visit(blocks[1])
-        return None
+        if len(blocks) >= 1: yield blocks[0]
+        if len(blocks) == 2: yield blocks[1]
 
     def visitWhileStatement(self, ctx):
+        return self._walk(ctx)
+
+    def _walkWhileStatement(self, ctx):
         cond_t = self.visit(ctx.expression())
         self.expect_boolean(ctx, cond_t, "while")
         self.loop_depth += 1
-        self.visit(ctx.block())
+        yield ctx.block()
         self.loop_depth -= 1
-        return None
 
     def visitDoWhileStatement(self, ctx):
+        return self._walk(ctx)
+
+    def _walkDoWhileStatement(self, ctx):
         self.loop_depth += 1
-        self.visit(ctx.block())
+        yield ctx.block()
         self.loop_depth -= 1
         cond_t = self.visit(ctx.expression())
         self.expect_boolean(ctx, cond_t, "do-while")
-        return None
 
     def visitForStatement(self, ctx):
+        return self._walk(ctx)
+
+    def _walkForStatement(self, ctx):
         if ctx.variableDeclaration():
             self.visit(ctx.variableDeclaration())
         elif ctx.assignment():
@@ -409,24 +828,25 @@ class SemanticVisitor(CompiscriptVisitor):
         if ctx.expression(1):
             self.visit(ctx.expression(1))
         self.loop_depth += 1
-        self.visit(ctx.block())
+        yield ctx.block()
         self.loop_depth -= 1
-        return None
 
     def visitForeachStatement(self, ctx):
+        return self._walk(ctx)
+
+    def _walkForeachStatement(self, ctx):
         coll_t = self.visit(ctx.expression())
         elem_t = self.array_element_type_of(coll_t)
         if elem_t is None:
-            self.error(ctx, "foreach requiere un arreglo como colección.")
+            self.error(ctx, "foreach requiere un arreglo como colección.", coll_t)
             elem_t = TypeKind.ERROR
         self.symtab.push_scope()
         it_name = ctx.Identifier().getText()
         self.symtab.define_var(VariableSymbol(it_name, elem_t, is_const=False))
         self.loop_depth += 1
-        self.visit(ctx.block())
+        yield ctx.block()
         self.loop_depth -= 1
         self.symtab.pop_scope()
-        return None
 
     def visitBreakStatement(self, ctx):
         if self.loop_depth == 0:
@@ -452,34 +872,39 @@ class SemanticVisitor(CompiscriptVisitor):
             else:
                 et = self.visit(expr_ctx)
                 if not self.is_assignable(self.current_function.return_type, et):
-                    self.error(ctx, f"Tipo de retorno incompatible: se esperaba {self.symtab._tname(self.current_function.return_type)}, se obtuvo {self.symtab._tname(et)}.")
+                    self.error(ctx, f"Tipo de retorno incompatible: se esperaba {self.symtab._tname(self.current_function.return_type)}, se obtuvo {self.symtab._tname(et)}.", et)
         self.current_function_has_return = True
         return None
 
     # switch/try-catch: validación mínima (visitar hijos)
     def visitSwitchStatement(self, ctx):
+        return self._walk(ctx)
+
+    def _walkSwitchStatement(self, ctx):
         self.visit(ctx.expression())
         for c in ctx.switchCase():
-            for st in c.statement():
-                self.visit(st)
+            yield from c.statement()
         if ctx.defaultCase():
-            for st in ctx.defaultCase().statement():
-                self.visit(st)
-        return None
+            yield from ctx.defaultCase().statement()
 
     def visitTryCatchStatement(self, ctx):
-        self.visit(ctx.block(0))
+        return self._walk(ctx)
+
+    def _walkTryCatchStatement(self, ctx):
+        yield ctx.block(0)
         self.symtab.push_scope()
         catch_id = ctx.Identifier().getText()
         self.symtab.define_var(VariableSymbol(catch_id, TypeKind.STRING, is_const=False))
-        self.visit(ctx.block(1))
+        yield ctx.block(1)
         self.symtab.pop_scope()
-        return None
 
     # ========================
     # Funciones
     # ========================
     def visitFunctionDeclaration(self, ctx):
+        return self._walk(ctx)
+
+    def _walkFunctionDeclaration(self, ctx):
         name = ctx.Identifier().getText()
         params: List[Tuple[str, Any]] = []
         if ctx.parameters():
@@ -500,13 +925,12 @@ class SemanticVisitor(CompiscriptVisitor):
         for pname, ptype in params:
             if not self.symtab.define_var(VariableSymbol(pname, ptype, is_const=False)):
                 self.error(ctx, f"Parámetro '{pname}' duplicado.")
-        self.visit(ctx.block())
+        yield ctx.block()
         self.symtab.pop_scope()
 
         if fsym.return_type != TypeKind.VOID and not self.current_function_has_return:
             self.error(ctx, f"La función '{name}' debe retornar {self.symtab._tname(ret_t)} en todos los caminos.")
         self.current_function, self.current_function_has_return = outer_fn, outer_has
-        return None
 
 
     # ========================
@@ -549,7 +973,7 @@ class SemanticVisitor(CompiscriptVisitor):
             if name in self.current_class.members:
                 self.error(ctx, f"Miembro duplicado '{name}'.")
             else:
-                self.current_class.members[name] = ClassMember(name=name, type=vtype, is_method=False)
+                self.symtab.add_member(self.current_class, ClassMember(name=name, type=vtype, is_method=False))
         elif ctx.constantDeclaration():
             cd = ctx.constantDeclaration()
             name = cd.Identifier().getText()
@@ -559,7 +983,7 @@ class SemanticVisitor(CompiscriptVisitor):
             if name in self.current_class.members:
                 self.error(ctx, f"Miembro duplicado '{name}'.")
             else:
-                self.current_class.members[name] = ClassMember(name=name, type=vtype, is_method=False)
+                self.symtab.add_member(self.current_class, ClassMember(name=name, type=vtype, is_method=False))
         return None
 
     def _declare_method(self, fd):
@@ -573,16 +997,16 @@ class SemanticVisitor(CompiscriptVisitor):
         ret_t = self.type_from_type(self._get_type_node(fd)) if (hasattr(fd, "type") or hasattr(fd, "type_")) else TypeKind.VOID
 
         # registra o sobrescribe (permitimos override simple)
-        self.current_class.members[mname] = ClassMember(
+        self.symtab.add_member(self.current_class, ClassMember(
             name=mname, type=TypeKind.VOID, is_method=True, params=params, return_type=ret_t
-        )
+        ))
 
         outer_fn, outer_has = self.current_function, self.current_function_has_return
         self.current_function, self.current_function_has_return = \
             FunctionSymbol(f"{self.current_class.name}.{mname}", params, ret_t), False
 
         self.symtab.push_scope()
-        self.symtab.define_var(VariableSymbol("this", ObjectType(self.current_class.name), is_const=True))
+        self.symtab.define_var(VariableSymbol("this", object_type(self.current_class.name), is_const=True))
         for pname, ptype in params:
             self.symtab.define_var(VariableSymbol(pname, ptype, is_const=False))
         self.visit(fd.block())
@@ -603,13 +1027,13 @@ class SemanticVisitor(CompiscriptVisitor):
         if "__ctor__" in self.current_class.members:
             self.error(fd, f"La clase '{self.current_class.name}' ya tiene constructor.")
         else:
-            self.current_class.members["__ctor__"] = ClassMember(
+            self.symtab.add_member(self.current_class, ClassMember(
                 name="__ctor__", type=TypeKind.VOID, is_method=True,
                 params=params, return_type=TypeKind.VOID
-            )
+            ))
         self.in_constructor = True
         self.symtab.push_scope()
-        self.symtab.define_var(VariableSymbol("this", ObjectType(self.current_class.name), is_const=True))
+        self.symtab.define_var(VariableSymbol("this", object_type(self.current_class.name), is_const=True))
         for pname, ptype in params:
             self.symtab.define_var(VariableSymbol(pname, ptype, is_const=False))
         self.visit(fd.block())
@@ -618,14 +1042,8 @@ class SemanticVisitor(CompiscriptVisitor):
 
 
     def _resolve_member(self, class_sym: ClassSymbol, name: str):
-        if name in class_sym.members:
-            return class_sym.members[name], class_sym
-        # subir por la cadena de herencia
-        if class_sym._base_name:
-            base = self.symtab.resolve_class(class_sym._base_name)
-            if base:
-                return self._resolve_member(base, name)
-        return None, None
+        # la clase y su cadena de herencia, vía la tabla aplanada de la clase
+        return self.symtab.resolve_member(class_sym, name)
 
     # ========================
     # Expresiones
@@ -640,8 +1058,7 @@ class SemanticVisitor(CompiscriptVisitor):
     # | lhs=leftHandSide '.' Identifier '=' assignmentExpr # PropertyAssignExpr
     # | conditionalExpr                                # ExprNoAssign
     def visitAssignExpr(self, ctx):
-        _ = self.visit(ctx.leftHandSide())  # resuelve y anota _lhs_var si aplica
-        var = getattr(ctx.leftHandSide(), "_lhs_var", None)
+        _, var = self._visit_chain(ctx.leftHandSide())
         rhs_t = self.visit(ctx.assignmentExpr())
         if var is None:
             self.error(ctx, "Lado izquierdo de '=' no es una variable asignable.")
@@ -650,14 +1067,14 @@ class SemanticVisitor(CompiscriptVisitor):
             self.error(ctx, f"No se puede asignar a constante '{var.name}'.")
             return var.type
         if not self.is_assignable(var.type, rhs_t):
-            self.error(ctx, f"Tipos incompatibles en asignación: {self.symtab._tname(var.type)} = {self.symtab._tname(rhs_t)}.")
+            self.error(ctx, f"Tipos incompatibles en asignación: {self.symtab._tname(var.type)} = {self.symtab._tname(rhs_t)}.", var.type, rhs_t)
         return var.type
 
 
     def visitPropertyAssignExpr(self, ctx):
         base_t = self.visit(ctx.leftHandSide())
         if not is_object(base_t):
-            self.error(ctx, "Asignación a propiedad requiere objeto a la izquierda del '.'.")
+            self.error(ctx, "Asignación a propiedad requiere objeto a la izquierda del '.'.", base_t)
             return TypeKind.ERROR
         csym = self.symtab.resolve_class(base_t.class_name)
         if not csym:
@@ -675,7 +1092,7 @@ class SemanticVisitor(CompiscriptVisitor):
         rhs_t = self._type_of_simple_identifier_var_only(ctx.assignmentExpr(), rhs_t)
         # rhs_t = self._type_of_simple_identifier(ctx.assignmentExpr(), rhs_t)
         if not self.is_assignable(member.type, rhs_t):
-            self.error(ctx, f"Tipos incompatibles al asignar {mname}: {self.symtab._tname(member.type)} = {self.symtab._tname(rhs_t)}.")
+            self.error(ctx, f"Tipos incompatibles al asignar {mname}: {self.symtab._tname(member.type)} = {self.symtab._tname(rhs_t)}.", member.type, rhs_t)
         return member.type
 
     def visitExprNoAssign(self, ctx):
@@ -707,64 +1124,80 @@ class SemanticVisitor(CompiscriptVisitor):
     def visitMultiplicativePassthrough(self, ctx): return self.visit(ctx.unaryExpr())
     def visitUnaryPassthrough(self, ctx):      return self.visit(ctx.primaryExpr())
 
-    # Operadores
-    def visitLogicalOrOp(self, ctx):
-        lt = self.visit(ctx.logicalOrExpr())
-        rt = self.visit(ctx.logicalAndExpr())
-        if lt != TypeKind.BOOLEAN or rt != TypeKind.BOOLEAN:
-            self.error(ctx, f"Operación lógica requiere booleanos, no {self.symtab._tname(lt)} y {self.symtab._tname(rt)}.")
-            return TypeKind.ERROR
-        return TypeKind.BOOLEAN
-
-    def visitLogicalAndOp(self, ctx):
-        lt = self.visit(ctx.logicalAndExpr())
-        rt = self.visit(ctx.equalityExpr())
-        if lt != TypeKind.BOOLEAN or rt != TypeKind.BOOLEAN:
-            self.error(ctx, f"Operación lógica requiere booleanos, no {self.symtab._tname(lt)} y {self.symtab._tname(rt)}.")
-            return TypeKind.ERROR
-        return TypeKind.BOOLEAN
-
-    def visitEqualityOp(self, ctx):
-        lt = self.visit(ctx.equalityExpr())
-        rt = self.visit(ctx.relationalExpr())
-        return TypeKind.BOOLEAN if same_type(lt, rt) or TypeKind.STRING in (lt, rt) else TypeKind.BOOLEAN
+    # Operadores: las cadenas (recursivas por la izquierda) se recorren con un
+    # bucle por la espina izquierda, así `a + a + ... + a` no gasta un frame
+    # de Python por operador.
+    def visitLogicalOrOp(self, ctx):     return self._visit_binary(ctx)
+    def visitLogicalAndOp(self, ctx):    return self._visit_binary(ctx)
+    def visitEqualityOp(self, ctx):      return self._visit_binary(ctx)
+    def visitRelationalOp(self, ctx):    return self._visit_binary(ctx)
+    def visitAdditiveOp(self, ctx):      return self._visit_binary(ctx)
+    def visitMultiplicativeOp(self, ctx): return self._visit_binary(ctx)
+
+    def _visit_binary(self, ctx):
+        spine = []
+        node = ctx
+        hook = self._node_hook
+        while True:
+            name = type(node).__name__
+            rule = _BINARY_RULES.get(name)
+            if rule is not None:
+                if hook is not None and spine:
+                    hook(node)
+                spine.append((node, rule))
+                node = getattr(node, rule[1])()
+            elif name in _PASSTHROUGH_CONTEXTS and node.getChildCount() == 1:
+                node = node.children[0]
+            else:
+                break
+        t = self.visit(node)
+        # de adentro hacia afuera: izquierda ya calculada, derecha y chequeo del operador
+        for c, (op, _left, right) in reversed(spine):
+            rt = self.visit(getattr(c, right)())
+            t = self._binary_type(c, op if op is not None else _BINOPS[c.op.text], t, rt)
+        return t
 
-    def visitRelationalOp(self, ctx):
-        lt = self.visit(ctx.relationalExpr())
-        rt = self.visit(ctx.additiveExpr())
-        if not (TypeKind.is_numeric(lt) and TypeKind.is_numeric(rt)):
-            self.error(ctx, f"Comparación relacional requiere numéricos, no {self.symtab._tname(lt)} y {self.symtab._tname(rt)}.")
-        return TypeKind.BOOLEAN
-
-    def visitAdditiveOp(self, ctx):
-        lt = self.visit(ctx.additiveExpr())
-        rt = self.visit(ctx.multiplicativeExpr())
-        op = ctx.op.text
-        if op == '+' and (self._behaves_as_string(lt) or self._behaves_as_string(rt)):
+    def _binary_type(self, node, op, lt, rt):
+        if op in LOGICAL_OPS:
+            if lt != TypeKind.BOOLEAN or rt != TypeKind.BOOLEAN:
+                self.error(node, f"Operación lógica requiere booleanos, no {self.symtab._tname(lt)} y {self.symtab._tname(rt)}.", lt, rt)
+                return TypeKind.ERROR
+            return TypeKind.BOOLEAN
+        if op in EQUALITY_OPS:
+            return TypeKind.BOOLEAN
+        if op in RELATIONAL_OPS:
+            if not (TypeKind.is_numeric(lt) and TypeKind.is_numeric(rt)):
+                self.error(node, f"Comparación relacional requiere numéricos, no {self.symtab._tname(lt)} y {self.symtab._tname(rt)}.", lt, rt)
+            return TypeKind.BOOLEAN
+        if op is BinOp.ADD and (self._behaves_as_string(lt) or self._behaves_as_string(rt)):
             return TypeKind.STRING
+        # aditivos y multiplicativos
         if not (TypeKind.is_numeric(lt) and TypeKind.is_numeric(rt)):
-            self.error(ctx, f"Operación aritmética requiere numéricos, no {self.symtab._tname(lt)} y {self.symtab._tname(rt)}.")
-            return TypeKind.ERROR
-        return TypeKind.common_numeric(lt, rt)
-
-    def visitMultiplicativeOp(self, ctx):
-        lt = self.visit(ctx.multiplicativeExpr())
-        rt = self.visit(ctx.unaryExpr())
-        if not (TypeKind.is_numeric(lt) and TypeKind.is_numeric(rt)):
-            self.error(ctx, f"Operación aritmética requiere numéricos, no {self.symtab._tname(lt)} y {self.symtab._tname(rt)}.")
+            self.error(node, f"Operación aritmética requiere numéricos, no {self.symtab._tname(lt)} y {self.symtab._tname(rt)}.", lt, rt)
             return TypeKind.ERROR
         return TypeKind.common_numeric(lt, rt)
 
     def visitUnaryOp(self, ctx):
-        t = self.visit(ctx.unaryExpr())
-        if ctx.op.text == '!':
+        # '!!!x' / '- - x': bucle sobre la cadena de unarios
+        ops = []
+        node = ctx
+        while type(node).__name__ == "UnaryOpContext":
+            ops.append(node)
+            node = node.unaryExpr()
+        t = self.visit(node)
+        for c in reversed(ops):
+            t = self._unary_type(c, UnaryOp.NOT if c.op.text == '!' else UnaryOp.NEG, t)
+        return t
+
+    def _unary_type(self, node, op, t):
+        if op is UnaryOp.NOT:
             if t != TypeKind.BOOLEAN:
-                self.error(ctx, f"'!' requiere booleano, no {self.symtab._tname(t)}.")
+                self.error(node, f"'!' requiere booleano, no {self.symtab._tname(t)}.", t)
                 return TypeKind.ERROR
             return TypeKind.BOOLEAN
         # '-' unario
         if not TypeKind.is_numeric(t):
-            self.error(ctx, f"Negación numérica requiere numérico, no {self.symtab._tname(t)}.")
+            self.error(node, f"Negación numérica requiere numérico, no {self.symtab._tname(t)}.", t)
             return TypeKind.ERROR
         return t
 
@@ -783,14 +1216,14 @@ class SemanticVisitor(CompiscriptVisitor):
     def visitLiteralExpr(self, ctx):
         if ctx.arrayLiteral():
             return self.visit(ctx.arrayLiteral())
-        if ctx.getText() == "null":
+        # un solo token: 'null' | 'true' | 'false' | Literal
+        text = ctx.start.text
+        if text == "null":
             return TypeKind.NULL
-        if ctx.getText() == "true" or ctx.getText() == "false":
+        if text == "true" or text == "false":
             return TypeKind.BOOLEAN
         # Literal → IntegerLiteral | StringLiteral
-        lit = ctx.Literal()
-        if lit is not None:
-            text = lit.getText()
+        if ctx.Literal() is not None:
             if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
                 return TypeKind.STRING
             return TypeKind.INTEGER
@@ -798,56 +1231,69 @@ class SemanticVisitor(CompiscriptVisitor):
 
     # leftHandSide: primaryAtom (suffixOp)*
     def visitLeftHandSide(self, ctx):
-        cur_t = self.visit(ctx.primaryAtom())
+        return self._visit_chain(ctx)[0]
 
-        # si el primary era un identificador variable, adjunta al LHS
+    def _visit_chain(self, ctx) -> Tuple[Any, Optional[VariableSymbol]]:
+        """
+        Recorre átomo + sufijos y retorna (tipo, variable asignable o None).
+        El tipo del receptor y el último manejador de método se pasan
+        explícitos por la cadena (nada se anota en los nodos), así cada sufijo
+        cuesta lo mismo sin importar el largo de la cadena.
+        """
         prim = ctx.primaryAtom()
-        if hasattr(prim, "_resolved_var"):
-            setattr(ctx, "_lhs_var", getattr(prim, "_resolved_var"))
+        hook = self._node_hook
+        lhs_var: Optional[VariableSymbol] = None
+        as_func: Optional[FunctionSymbol] = None
+        if type(prim).__name__ == "IdentifierExprContext":
+            if hook is not None:
+                hook(prim)
+            cur_t, lhs_var, as_func = self._visit_identifier(prim)
+        else:
+            cur_t = self.visit(prim)
 
+        handle = None
         for sfx in ctx.suffixOp():
-            head = sfx.getChild(0).getText()
-            if head == '.':  # PropertyAccessExpr
-                setattr(sfx, "_lhs_type", cur_t)
-                cur_t = self.visit(sfx)
-                # si accedimos a un campo (no método), perdería _lhs_var (ya no es asignable directo)
-                if hasattr(ctx, "_lhs_var"):
-                    delattr(ctx, "_lhs_var")
-            elif head == '[':  # IndexExpr
-                setattr(sfx, "_lhs_type", cur_t)
-                cur_t = self.visit(sfx)
-                if hasattr(ctx, "_lhs_var"):
-                    delattr(ctx, "_lhs_var")
+            if hook is not None:
+                hook(sfx)
+            # un sufijo ya no es una variable asignable directa
+            lhs_var = None
+            kind = type(sfx).__name__
+            if kind == "PropertyAccessExprContext":
+                cur_t, h = self._visit_member(sfx, cur_t)
+                if h is not None:
+                    handle = h
+            elif kind == "IndexExprContext":
+                cur_t = self._visit_index(sfx, cur_t)
             else:  # CallExpr
-                # llamada: ¿función global guardada en primary?
-                if hasattr(prim, "_as_func"):
-                    setattr(sfx, "_callee_info", prim._as_func)
+                # ¿función global en el átomo, método recién accedido o el último manejador?
+                if as_func is not None:
+                    callee = as_func
                 elif isinstance(cur_t, ClassMember) and cur_t.is_method:
-                    setattr(sfx, "_callee_info", ("method", None, cur_t))
+                    callee = ("method", None, cur_t)
                 else:
-                    setattr(sfx, "_callee_info", None)
-                cur_t = self.visit(sfx)
-                if hasattr(ctx, "_lhs_var"):
-                    delattr(ctx, "_lhs_var")
-        return cur_t
+                    callee = handle
+                cur_t = self._visit_call(sfx, callee)
+        return cur_t, lhs_var
 
     def visitIdentifierExpr(self, ctx):
+        return self._visit_identifier(ctx)[0]
+
+    def _visit_identifier(self, ctx) -> Tuple[Any, Optional[VariableSymbol], Optional[FunctionSymbol]]:
+        # (tipo, variable, función global que un CallExpr posterior puede invocar)
         name = ctx.Identifier().getText()
         # 1) variable local / parámetro (si no existe -> None)
         var = self.symtab.resolve_var(name)
         if var:
-            setattr(ctx, "_resolved_var", var)  # útil para LHS asignable en leftHandSide
-            return var.type
+            return var.type, var, None
 
         # 2) función global (permitir que un posterior CallExpr la invoque)
         f = self.symtab.resolve_func(name)
         if f:
-            setattr(ctx, "_as_func", f)
-            return TypeKind.ERROR
+            return TypeKind.ERROR, None, f
 
         # 3) nada más: NO resolvemos implícitamente campos de clase aquí
         #    (para acceder a un campo requiere 'this.nombre' o 'obj.nombre')
-        return TypeKind.ERROR
+        return TypeKind.ERROR, None, None
 
 
     def visitNewExpr(self, ctx):
@@ -867,7 +1313,7 @@ class SemanticVisitor(CompiscriptVisitor):
         if ctor:
             expected = ctor.params or []
             self._check_args(ctx, expected, arg_types, f"{cname}.constructor")
-            return ObjectType(cname)
+            return object_type(cname)
 
         # 2) si no hay, busca en la base
         base_name = csym._base_name
@@ -885,82 +1331,75 @@ class SemanticVisitor(CompiscriptVisitor):
 
         if ctor is None and arg_types:
             self.error(ctx, f"'{cname}' no tiene constructor que acepte argumentos.")
-        return ObjectType(cname)
+        return object_type(cname)
 
 
     def visitThisExpr(self, ctx):
         if self.current_class is None:
             self.error(ctx, "Uso de 'this' fuera de método/constructor.")
             return TypeKind.ERROR
-        return ObjectType(self.current_class.name)
+        return object_type(self.current_class.name)
 
     # suffixOp:
     #   '(' arguments? ')'                        # CallExpr
     # | '[' expression ']'                        # IndexExpr
     # | '.' Identifier                            # PropertyAccessExpr
+    # Se chequean desde _visit_chain, que les pasa el receptor/callee; un
+    # sufijo visitado suelto no tiene receptor.
     def visitCallExpr(self, ctx):
+        return self._visit_call(ctx, None)
+
+    def visitIndexExpr(self, ctx):
+        return self._visit_index(ctx, None)
+
+    def visitPropertyAccessExpr(self, ctx):
+        return self._visit_member(ctx, None)[0]
+
+    def _visit_call(self, ctx, callee):
         args_types: List[Any] = []
         if ctx.arguments():
             for e in ctx.arguments().expression():
                 args_types.append(self.visit(e))
 
-        callee_info = getattr(ctx, "_callee_info", None)
+        if isinstance(callee, FunctionSymbol):
+            self._check_args(ctx, callee.params, args_types, callee.name)
+            return callee.return_type
 
-        if isinstance(callee_info, FunctionSymbol):
-            fsym = callee_info
-            self._check_args(ctx, fsym.params, args_types, fsym.name)
-            return fsym.return_type
-
-        if isinstance(callee_info, tuple) and callee_info and callee_info[0] == "method":
-            (_tag, class_sym, member) = callee_info
+        if callee is not None:
+            (_tag, class_sym, member) = callee
             self._check_args(ctx, member.params or [], args_types, f"{(class_sym.name if class_sym else '?')}.{member.name}")
             return member.return_type or TypeKind.VOID
 
-        # También puede venir desde PropertyAccessExpr que guardó _member_handle
-        parent = ctx.parentCtx
-        handle = None
-        for i in range(parent.getChildCount()):
-            ch = parent.getChild(i)
-            h = getattr(ch, "_member_handle", None)
-            if h: handle = h
-        if handle:
-            (_tag, class_sym, member) = handle
-            self._check_args(ctx, member.params or [], args_types, f"{class_sym.name}.{member.name}")
-            return member.return_type or TypeKind.VOID
-
         self.error(ctx, "Llamada sin callee resoluble.")
         return TypeKind.ERROR
 
-    def visitIndexExpr(self, ctx):
-        base_t = getattr(ctx, "_lhs_type", None)
+    def _visit_index(self, ctx, base_t):
         idx_t = self.visit(ctx.expression())
         if idx_t != TypeKind.INTEGER:
-            self.error(ctx, "El índice de un arreglo debe ser integer.")
+            self.error(ctx, "El índice de un arreglo debe ser integer.", idx_t)
         et = elem_type_of(base_t)
         if et is None:
-            self.error(ctx, "Indexación sobre un no-arreglo.")
+            self.error(ctx, "Indexación sobre un no-arreglo.", base_t)
             return TypeKind.ERROR
         return et
 
-    def visitPropertyAccessExpr(self, ctx):
-        lhs_t = getattr(ctx, "_lhs_type", None)
+    def _visit_member(self, ctx, lhs_t):
         if not is_object(lhs_t):
-            self.error(ctx, "Acceso a miembro sobre algo que no es objeto.")
-            return TypeKind.ERROR
+            self.error(ctx, "Acceso a miembro sobre algo que no es objeto.", lhs_t)
+            return TypeKind.ERROR, None
         csym = self.symtab.resolve_class(lhs_t.class_name)
         if not csym:
             self.error(ctx, f"Clase '{lhs_t.class_name}' no está declarada.")
-            return TypeKind.ERROR
+            return TypeKind.ERROR, None
         mname = ctx.Identifier().getText()
         member, owner = self._resolve_member(csym, mname)
         if not member:
             self.error(ctx, f"'{lhs_t.class_name}' no tiene miembro '{mname}'.")
-            return TypeKind.ERROR
+            return TypeKind.ERROR, None
         if member.is_method:
-            # guardamos manejador para que el siguiente CallExpr lo resuelva
-            setattr(ctx, "_member_handle", ("method", owner, member))
-            return member  # placeholder para threading
-        return member.type
+            # el ClassMember viaja como "tipo" hasta el CallExpr siguiente
+            return member, ("method", owner, member)
+        return member.type, None
 
     # arguments: expression (',' expression)*
     # (se maneja dentro de visitCallExpr)
@@ -973,7 +1412,7 @@ class SemanticVisitor(CompiscriptVisitor):
         et = elems[0]
         for t in elems[1:]:
             if not same_type(t, et):
-                self.error(ctx, "Todos los elementos del arreglo deben ser del mismo tipo.")
+                self.error(ctx, "Todos los elementos del arreglo deben ser del mismo tipo.", t, et)
                 return array_of(TypeKind.ERROR)
         return array_of(et)
 
@@ -987,7 +1426,7 @@ class SemanticVisitor(CompiscriptVisitor):
         if tctx is None:
             return TypeKind.ERROR
         base_ctx = tctx.baseType()
-        base = base_ctx.getText() if base_ctx else ""
+        base = base_ctx.start.text if base_ctx else ""     # baseType es un solo token
         bl = base.lower()
         if bl == 'integer': cur: Any = TypeKind.INTEGER
         elif bl == 'boolean': cur = TypeKind.BOOLEAN
@@ -995,21 +1434,38 @@ class SemanticVisitor(CompiscriptVisitor):
         else:
             # Identificador de clase
             cls = self.symtab.resolve_class(base)
-            cur = ObjectType(base) if cls else TypeKind.ERROR
-        # contar '[]'
-        brackets = 0
-        for i in range(tctx.getChildCount()):
-            if tctx.getChild(i).getText() == '[':
-                brackets += 1
-        for _ in range(brackets):
+            cur = object_type(base) if cls else TypeKind.ERROR
+        # type: baseType ('[' ']')*  ->  cada par de hijos después del base es un '[]'
+        for _ in range((tctx.getChildCount() - 1) // 2):
             cur = array_of(cur)
         return cur
 
 
     def is_assignable(self, target: Any, source: Any) -> bool:
-        # arrays
+        if target is source:
+            return True
+        memo = self.symtab.assignable_memo
+        if memo is None:
+            return self._is_assignable(target, source)
+        key = (target, source)
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        except TypeError:           # placeholder no hasheable (método sin llamar)
+            return self._is_assignable(target, source)
+        result = self._is_assignable(target, source)
+        if len(memo) >= self.symtab.ASSIGNABLE_MEMO_MAX:
+            memo.clear()
+        memo[key] = result
+        return result
+
+    def _is_assignable(self, target: Any, source: Any) -> bool:
+        # arrays: misma cantidad de dimensiones y fondos asignables
         if is_array(target) and is_array(source):
-            return self.is_assignable(target.elem, source.elem)
+            if target.depth != source.depth:
+                return False
+            return self.is_assignable(target.base, source.base)
         if is_array(target) != is_array(source):
             return False
 
@@ -1034,44 +1490,130 @@ class SemanticVisitor(CompiscriptVisitor):
 
 
     def _has_to_string_method(self, cls_name: str) -> bool:
-        cls = self.symtab.resolve_class(cls_name)
-        while cls is not None:
-            m = cls.members.get("toString")
-            if m and getattr(m, "is_method", False):
-                # sin parámetros y retorno string
-                params = getattr(m, "params", None) or []
-                if len(params) == 0 and getattr(m, "return_type", None) == TypeKind.STRING:
-                    return True
-            # subir a la clase base
-            base = getattr(cls, "_base_name", None)
-            cls = self.symtab.resolve_class(base) if base else None
-        return False
+        # toString(): string sin parámetros, propio o heredado
+        return self.symtab.has_to_string(cls_name)
 
 
     def _is_class_assignable(self, target_cls: str, source_cls: str) -> bool:
-        if target_cls == source_cls:
-            return True
         # permitir asignación si source es subclase de target (subtyping)
-        sc = self.symtab.resolve_class(source_cls)
-        while sc and sc._base_name:
-            if sc._base_name == target_cls:
-                return True
-            sc = self.symtab.resolve_class(sc._base_name)
-        return False
+        return self.symtab.is_subclass(source_cls, target_cls)
 
     # ========================
     # Visit fallback
     # ========================
+    # Tablas de despacho: tipo de nodo -> función visit* de la clase.
+    # Son atributos de clase (cada subclase tiene las suyas), una por modo
+    # (con/sin colapso de passthroughs), y se llenan una sola vez por tipo de
+    # contexto, así `visit` no arma nombres ni hace doble despacho.
+    _dispatch_tables: Dict[bool, Dict[type, Any]] = {True: {}, False: {}}
+    # tipo de nodo -> generador _walk* (o _VISIT / _UNWRAP), también por clase
+    _walkers: Dict[type, Any] = {}
+    # si no es None, se llama con cada nodo que `_walk`/los bucles de
+    # operadores procesan sin pasar por visit() (lo usa stats.instrument)
+    _node_hook: Optional[Callable[[Any], None]] = None
+
+    # Etiquetas cuyo visit* solo reenvía a su único hijo; con el colapso activo
+    # se saltan en bloque (Expression -> ... -> LiteralPrimary) en una sola llamada.
+    # TernaryExpr solo es passthrough cuando no tiene '?' (un hijo).
+    _PASSTHROUGH_LABELS = (
+        "Expression", "ExprNoAssign", "TernaryExpr",
+        "LogicalOrPassthrough", "LogicalAndPassthrough", "EqualityPassthrough",
+        "RelationalPassthrough", "AdditivePassthrough", "MultiplicativePassthrough",
+        "UnaryPassthrough", "LiteralPrimary", "LeftHandSidePrimary",
+    )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch_tables = {True: {}, False: {}}
+        cls._walkers = {}
+
+    @classmethod
+    def _handler_for(cls, node_type: type, collapse: bool):
+        name = node_type.__name__
+        if name.endswith("Context"):
+            # mismo criterio que el accept() generado: visit<Etiqueta> o visitChildren
+            label = name[:-len("Context")]
+            fn = getattr(cls, f"visit{label}", None)
+            if not callable(fn):
+                fn = cls.visitChildren
+            elif (collapse and label in cls._PASSTHROUGH_LABELS
+                  and fn is getattr(SemanticVisitor, f"visit{label}")):
+                # solo si la subclase no redefinió el passthrough
+                fn = SemanticVisitor._visit_collapsed
+        else:
+            # terminales u otros nodos: que decidan ellos
+            fn = _accept_or_children
+        cls._dispatch_tables[collapse][node_type] = fn
+        return fn
+
     def visit(self, node):
         if node is None:
             return None
-        mname = f"visit{type(node).__name__}"
-        m = getattr(self, mname, None)
-        if callable(m):
-            return m(node)
-        if hasattr(node, "accept"):
-            return node.accept(self)
-        return self.visitChildren(node)
+        fn = self._dispatch.get(type(node))
+        if fn is None:
+            fn = self._handler_for(type(node), self.collapse_passthroughs)
+        return fn(self, node)
+
+    @classmethod
+    def _walker_for(cls, node_type: type):
+        name = node_type.__name__
+        label = name[:-len("Context")] if name.endswith("Context") else name
+        if label == "Statement":
+            fn = _UNWRAP
+        else:
+            fn = getattr(cls, f"_walk{label}", None) or _VISIT
+        cls._walkers[node_type] = fn
+        return fn
+
+    def _walk(self, node):
+        """
+        Recorre `node` (una sentencia con _walk*) y todo lo anidado con una
+        pila explícita de generadores en vez de recursión: la profundidad de
+        bloques/if/while/funciones no gasta frames de Python. Lo que no tiene
+        _walk* (declaraciones, expresiones...) se visita con visit().
+        """
+        walkers = self._walkers
+        hook = self._node_hook
+        stack = [(walkers.get(type(node)) or self._walker_for(type(node)))(self, node)]
+        while stack:
+            child = next(stack[-1], _DONE)
+            if child is _DONE:
+                stack.pop()
+                continue
+            self._stmt_mark = len(self.issues)
+            fn = walkers.get(type(child)) or self._walker_for(type(child))
+            while fn is _UNWRAP:
+                # statement: un solo hijo con la sentencia concreta
+                if hook is not None:
+                    hook(child)
+                child = child.children[0] if child.children else None
+                fn = walkers.get(type(child)) or self._walker_for(type(child))
+            if fn is _VISIT:
+                self.visit(child)
+            else:
+                if hook is not None:
+                    hook(child)
+                stack.append(fn(self, child))
+        return None
+
+    def _visit_collapsed(self, node):
+        # baja por la cadena de passthroughs hasta el primer nodo con operador real
+        dispatch = self._dispatch
+        collapsed = SemanticVisitor._visit_collapsed
+        while True:
+            children = node.children
+            if not children or len(children) != 1:
+                # ternario con '?' o árbol recuperado de un error: visit* normal
+                plain = self._dispatch_tables[False].get(type(node))
+                if plain is None:
+                    plain = self._handler_for(type(node), False)
+                return plain(self, node)
+            node = children[0]
+            fn = dispatch.get(type(node))
+            if fn is None:
+                fn = self._handler_for(type(node), True)
+            if fn is not collapsed:
+                return fn(self, node)
 
     # ========================
     # Helpers de argumentos
@@ -1082,4 +1624,4 @@ class SemanticVisitor(CompiscriptVisitor):
             return
         for i, ((_, pt), at) in enumerate(zip(expected_params, args_types), 1):
             if not self.is_assignable(pt, at):
-                self.error(ctx, f"Argumento {i} incompatible en '{fname}': se esperaba {self.symtab._tname(pt)}, llegó {self.symtab._tname(at)}.")
\ No newline at end of file
+                self.error(ctx, f"Argumento {i} incompatible en '{fname}': se esperaba {self.symtab._tname(pt)}, llegó {self.symtab._tname(at)}.", at)
\ No newline at end of file
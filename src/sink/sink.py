@@ -0,0 +1,113 @@
+from __future__ import annotations
+import json
+from typing import Any, Callable, Optional, TextIO
+
+# ========================
+# Destinos de errores (sinks)
+# ========================
+# El parser (CollectingErrorListener) y los visitors semánticos le pasan cada
+# error a un sink en el momento en que lo encuentran, en lugar de esperar al
+# final del análisis:
+#
+#   sink = TextSink(sys.stderr, max_errors=20)
+#   result = parse_file(path, sink=sink)
+#   if not result.issues:
+#       run_semantic(result.tree, sink=sink)
+#   sink.finish(stage=result.stage)
+#
+# Con `max_errors`, el sink queda `full` al llegar al límite y quien emite
+# corta el análisis (el parser cancela el parseo, el visitor deja de
+# recorrer). Las listas `issues` de siempre se siguen llenando igual.
+#
+# `kind` es "syntax" o "semantic"; `issue` es un SyntaxIssue/SemanticIssue
+# (cualquier objeto con line, column y message).
+
+KIND_SYNTAX = "syntax"
+KIND_SEMANTIC = "semantic"
+
+
+class IssueSink:
+    """
+    Sink base: solo cuenta. Sirve tal cual para aplicar `max_errors` sin
+    imprimir nada (p. ej. en los workers de batch).
+    """
+
+    def __init__(self, max_errors: Optional[int] = None):
+        self.max_errors = max_errors
+        self.count = 0
+
+    @property
+    def full(self) -> bool:
+        return self.max_errors is not None and self.count >= self.max_errors
+
+    def emit(self, kind: str, issue: Any) -> None:
+        self.count += 1
+        self.write(kind, issue)
+
+    def write(self, kind: str, issue: Any) -> None:
+        pass
+
+    def finish(self, stage: Optional[str] = None) -> None:
+        """
+        Fin del análisis de un archivo; `stage` es la etapa en la que terminó el parseo.
+        """
+
+
+class CallbackSink(IssueSink):
+    """
+    Llama a `callback(kind, issue)` con cada error (IDE, tests, integraciones).
+    """
+
+    def __init__(self, callback: Callable[[str, Any], None], max_errors: Optional[int] = None):
+        super().__init__(max_errors)
+        self.callback = callback
+
+    def write(self, kind: str, issue: Any) -> None:
+        self.callback(kind, issue)
+
+
+class TextSink(IssueSink):
+    """
+    Mismo formato que Driver.py: un encabezado por tipo de error y una línea por error.
+    """
+    HEADS = {KIND_SYNTAX: "Errores de sintaxis:", KIND_SEMANTIC: "Errores semánticos:"}
+
+    def __init__(self, stream: TextIO, max_errors: Optional[int] = None):
+        super().__init__(max_errors)
+        self.stream = stream
+        self._kind: Optional[str] = None
+
+    def write(self, kind: str, issue: Any) -> None:
+        if kind != self._kind:
+            self._kind = kind
+            print(self.HEADS[kind], file=self.stream)
+        print(f"  línea {issue.line}, col {issue.column}: {issue.message}", file=self.stream, flush=True)
+
+    def finish(self, stage: Optional[str] = None) -> None:
+        if self.full:
+            print(f"  ... análisis cortado tras {self.count} errores (--max-errors)", file=self.stream)
+
+
+class JsonLinesSink(IssueSink):
+    """
+    Una línea JSON por error y, al terminar, una línea de resumen:
+        {"path": ..., "kind": "semantic", "line": 3, "column": 4, "message": ...}
+        {"path": ..., "kind": "summary", "stage": "SLL", "issues": 1, "truncated": false}
+    """
+
+    def __init__(self, stream: TextIO, path: str, max_errors: Optional[int] = None):
+        super().__init__(max_errors)
+        self.stream = stream
+        self.path = path
+
+    def _line(self, data) -> None:
+        self.stream.write(json.dumps(data, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def write(self, kind: str, issue: Any) -> None:
+        self._line({"path": self.path, "kind": kind, "line": issue.line, "column": issue.column,
+                    "message": issue.message})
+
+    def finish(self, stage: Optional[str] = None) -> None:
+        self._line({"path": self.path, "kind": "summary", "stage": stage, "issues": self.count,
+                    "truncated": self.full})
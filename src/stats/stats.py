@@ -0,0 +1,210 @@
+from __future__ import annotations
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from semantic.semantic import SymbolTable
+
+# ========================
+# Estadísticas de análisis (opt-in)
+# ========================
+# Cuánto tarda cada fase (lexer, parser SLL/LL, bajada al AST, semántica) y
+# qué hizo el visitor: nodos del árbol por tipo de contexto, llamadas a
+# visit() por tipo, push/pop de ámbitos y búsquedas resolve_* con la
+# profundidad a la que se encontró cada símbolo.
+#
+# Sin `stats` no se paga nada: parser y analysis solo miran el objeto cuando
+# se lo pasan, y el visitor se instrumenta por instancia (ver `instrument`).
+#
+#   stats = AnalysisStats()
+#   result = parse_file(path, stats=stats)
+#   visitor = run_semantic(result.tree, stats=stats)
+#   print("\n".join(stats.format_lines()))
+
+LOOKUP_KINDS = ("var", "func", "class")
+
+
+@dataclass
+class LookupStats:
+    count: int = 0
+    misses: int = 0
+    total_depth: int = 0      # solo de las búsquedas exitosas
+    max_depth: int = 0
+
+    @property
+    def mean_depth(self) -> float:
+        hits = self.count - self.misses
+        return self.total_depth / hits if hits else 0.0
+
+    def record(self, depth: Optional[int]) -> None:
+        self.count += 1
+        if depth is None:
+            self.misses += 1
+            return
+        self.total_depth += depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+
+@dataclass
+class AnalysisStats:
+    """
+    Contadores y tiempos de un análisis. `phases` está en segundos y en el
+    orden en que corrieron las fases; una fase repetida acumula.
+    """
+    phases: Dict[str, float] = field(default_factory=dict)
+    stage: Optional[str] = None
+    tokens: int = 0
+    nodes: Dict[str, int] = field(default_factory=Counter)
+    visits: Dict[str, int] = field(default_factory=Counter)
+    scope_pushes: int = 0
+    scope_pops: int = 0
+    max_scope_depth: int = 1
+    lookups: Dict[str, LookupStats] = field(default_factory=lambda: {k: LookupStats() for k in LOOKUP_KINDS})
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - t0
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.phases.values())
+
+    @property
+    def total_nodes(self) -> int:
+        return sum(self.nodes.values())
+
+    @property
+    def total_visits(self) -> int:
+        return sum(self.visits.values())
+
+    def count_tree(self, tree) -> None:
+        """
+        Cuenta los nodos de regla de un parse tree por tipo de contexto (sin recursión).
+        """
+        nodes = self.nodes
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            children = getattr(node, "children", None)
+            if children is None and not hasattr(node, "getRuleIndex"):
+                continue           # terminal
+            nodes[type(node).__name__] += 1
+            if children:
+                stack.extend(children)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["nodes"] = dict(self.nodes)
+        data["visits"] = dict(self.visits)
+        for kind, lookup in self.lookups.items():
+            data["lookups"][kind]["mean_depth"] = lookup.mean_depth
+        data["total_time"] = self.total_time
+        return data
+
+    def format_lines(self, top: int = 10) -> List[str]:
+        lines = ["== STATS =="]
+        for name, secs in self.phases.items():
+            lines.append(f"  {name:<14} {secs * 1000:9.2f} ms")
+        lines.append(f"  {'total':<14} {self.total_time * 1000:9.2f} ms")
+        lines.append(f"etapa: {self.stage or '-'}  tokens: {self.tokens}  nodos: {self.total_nodes}"
+                     f"  visitas: {self.total_visits}")
+        for title, counter in (("nodos por tipo", self.nodes), ("visitas por tipo", self.visits)):
+            if counter:
+                lines.append(f"{title} (top {top}):")
+                for name, n in Counter(counter).most_common(top):
+                    lines.append(f"  {name:<32} {n:>8}")
+        lines.append(f"ámbitos: {self.scope_pushes} push / {self.scope_pops} pop,"
+                     f" profundidad máx {self.max_scope_depth}")
+        for kind, lookup in self.lookups.items():
+            lines.append(f"resolve_{kind:<6} {lookup.count:>8} ({lookup.misses} sin resolver),"
+                         f" profundidad media {lookup.mean_depth:.2f}, máx {lookup.max_depth}")
+        return lines
+
+
+class StatsSymbolTable(SymbolTable):
+    """
+    SymbolTable que cuenta push/pop de ámbitos y búsquedas. La profundidad de
+    una búsqueda es cuántos ámbitos hay entre el actual (1) y el que tiene el
+    símbolo; las funciones/clases que solo están en los índices globales
+    cuentan como profundidad 0.
+    """
+
+    def __init__(self, stats: AnalysisStats):
+        super().__init__()
+        self.stats = stats
+
+    def push_scope(self):
+        super().push_scope()
+        stats = self.stats
+        stats.scope_pushes += 1
+        if len(self.scopes) > stats.max_scope_depth:
+            stats.max_scope_depth = len(self.scopes)
+
+    def pop_scope(self):
+        super().pop_scope()
+        self.stats.scope_pops += 1
+
+    def _depth_of(self, name: str, sym: Any) -> Optional[int]:
+        if sym is None:
+            return None
+        for depth, scope in enumerate(reversed(self.scopes), 1):
+            if scope.get(name) is sym:
+                return depth
+        return 0
+
+    def resolve_var(self, name: str):
+        sym = super().resolve_var(name)
+        self.stats.lookups["var"].record(self._depth_of(name, sym))
+        return sym
+
+    def resolve_func(self, name: str):
+        sym = super().resolve_func(name)
+        self.stats.lookups["func"].record(self._depth_of(name, sym))
+        return sym
+
+    def resolve_class(self, name: str):
+        sym = super().resolve_class(name)
+        self.stats.lookups["class"].record(self._depth_of(name, sym))
+        return sym
+
+
+def instrument(visitor, stats: AnalysisStats):
+    """
+    Prepara un visitor semántico recién creado para registrar en `stats`:
+    le pone una StatsSymbolTable, envuelve visit()/visitChildren() de la
+    instancia y le engancha `_node_hook` para los nodos que se recorren sin
+    visit() (la clase y sus tablas de despacho no se tocan).
+    """
+    visitor.symtab = StatsSymbolTable(stats)
+    visits = stats.visits
+    inner_visit = visitor.visit
+
+    def visit(node):
+        if node is not None:
+            visits[type(node).__name__] += 1
+        return inner_visit(node)
+
+    def visit_children(ctx):
+        # mismo recorrido que CompiscriptVisitor.visitChildren, contando cada hijo
+        last = None
+        for c in getattr(ctx, "children", None) or ():
+            if hasattr(c, "accept"):
+                visits[type(c).__name__] += 1
+                last = c.accept(visitor)
+        return last
+
+    def walked(node):
+        # nodos que `_walk` y los bucles de operadores recorren sin visit()
+        visits[type(node).__name__] += 1
+
+    visitor.visit = visit
+    visitor.visitChildren = visit_children
+    visitor._node_hook = walked
+    return visitor
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from batch.batch import run_batch, combined_exit_code, format_summary
+from cache.cache import ResultCache
+from analysis.analysis import FileReport, analyze_source, load_report, store_report
+
+# anidamiento que agota la pila de Python al parsear (RecursionError)
+DEEP = "let x: integer = " + "(" * 3000 + "1" + ")" * 3000 + ";\n"
+
+def make_inputs(tmp_path):
+    files = {
+        "ok.cps": "let a: integer = 1;\n",
+        "deep.cps": DEEP,
+        "syntax.cps": "let = ;\n",
+        "semantic.cps": 'let b: integer = "s";\n',
+        "ok2.cps": "print(1);\n",
+    }
+    paths = []
+    for name, src in files.items():
+        path = tmp_path / name
+        path.write_text(src, encoding="utf-8")
+        paths.append(str(path))
+    paths.insert(2, str(tmp_path / "missing.cps"))
+    return paths
+
+# ------- Un archivo que falla no corta el lote -------
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("cached", [False, True])
+def test_one_report_per_path_in_order(tmp_path, jobs, cached):
+    paths = make_inputs(tmp_path)
+    cache = ResultCache(str(tmp_path / "cache")) if cached else None
+    reports = list(run_batch(paths, jobs=jobs, cache=cache))
+    assert [r.path for r in reports] == paths
+    by_name = {os.path.basename(r.path): r for r in reports}
+    assert by_name["ok.cps"].ok and by_name["ok2.cps"].ok
+    assert by_name["deep.cps"].error.startswith("RecursionError")
+    assert by_name["missing.cps"].error.startswith("FileNotFoundError")
+    assert by_name["syntax.cps"].syntax_issues and by_name["semantic.cps"].semantic_issues
+    assert combined_exit_code(reports) == 2
+    assert "2 OK, 2 con errores, 2 ilegibles" in format_summary(reports)
+
+def test_driver_keeps_the_summary(tmp_path):
+    paths = make_inputs(tmp_path)
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, "program", "Driver.py"), *paths, "-j", "2"],
+                          capture_output=True, text=True)
+    assert proc.returncode == 2
+    assert "Traceback" not in proc.stderr
+    assert "[ERROR] " + paths[1] + ": RecursionError" in proc.stdout
+    assert proc.stdout.rstrip().splitlines()[-1].startswith("== RESUMEN: 6 archivos")
+
+# ------- Entradas de la caché -------
+def test_stored_report_round_trips_for_any_path(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    report = analyze_source("let a: integer = \"s\";\n", path="uno.cps")
+    store_report(cache, "k", report)
+    hit = load_report(cache, "k", "dos.cps")
+    assert hit.path == "dos.cps" and hit.cached
+    assert hit.semantic_issues == report.semantic_issues
+    assert hit.symbols == report.symbols
+    assert load_report(cache, "otra", "dos.cps") is None
+
+def test_truncated_report_is_not_stored(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    store_report(cache, "k", FileReport(path="a.cps", truncated=True))
+    assert load_report(cache, "k", "a.cps") is None
@@ -0,0 +1,39 @@
+import os
+import time
+
+from src.cache.cache import ResultCache, cache_key
+
+# ------- Clave -------
+def test_key_depends_on_content_and_options():
+    k = cache_key(b"let a = 1;", "two-stage", False)
+    assert k == cache_key(b"let a = 1;", "two-stage", False)
+    assert k != cache_key(b"let a = 2;", "two-stage", False)
+    assert k != cache_key(b"let a = 1;", "ll", False)
+    assert k != cache_key(b"let a = 1;", "two-stage", True)
+
+# ------- Entradas -------
+def test_roundtrip_and_corrupt_entry(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = cache_key(b"x", "ll", False)
+    assert cache.get(key) is None
+    cache.put(key, {"stage": "SLL", "symbols": ["== SYMBOL TABLE =="]})
+    assert cache.get(key)["stage"] == "SLL"
+
+    with open(cache._entry_path(key), "w") as f:
+        f.write("{roto")
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._entry_path(key))
+
+# ------- Desalojo LRU -------
+def test_eviction_keeps_recently_used(tmp_path):
+    value = {"symbols": ["x" * 1000]}
+    cache = ResultCache(str(tmp_path), max_bytes=3500)
+    keys = [cache_key(str(i).encode(), "ll", False) for i in range(3)]
+    for i, k in enumerate(keys):
+        cache.put(k, value)
+        os.utime(cache._entry_path(k), (i, i))   # mtimes deterministas: 0, 1, 2
+    cache.get(keys[0])                            # keys[0] pasa a ser la más reciente
+    time.sleep(0.01)
+    cache.put(cache_key(b"nuevo", "ll", False), value)
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
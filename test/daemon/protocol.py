@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.daemon.client import DaemonClient
+
+# El daemon corre en su propio proceso (como en uso real), lanzado por Driver.py.
+@pytest.fixture
+def client(tmp_path):
+    sock = str(tmp_path / "cps.sock")
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "program", "Driver.py"), "--serve", sock],
+                            stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while True:
+        try:
+            c = DaemonClient(sock)
+            break
+        except OSError:
+            if proc.poll() is not None or time.time() > deadline:
+                proc.kill()
+                pytest.fail("el daemon no arrancó")
+            time.sleep(0.05)
+    yield c
+    c.request({"op": "shutdown"})
+    c.close()
+    assert proc.wait(10) == 0
+    assert not os.path.exists(sock)
+
+# ------- Pedidos de análisis -------
+def test_analyze_path_and_source(client, tmp_path):
+    assert client.request({"op": "ping"})["ok"]
+
+    src = tmp_path / "ok.cps"
+    src.write_text("let a: integer = 1;\nprint(a);\n", encoding="utf-8")
+    report = client.analyze_path(str(src))["report"]
+    assert report["ok"] and report["exit_code"] == 0
+    assert "  var a: INTEGER" in report["symbols"]
+
+    report = client.analyze_source('let x: integer = "a";', path="buf.cps")["report"]
+    assert report["path"] == "buf.cps" and report["exit_code"] == 1
+    assert [(i["line"], i["column"]) for i in report["semantic_issues"]] == [(1, 0)]
+
+    report = client.analyze_source("let = ;", ast=True)["report"]
+    assert report["syntax_issues"] and not report["semantic_issues"]
+
+    report = client.analyze_source('let x: integer = "a";\nlet y: integer = "b";', max_errors=1)["report"]
+    assert report["truncated"] and len(report["semantic_issues"]) == 1
+
+def test_dfa_sizes_and_reset(client):
+    sizes = client.request({"op": "dfa"})["sizes"]
+    assert sizes["parser_states"] > 0          # el daemon arranca caliente
+    sizes = client.request({"op": "dfa", "reset": True})["sizes"]
+    assert sizes["parser_states"] == sizes["lexer_states"] == 0
+    assert client.analyze_source("let a: integer = 1;")["report"]["ok"]
+    assert client.request({"op": "dfa"})["sizes"]["parser_states"] > 0
+
+# ------- Pedidos inválidos: error en la respuesta, la conexión sigue viva -------
+def test_bad_requests_are_reported(client, tmp_path):
+    assert not client.request({"op": "nope"})["ok"]
+    assert not client.request({"op": "analyze"})["ok"]
+    assert not client.request({"op": "analyze", "source": "", "strategy": "x"})["ok"]
+    assert not client.request({"op": "analyze", "source": "", "max_errors": 0})["ok"]
+    assert client.analyze_path(str(tmp_path / "missing.cps"))["report"]["exit_code"] == 2
+
+# ------- Varios clientes -------
+def test_idle_client_does_not_block_others(client, tmp_path):
+    assert client.request({"op": "ping"})["ok"]          # queda conectado y ocioso
+    with DaemonClient(str(tmp_path / "cps.sock"), timeout=3) as other:
+        assert other.request({"op": "ping"})["ok"]
+        assert other.analyze_source("let a: integer = 1;")["report"]["ok"]
+    assert client.analyze_source('let b: integer = "s";')["report"]["exit_code"] == 1
+
+def test_concurrent_clients_get_their_own_reports(client, tmp_path):
+    sources = [f'let v{i}: integer = "s";\n' * (i + 1) for i in range(4)]
+    expected = [client.analyze_source(src)["report"] for src in sources]
+    results, errors = {}, []
+
+    def work(k):
+        try:
+            with DaemonClient(str(tmp_path / "cps.sock"), timeout=30) as c:
+                results[k] = [c.analyze_source(src)["report"] for src in sources * 3]
+        except Exception as e:      # pragma: no cover - se reporta abajo
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert all(reports == expected * 3 for reports in results.values()) and len(results) == 3
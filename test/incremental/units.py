@@ -0,0 +1,102 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from incremental.incremental import IncrementalAnalyzer
+from analysis.analysis import analyze_source
+
+BASE = """function f(a: integer): integer { return a + 1; }
+class P { let x: integer; }
+let p: P = new P();
+let n: integer = f(1);
+if (n > 1) { print(n); } else { print(0); }
+do { n = n - 1; } while (n > 0);
+"""
+
+def same_as_full(report, source):
+    full = analyze_source(source)
+    key = lambda r: ([(i.line, i.column, i.message) for i in r.semantic_issues], r.symbols)
+    return key(report) == key(full)
+
+# ------- Unidades -------
+def test_units_follow_top_level_statements():
+    inc = IncrementalAnalyzer()
+    report = inc.update(BASE)
+    assert report.ok and same_as_full(report, BASE)
+    # if/else y do/while quedan como una sola unidad cada uno
+    assert inc.stats.units == 6 and inc.stats.parsed == 6
+
+# ------- Qué se rehace -------
+def test_body_edit_rechecks_only_that_unit():
+    inc = IncrementalAnalyzer()
+    inc.update(BASE)
+    src = BASE.replace("a + 1", "a + 2")
+    report = inc.update(src)
+    assert (inc.stats.parsed, inc.stats.checked, inc.stats.reused) == (1, 1, 5)
+    assert inc.stats.lexed_chars < len(src)
+    assert same_as_full(report, src)
+
+def test_signature_edit_rechecks_callers():
+    inc = IncrementalAnalyzer()
+    inc.update(BASE)
+    src = BASE.replace("function f(a: integer)", "function f(a: string)")
+    report = inc.update(src)
+    assert inc.stats.parsed == 1 and inc.stats.checked == 2     # f y `let n = f(1)`
+    assert any("Argumento 1 incompatible en 'f'" in i.message for i in report.semantic_issues)
+    assert same_as_full(report, src)
+
+def test_replayed_units_keep_overwritten_globals():
+    # la función pisa a la variable global `k`: al re-aplicar la unidad sin
+    # visitarla, `k` tiene que dejar de ser variable también en la tabla
+    src = "let k: integer = 1;\nfunction k(): integer { return 1; }\nlet z: integer = k + 1;\n"
+    inc = IncrementalAnalyzer()
+    inc.update(src)
+    edited = src.replace("k + 1", "k + 2")
+    report = inc.update(edited)
+    assert inc.stats.reused == 2 and inc.stats.checked == 1
+    assert same_as_full(report, edited)
+
+def test_base_class_edit_rechecks_subtype_uses():
+    # `a2` solo llega a B por el tipo de `b`: tiene que registrar que consultó
+    # la cadena de bases aunque `a1` ya la haya calculado antes
+    src = ("class A { }\nclass B : A { }\nclass C { }\nlet b: B = new B();\n"
+           "let a1: A = b;\nlet a2: A = b;\n")
+    inc = IncrementalAnalyzer()
+    assert inc.update(src).ok
+    edited = src.replace("class B : A", "class B : C")
+    report = inc.update(edited)
+    assert inc.stats.checked == 4                               # B, b, a1 y a2
+    assert len(report.semantic_issues) == 2 and same_as_full(report, edited)
+
+def test_inherited_member_edit_rechecks_every_use():
+    # `x2` llega a `v` por la tabla de miembros de B que `x1` ya armó
+    src = ("class A { let v: integer; }\nclass B : A { }\nlet b: B = new B();\n"
+           "let x1: integer = b.v;\nlet x2: integer = b.v;\n")
+    inc = IncrementalAnalyzer()
+    assert inc.update(src).ok
+    edited = src.replace("let v: integer", "let v: string")
+    report = inc.update(edited)
+    assert inc.stats.checked == 4                               # A, b, x1 y x2
+    assert len(report.semantic_issues) == 2 and same_as_full(report, edited)
+
+def test_shifted_units_keep_positions():
+    inc = IncrementalAnalyzer()
+    inc.update(BASE + 'let bad: integer = "s";\n')
+    src = "\n\n" + BASE + 'let bad: integer = "s";\n'
+    report = inc.update(src)
+    assert inc.stats.checked == 0
+    assert [(i.line, i.column) for i in report.semantic_issues] == [(9, 0)]
+    assert same_as_full(report, src)
+
+# ------- Errores de sintaxis -------
+def test_syntax_error_falls_back_and_recovers():
+    inc = IncrementalAnalyzer()
+    inc.update(BASE)
+    broken = BASE.replace("return a + 1;", "return a + ;")
+    assert inc.update(broken).syntax_issues and inc.stats.fallback
+    report = inc.update(BASE)
+    # la versión anterior de la unidad rota sigue guardada: no se re-parsea nada
+    assert report.ok and inc.stats.parsed == 0 and same_as_full(report, BASE)
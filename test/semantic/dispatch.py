@@ -0,0 +1,85 @@
+import os
+import sys
+
+from antlr4 import InputStream, CommonTokenStream, ParserRuleContext
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from src.semantic.semantic import SemanticVisitor
+
+SOURCE = "let a: integer = 1;\nlet b: integer = (a);\nprint(-b);\n"
+
+def parse_code(src: str):
+    parser = CompiscriptParser(CommonTokenStream(CompiscriptLexer(InputStream(src))))
+    return parser.program()
+
+def context_types(node, found=None):
+    found = set() if found is None else found
+    if isinstance(node, ParserRuleContext):
+        found.add(type(node))
+        for child in node.getChildren():
+            context_types(child, found)
+    return found
+
+class RecordingVisitor(SemanticVisitor):
+    """Redefine un visit* de SemanticVisitor y anota qué nodos le llegan."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.unary = []
+
+    def visitUnaryOp(self, ctx):
+        self.unary.append(ctx.getText())
+        return super().visitUnaryOp(ctx)
+
+# ------- Tabla de despacho -------
+def test_visit_reaches_the_labeled_method():
+    tree = parse_code(SOURCE)
+    visitor = SemanticVisitor(collapse_passthroughs=False)
+    tree.accept(visitor)
+    assert not visitor.issues
+    # las sentencias las recorre _walk: en la tabla queda lo que pasó por visit()
+    dispatched = {t.__name__[:-len("Context")] for t in context_types(tree) if t in visitor._dispatch}
+    assert {"VariableDeclaration", "UnaryOp", "ParenthesizedExpr", "LiteralExpr"} <= dispatched
+    for label in dispatched:
+        node_type = getattr(CompiscriptParser, f"{label}Context")
+        assert visitor._dispatch[node_type] is getattr(SemanticVisitor, f"visit{label}")
+
+def test_unlabeled_context_falls_back_to_visit_children():
+    class OrphanContext(ParserRuleContext):
+        pass
+
+    seen = []
+
+    class ChildrenVisitor(SemanticVisitor):
+        def visitChildren(self, ctx):
+            seen.append(type(ctx).__name__)
+            return super().visitChildren(ctx)
+
+    orphan = OrphanContext()
+    orphan.addChild(parse_code("print(1);"))
+    for collapse in (True, False):
+        seen.clear()
+        visitor = ChildrenVisitor(collapse_passthroughs=collapse)
+        visitor.visit(orphan)
+        assert seen[0] == "OrphanContext"
+        assert visitor._dispatch[OrphanContext] is ChildrenVisitor.visitChildren
+
+def test_subclass_tables_do_not_leak_into_the_parent():
+    tree = parse_code(SOURCE)
+    for collapse in (True, False):
+        # primero la subclase, después el padre, y otra vez la subclase
+        sub = RecordingVisitor(collapse_passthroughs=collapse)
+        tree.accept(sub)
+        assert sub.unary == ["-b"]
+        parent = SemanticVisitor(collapse_passthroughs=collapse)
+        tree.accept(parent)
+        assert not parent.issues
+        assert SemanticVisitor._dispatch_tables[collapse][CompiscriptParser.UnaryOpContext] \
+            is SemanticVisitor.visitUnaryOp
+        again = RecordingVisitor(collapse_passthroughs=collapse)
+        tree.accept(again)
+        assert again.unary == ["-b"]
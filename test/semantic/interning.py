@@ -0,0 +1,69 @@
+import gc
+import os
+import pickle
+import sys
+
+import pytest
+from antlr4 import InputStream, CommonTokenStream
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from src.semantic import semantic
+from src.semantic.semantic import (
+    ArrayType, ObjectType, SemanticVisitor, TypeKind, ClassMember, array_of, object_type, same_type,
+)
+
+# ------- Tabla canónica -------
+def test_one_instance_per_type():
+    assert array_of(TypeKind.INTEGER) is ArrayType(TypeKind.INTEGER)
+    assert array_of(array_of(TypeKind.STRING)) is ArrayType(ArrayType(TypeKind.STRING))
+    assert object_type("Perro") is ObjectType("Perro")
+    assert array_of(TypeKind.INTEGER) is not array_of(TypeKind.STRING)
+    assert same_type(array_of(object_type("A")), array_of(object_type("A")))
+
+def test_depth_and_base_are_precomputed():
+    m = array_of(array_of(TypeKind.INTEGER))
+    assert (m.depth, m.base, m.elem) == (2, TypeKind.INTEGER, array_of(TypeKind.INTEGER))
+    assert array_of(object_type("A")).base is object_type("A")
+
+def test_types_are_immutable_and_pickle_to_canonical():
+    t = array_of(object_type("A"))
+    with pytest.raises(AttributeError):
+        t.elem = TypeKind.INTEGER
+    assert pickle.loads(pickle.dumps(t)) is t
+    assert repr(t) == "ArrayType(elem=ObjectType(class_name='A'))"
+
+def test_unhashable_element_is_not_interned():
+    # el placeholder de un método dentro de un literal de arreglo
+    m = ClassMember("m", TypeKind.INTEGER, is_method=True, params=[])
+    t = array_of(m)
+    assert t.elem is m and t.depth == 1
+
+# ------- Tablas débiles -------
+def analyze(class_name: str):
+    src = f"class {class_name} {{ let v: integer; }}\nlet xs: {class_name}[][] = [[new {class_name}()]];\n"
+    parser = CompiscriptParser(CommonTokenStream(CompiscriptLexer(InputStream(src))))
+    visitor = SemanticVisitor()
+    parser.program().accept(visitor)
+    assert not visitor.issues
+    return visitor
+
+def test_tables_do_not_grow_across_analyses():
+    # como el daemon o el IDE: cada análisis trae clases nuevas
+    analyze("Warm")
+    gc.collect()
+    sizes = (len(semantic._ARRAY_TYPES), len(semantic._OBJECT_TYPES))
+    for i in range(50):
+        analyze(f"Clase{i}")
+    gc.collect()
+    assert (len(semantic._ARRAY_TYPES), len(semantic._OBJECT_TYPES)) == sizes
+
+def test_live_types_stay_canonical():
+    visitor = analyze("Viva")
+    gc.collect()
+    assert "Viva" in semantic._OBJECT_TYPES
+    assert array_of(array_of(object_type("Viva"))) is ArrayType(ArrayType(ObjectType("Viva")))
+    del visitor
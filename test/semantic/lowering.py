@@ -0,0 +1,159 @@
+import os
+import sys
+
+from antlr4 import InputStream, CommonTokenStream
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from src.semantic.semantic import SemanticVisitor, _simple_name
+from src.semantic.lowering import lower
+from src.semantic.ast_semantic import AstSemanticVisitor
+from src.semantic.ast_nodes import Binary, BinOp, Call, Member, Name, VarDecl
+
+def parse_code(src: str):
+    parser = CompiscriptParser(CommonTokenStream(CompiscriptLexer(InputStream(src))))
+    return parser.program()
+
+def issues_of(visitor):
+    return [(i.line, i.column, i.message) for i in visitor.issues]
+
+# ------- Forma del AST -------
+def test_passthroughs_collapse_to_leaf():
+    prog = lower(parse_code("let a = x;"))
+    decl = prog.statements[0]
+    assert isinstance(decl, VarDecl)
+    assert isinstance(decl.init, Name) and decl.init.name == "x"
+    assert (decl.line, decl.column) == (1, 0)
+
+def test_long_additive_chain_is_left_nested():
+    terms = " + ".join(["a"] * 3000)
+    prog = lower(parse_code(f"let s = {terms};"))
+    node, depth = prog.statements[0].init, 0
+    while isinstance(node, Binary):
+        assert node.op is BinOp.ADD
+        node, depth = node.left, depth + 1
+    assert depth == 2999
+
+def test_suffix_chain_nests_on_atom():
+    call = lower(parse_code("o.m(1);")).statements[0].expr
+    assert isinstance(call, Call) and isinstance(call.target, Member)
+    assert call.target.name == "m" and isinstance(call.target.target, Name)
+
+# ------- Equivalencia con el visitor sobre el parse tree -------
+def test_ast_visitor_matches_tree_visitor():
+    code = """
+    class A { let v: integer; function get(): integer { return this.v; } }
+    class B : A { function toString(): string { return "b"; } }
+    let b: B = new B();
+    let s: string = "x" + b;
+    let n: integer = b.get(1);
+    let bad: integer = "no";
+    function f(x: integer): integer { return x; }
+    let r = f("1") + undefinedVar;
+    while (1) { break; }
+    """
+    tree = parse_deep(code)
+    tv = SemanticVisitor()
+    tree.accept(tv)
+    av = AstSemanticVisitor()
+    av.visit(lower(tree))
+    assert issues_of(tv)
+    assert issues_of(av) == issues_of(tv)
+    assert av.symtab.export_as_lines() == tv.symtab.export_as_lines()
+
+def test_identifier_and_type_checks_are_structural():
+    # tipos de varias dimensiones y literales de un token, sin getText()
+    code = """
+    let m: integer[][] = [[1, 2], [3]];
+    let k: integer[] = m[0];
+    let bad: integer[][] = k;
+    let t: boolean = true;
+    let z: string = null;
+    let n: integer = "n";
+    """
+    tree = parse_deep(code)
+    tv = SemanticVisitor()
+    tree.accept(tv)
+    av = AstSemanticVisitor()
+    av.visit(lower(tree))
+    assert [m for _, _, m in issues_of(tv)] == [
+        "No se puede asignar INTEGER[] a variable bad: INTEGER[][].",
+        "No se puede asignar STRING a variable n: INTEGER.",
+    ]
+    assert issues_of(av) == issues_of(tv)
+
+def test_simple_name_only_for_single_token_subtrees():
+    stmts = parse_code("x; (x); this; a.b; f(); 3;").statement()
+    names = [_simple_name(st.expressionStatement().expression()) for st in stmts]
+    assert names == ["x", None, "this", None, None, "3"]
+
+def test_long_fluent_chain_matches_ast_visitor():
+    steps = "".join((".add(1)", ".self()", ".peers[0]")[i % 3] for i in range(600))
+    code = f"""
+    class F {{
+      let n: integer;
+      let peers: F[];
+      function add(x: integer): F {{ return this; }}
+      function self(): F {{ return this; }}
+    }}
+    let o: F = new F();
+    let ok: integer = o{steps}.n;
+    let bad: integer = o{steps}.add("s").self(1).n;
+    """
+    tree = parse_code(code)
+    runs = []
+    for _ in range(2):                  # el mismo árbol dos veces: nada queda anotado en los nodos
+        tv = SemanticVisitor()
+        tree.accept(tv)
+        runs.append(issues_of(tv))
+    av = AstSemanticVisitor()
+    av.visit(lower(tree))
+    assert [m for _, _, m in runs[0]] == [
+        "Argumento 1 incompatible en '?.add': se esperaba INTEGER, llegó STRING.",
+        "Número de argumentos incorrecto en '?.self': se esperaban 0, llegaron 1.",
+    ]
+    assert runs[1] == runs[0] == issues_of(av)
+
+# ------- Recorrido sin recursión -------
+def parse_deep(src: str):
+    # el parser sí recursa en prefijos y anidamiento; solo él corre con el límite alto
+    old = sys.getrecursionlimit()
+    sys.setrecursionlimit(20000)
+    try:
+        return parse_code(src)
+    finally:
+        sys.setrecursionlimit(old)
+
+def test_long_operator_chains_do_not_recurse():
+    sums = " + ".join(["a"] * 3000)
+    ands = " && ".join(["b"] * 3000)
+    nots = "!" * 1000
+    code = f"""
+    let a: integer = 1;
+    let b: boolean = true;
+    let s: integer = {sums};
+    let t: boolean = {ands};
+    let u: boolean = {nots}b;
+    let bad: integer = {sums} + b;
+    """
+    tree = parse_deep(code)
+    tv = SemanticVisitor()
+    tree.accept(tv)
+    av = AstSemanticVisitor()
+    av.visit(lower(tree))
+    assert [m for _, _, m in issues_of(tv)] == [
+        "Operación aritmética requiere numéricos, no INTEGER y BOOLEAN.",
+        "No se puede asignar ERROR a variable bad: INTEGER.",
+    ]
+    assert issues_of(tv) == issues_of(av)
+
+def test_deep_statement_nesting_in_tree_visitor():
+    depth = 250
+    code = ("let n: integer = 0;\n" + "if (n < 1) { while (n < 1) {\n" * (depth // 2)
+            + "n = n + \"x\";\n" + "} }\n" * (depth // 2))
+    tv = SemanticVisitor()
+    parse_deep(code).accept(tv)
+    assert [m for _, _, m in issues_of(tv)] == ["Tipos incompatibles en asignación: INTEGER = STRING."]
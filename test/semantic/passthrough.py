@@ -0,0 +1,78 @@
+import os
+import sys
+
+import pytest
+from antlr4 import InputStream, CommonTokenStream
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+
+from CompiscriptLexer import CompiscriptLexer
+from CompiscriptParser import CompiscriptParser
+from src.semantic.semantic import SemanticVisitor
+
+PRELUDE = """function f(x: integer): integer { return x; }
+let a: integer = 1;
+"""
+
+# cada inicializador baja por Expression -> ... -> *Passthrough -> hoja
+CHAINS = [
+    "let v = 1;",                            # literal solo
+    'let v = "s";',
+    "let v = (a);",                          # identificador entre paréntesis
+    "let v = ((((a))));",
+    "let v = -a;",                           # unario al final de la cadena
+    "let v = !(a == 1);",
+    "let v = f(a);",                         # llamada al final de la cadena
+    "let v = f((a));",
+    # con errores: los mensajes y el tipo ERROR deben coincidir
+    "let v: string = (a);",
+    "let v = -\"s\";",
+    "let v = f(\"s\");",
+    "let v = (zz);",
+    "let v = g(1);",
+]
+
+def parse_code(src: str):
+    parser = CompiscriptParser(CommonTokenStream(CompiscriptLexer(InputStream(src))))
+    return parser.program()
+
+def analyze(tree, collapse: bool):
+    visitor = SemanticVisitor(collapse_passthroughs=collapse)
+    tree.accept(visitor)
+    issues = [(i.line, i.column, i.message) for i in visitor.issues]
+    # tipo de cada inicializador, visitado de nuevo con el mismo visitor
+    types = [visitor.visit(decl.initializer().expression())
+             for decl in find(tree, CompiscriptParser.VariableDeclarationContext)]
+    return issues, types, visitor.symtab.export_as_lines()
+
+def find(node, ctx_type):
+    if isinstance(node, ctx_type):
+        yield node
+    for child in getattr(node, "children", None) or ():
+        yield from find(child, ctx_type)
+
+# ------- Colapso de passthroughs -------
+@pytest.mark.parametrize("chain", CHAINS)
+def test_collapsed_chain_matches_full_visit(chain):
+    tree = parse_code(PRELUDE + chain)
+    collapsed, plain = analyze(tree, True), analyze(tree, False)
+    assert collapsed == plain
+    assert len(collapsed[1]) == 2
+
+def test_collapse_is_used_for_passthroughs():
+    tree = parse_code(PRELUDE + "let v = ((a));")
+    visitor = SemanticVisitor(collapse_passthroughs=True)
+    tree.accept(visitor)
+    assert visitor._dispatch[CompiscriptParser.ExpressionContext] is SemanticVisitor._visit_collapsed
+    assert visitor._dispatch[CompiscriptParser.ParenthesizedExprContext] is SemanticVisitor.visitParenthesizedExpr
+
+def test_deep_chain_of_mixed_operators():
+    # cada nivel deja passthroughs de un solo hijo entre operadores reales
+    expr = "a"
+    for i in range(12):
+        expr = f"-({expr})" if i % 2 else f"f(({expr}))"
+    tree = parse_code(PRELUDE + f"let v = {expr};\nlet w: string = {expr};")
+    collapsed, plain = analyze(tree, True), analyze(tree, False)
+    assert collapsed == plain
+    assert len(collapsed[0]) == 1           # solo la asignación a string
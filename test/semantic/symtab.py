@@ -0,0 +1,121 @@
+from src.semantic.semantic import (
+    SymbolTable, VariableSymbol, FunctionSymbol, ClassSymbol, ClassMember, TypeKind,
+)
+
+def var(name, t=TypeKind.INTEGER):
+    return VariableSymbol(name, t, is_const=False)
+
+# ------- Sombreado -------
+def test_inner_binding_shadows_and_pop_restores():
+    st = SymbolTable()
+    outer = var("x")
+    st.define_var(outer)
+    st.push_scope()
+    st.push_scope()
+    inner = var("x", TypeKind.STRING)
+    assert st.define_var(inner)
+    assert st.resolve_var("x") is inner
+    st.pop_scope()
+    assert st.resolve_var("x") is outer
+    st.pop_scope()
+    assert st.resolve_var("x") is outer
+    assert not (st._local_vars or st._local_funcs or st._local_classes)
+
+def test_redeclaration_only_in_same_scope():
+    st = SymbolTable()
+    st.push_scope()
+    assert st.define_var(var("a"))
+    assert not st.define_var(var("a"))
+    st.push_scope()
+    assert st.define_var(var("a"))
+
+# ------- Clases de símbolo -------
+def test_lookup_skips_other_kinds():
+    st = SymbolTable()
+    g = var("f")
+    st.define_var(g)
+    st.push_scope()
+    fn = FunctionSymbol("f", [], TypeKind.INTEGER)
+    st.define_func(fn)                 # función local con el mismo nombre
+    assert st.resolve_var("f") is g
+    assert st.resolve_func("f") is fn
+    assert st.resolve_class("f") is None
+
+def test_function_overwrites_variable_in_same_scope():
+    st = SymbolTable()
+    st.push_scope()
+    st.define_var(var("k"))
+    st.define_func(FunctionSymbol("k", [], TypeKind.INTEGER))
+    assert st.resolve_var("k") is None  # el ámbito solo conserva la función
+    assert "k" not in st.current_scope().vars
+    st.pop_scope()
+    assert not (st._local_vars or st._local_funcs or st._local_classes)
+
+def test_export_is_unchanged_by_index():
+    st = SymbolTable()
+    st.define_class(ClassSymbol("A"))
+    st.push_scope()
+    st.define_var(var("y"))
+    lines = st.export_as_lines()
+    assert lines[:4] == ["== SYMBOL TABLE ==", "[global]", "  class A ...", "[scope_1]"]
+    assert "  var y: INTEGER" in lines
+
+# ------- Subtipos -------
+def test_ancestors_follow_base_chain_and_stop_on_cycles():
+    st = SymbolTable()
+    st.define_class(ClassSymbol("C", _base_name="B"))
+    st.define_class(ClassSymbol("B", _base_name="A"))
+    assert st.ancestors("C") == {"C", "B", "A"}
+    assert st.is_subclass("C", "A") and not st.is_subclass("A", "C")
+    st.define_class(ClassSymbol("A", _base_name="C"))     # ciclo
+    assert st.ancestors("C") == {"C", "B", "A"}
+    assert not st.is_subclass("C", "Z")
+
+def test_declaring_a_class_invalidates_cached_hierarchy():
+    st = SymbolTable()
+    st.define_class(ClassSymbol("B", _base_name="A"))
+    assert not st.is_subclass("B", "Root")
+    st.assignable_memo[("x", "y")] = True
+    st.define_class(ClassSymbol("A", _base_name="Root"))
+    assert st.is_subclass("B", "Root")
+    assert st.assignable_memo == {}
+
+# ------- Miembros -------
+def member(name, t=TypeKind.INTEGER, **kw):
+    return ClassMember(name, t, **kw)
+
+def test_member_table_flattens_chain_with_owner():
+    st = SymbolTable()
+    a, b = ClassSymbol("A"), ClassSymbol("B", _base_name="A")
+    st.define_class(a)
+    st.define_class(b)
+    st.add_member(a, member("v"))
+    st.add_member(a, member("m", is_method=True, params=[]))
+    st.add_member(b, member("m", is_method=True, params=[("x", TypeKind.INTEGER)]))
+    assert st.resolve_member(b, "v") == (a.members["v"], a)
+    assert st.resolve_member(b, "m")[1] is b           # el override tapa al de A
+    assert st.resolve_member(b, "nada") == (None, None)
+    assert set(st.member_table(b)) == {"v", "m"}
+
+def test_member_table_sees_later_members_and_bases():
+    st = SymbolTable()
+    b = ClassSymbol("B", _base_name="A")
+    st.define_class(b)
+    assert st.resolve_member(b, "v") == (None, None)
+    a = ClassSymbol("A")
+    st.define_class(a)                                  # la base aparece después
+    st.add_member(a, member("v"))
+    assert st.resolve_member(b, "v")[1] is a
+    assert not st.has_to_string("B")
+    st.add_member(a, member("toString", is_method=True, params=[], return_type=TypeKind.STRING))
+    assert st.has_to_string("B")
+
+def test_member_lookup_stops_on_cycles():
+    st = SymbolTable()
+    a, b = ClassSymbol("A", _base_name="B"), ClassSymbol("B", _base_name="A")
+    st.define_class(a)
+    st.define_class(b)
+    st.add_member(b, member("v"))
+    assert st.resolve_member(a, "v")[1] is b
+    assert st.resolve_member(a, "w") == (None, None)
+    assert not st.has_to_string("A")
@@ -0,0 +1,107 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from parser.parser import parse_source
+from analysis.analysis import run_semantic, analyze_source
+from cache.cache import ResultCache, cache_key
+from sink.sink import CallbackSink, IssueSink, TextSink
+
+SEMANTIC = "".join(f'let v{i}: integer = "s";\n' for i in range(6))
+SYNTAX = "let = ;\n" * 6
+
+def analyze(source, sink, use_ast=False):
+    result = parse_source(source, sink=sink)
+    if result.issues:
+        return result, None
+    return result, run_semantic(result.tree, use_ast=use_ast, sink=sink)
+
+# ------- Emisión en orden -------
+def test_issues_reach_the_sink_as_found():
+    for use_ast in (False, True):
+        seen = []
+        _, visitor = analyze(SEMANTIC, CallbackSink(lambda kind, issue: seen.append((kind, issue))), use_ast)
+        assert [i for _, i in seen] == visitor.issues and len(seen) == 6
+        assert {k for k, _ in seen} == {"semantic"} and not visitor.truncated
+
+def test_text_sink_keeps_driver_format():
+    out = io.StringIO()
+    analyze(SYNTAX[:16] + SEMANTIC, TextSink(out))
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "Errores de sintaxis:"
+    assert lines[1].startswith("  línea 1, col 4: ")
+
+# ------- max_errors -------
+def test_max_errors_stops_semantic_analysis():
+    for use_ast in (False, True):
+        sink = IssueSink(max_errors=2)
+        _, visitor = analyze(SEMANTIC, sink, use_ast)
+        assert visitor.truncated and sink.full
+        assert [i.line for i in visitor.issues] == [1, 2]
+
+def test_max_errors_cancels_the_parse():
+    result, _ = analyze(SYNTAX, IssueSink(max_errors=1))
+    assert result.truncated and result.tree is None
+    assert len(result.issues) == 1
+    assert len(parse_source(SYNTAX).issues) == 12
+
+def test_truncated_reports_are_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cut = analyze_source(SEMANTIC, cache=cache, max_errors=3)
+    assert cut.truncated and len(cut.semantic_issues) == 3 and not cut.cached
+    full = analyze_source(SEMANTIC, cache=cache)
+    assert not full.truncated and len(full.semantic_issues) == 6 and not full.cached
+    again = analyze_source(SEMANTIC, cache=cache, max_errors=3)
+    assert again.cached and again.truncated and again.semantic_issues == cut.semantic_issues
+
+# ------- Presupuesto de errores -------
+CASCADES = """let a: integer = nope + 1;
+let b: integer = a + "x" * 2;
+let f: integer = g;
+"""
+
+def test_parse_budget_without_sink():
+    result = parse_source(SYNTAX, max_errors=3)
+    assert result.truncated and len(result.issues) == 3
+
+def test_lexer_errors_count_against_the_budget():
+    result = parse_source("let a = 1;\n" + "#" * 5000, max_errors=10)
+    assert result.truncated and result.tree is None
+    assert result.issues[-1].message.startswith("se alcanzó el máximo de 10 errores léxicos")
+    assert not parse_source("let a = 1;\n" + "#" * 50).issues   # sin presupuesto: como antes
+
+def test_semantic_budget_and_cascades():
+    tree = parse_source(CASCADES).tree
+    for use_ast in (False, True):
+        full = run_semantic(tree, use_ast=use_ast)
+        assert len(full.issues) == 6
+        cut = run_semantic(tree, use_ast=use_ast, max_errors=2)
+        assert cut.truncated and cut.issues == full.issues[:2]
+        quiet = run_semantic(tree, use_ast=use_ast, suppress_cascades=True)
+        # una causa por sentencia; `g` sin declarar no tiene error propio y se conserva
+        assert [i.message for i in quiet.issues] == [
+            "Operación aritmética requiere numéricos, no ERROR y INTEGER.",
+            "Operación aritmética requiere numéricos, no STRING y INTEGER.",
+            "No se puede asignar ERROR a variable f: INTEGER.",
+        ]
+        assert quiet.suppressed == 3
+
+def test_cascade_option_is_part_of_the_cache_key():
+    assert cache_key(b"x", "ll", False) != cache_key(b"x", "ll", False, suppress_cascades=True)
+
+# ------- Driver -------
+def test_driver_streams_json_lines(tmp_path):
+    path = tmp_path / "bad.cps"
+    path.write_text(SEMANTIC, encoding="utf-8")
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, "program", "Driver.py"), str(path),
+                           "--format", "json", "--max-errors", "2"], capture_output=True, text=True)
+    assert proc.returncode == 1
+    rows = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert [r["kind"] for r in rows] == ["semantic", "semantic", "summary"]
+    assert rows[-1]["truncated"] and rows[-1]["issues"] == 2
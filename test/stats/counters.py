@@ -0,0 +1,65 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from parser.parser import parse_source, STRATEGY_LL
+from analysis.analysis import run_semantic
+from stats.stats import AnalysisStats
+
+SOURCE = """let g: integer = 1;
+function f(a: integer): integer {
+  if (a > 0) { while (a > 0) { a = a - g; } }
+  return a;
+}
+class A { let v: integer; }
+let o: A = new A();
+let r: integer = f(g) + missing;
+"""
+
+def analyze(source, use_ast=False, stats=None):
+    result = parse_source(source, stats=stats)
+    return result, run_semantic(result.tree, use_ast=use_ast, stats=stats)
+
+# ------- Fases y nodos -------
+def test_phases_and_node_counts():
+    stats = AnalysisStats()
+    result, _ = analyze(SOURCE, stats=stats)
+    assert list(stats.phases) == ["lex", "parse_sll", "semantic"]
+    assert stats.stage == result.stage == "SLL"
+    assert stats.tokens == len(result.parser.getTokenStream().tokens)
+    assert stats.nodes["ProgramContext"] == 1
+    assert stats.nodes["FunctionDeclarationContext"] == 1
+    assert stats.nodes["BlockContext"] == 3      # cuerpo de f, if, while
+
+def test_syntax_error_times_both_stages():
+    stats = AnalysisStats()
+    result = parse_source("let x: integer = ;", stats=stats)
+    assert result.issues
+    assert list(stats.phases) == ["lex", "parse_sll", "parse_ll"]
+    assert stats.stage == "LL"
+
+# ------- Visitor -------
+def test_scopes_and_lookups():
+    stats = AnalysisStats()
+    _, visitor = analyze(SOURCE, stats=stats)
+    assert stats.scope_pushes == stats.scope_pops > 0
+    assert stats.max_scope_depth >= 4      # global, función, if, while
+    var = stats.lookups["var"]
+    assert var.misses >= 1                 # `missing`
+    assert var.max_depth >= 4              # `g` desde el cuerpo del while
+    assert stats.lookups["class"].count >= 1
+    assert stats.total_visits > 0
+    assert "== STATS ==" in stats.format_lines()[0]
+    assert stats.to_dict()["lookups"]["var"]["mean_depth"] > 0
+
+def test_stats_do_not_change_results():
+    for use_ast in (False, True):
+        _, plain = analyze(SOURCE, use_ast=use_ast)
+        stats = AnalysisStats()
+        _, counted = analyze(SOURCE, use_ast=use_ast, stats=stats)
+        assert [(i.line, i.message) for i in counted.issues] == [(i.line, i.message) for i in plain.issues]
+        assert counted.symtab.export_as_lines() == plain.symtab.export_as_lines()
+        assert ("lower" in stats.phases) == use_ast
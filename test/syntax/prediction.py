@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from parser.parser import parse_source, tree_as_lisp
+from parser.dfa import dfa_sizes, limit_dfa, load_dfa, reset_dfa, save_dfa, warm_dfa
+
+PROGRAM = """
+class A { let v: integer; function get(): integer { return this.v * 2 + 1; } }
+let xs: integer[] = [1, 2, 3];
+foreach (x in xs) { if (x > 1 && x != 3) { print(x); } }
+let a: A = new A();
+print(a.get() - xs[0] % 2);
+"""
+
+def parse(source):
+    result = parse_source(source)
+    return result.stage, [i.message for i in result.issues], tree_as_lisp(result) if result.tree else None
+
+def states(sizes):
+    return {k: v for k, v in sizes.items() if k != "parser_contexts"}
+
+# ------- Guardar y cargar -------
+def test_saved_dfa_round_trips(tmp_path):
+    reset_dfa()
+    assert dfa_sizes()["parser_states"] == 0
+    corpus = tmp_path / "corpus.cps"
+    corpus.write_text(PROGRAM, encoding="utf-8")
+    assert warm_dfa([str(corpus), str(tmp_path / "missing.cps")]) == 1
+    expected = parse(PROGRAM), parse("let = ;")
+    warm = dfa_sizes()
+
+    path = str(tmp_path / "cps.dfa")
+    assert states(save_dfa(path)) == states(warm)
+    reset_dfa()
+    assert dfa_sizes()["lexer_states"] == dfa_sizes()["parser_states"] == 0
+
+    assert load_dfa(path)
+    assert states(dfa_sizes()) == states(warm)
+    # mismo resultado, y el programa del corpus ya no agrega estados
+    assert (parse(PROGRAM), parse("let = ;")) == expected
+    assert states(dfa_sizes()) == states(warm)
+
+def test_unusable_files_are_ignored(tmp_path):
+    reset_dfa()
+    parse(PROGRAM)
+    before = dfa_sizes()
+    path = tmp_path / "cps.dfa"
+    assert not load_dfa(str(path))
+    path.write_text("{no es json", encoding="utf-8")
+    assert not load_dfa(str(path))
+    save_dfa(str(path))
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["grammar"] = "otra"          # p. ej. después de regenerar la gramática
+    path.write_text(json.dumps(data), encoding="utf-8")
+    assert not load_dfa(str(path))
+    assert dfa_sizes() == before
+
+# ------- Límite de memoria -------
+def test_limit_dfa_resets_past_the_bound():
+    reset_dfa()
+    parse(PROGRAM)
+    total = dfa_sizes()["lexer_states"] + dfa_sizes()["parser_states"]
+    assert not limit_dfa(total)
+    assert limit_dfa(total - 1)
+    assert dfa_sizes()["parser_states"] == 0
+    assert parse(PROGRAM)[1] == []
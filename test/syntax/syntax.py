@@ -0,0 +1,160 @@
+import os
+import sys
+
+import pytest
+
+# los módulos generados por ANTLR se importan como top-level desde program/
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "program"))
+
+from antlr4 import CommonTokenStream, InputStream, Token
+
+from CompiscriptLexer import CompiscriptLexer
+
+import src.parser.parser as parser_module
+from src.parser.parser import parse_file, parse_source, parse_tokens, tree_as_lisp, STAGE_SLL, STAGE_LL
+from src.parser.stream import CompactInputStream
+from src.parser.tokens import CompactTokenStream, TokenView
+
+
+def write_cps(tmp_path, src: str) -> str:
+    path = tmp_path / "prog.cps"
+    path.write_text(src, encoding="utf-8")
+    return str(path)
+
+# ------- Parseo en dos etapas (SLL -> LL) -------
+def test_valid_program_finishes_in_sll(tmp_path):
+    path = write_cps(tmp_path, """
+    let a: integer = 1;
+    function f(x: integer): integer { return x + a; }
+    print(f(2));
+    """)
+    result = parse_file(path)
+    assert result.stage == STAGE_SLL
+    assert not result.issues
+
+def test_syntax_error_falls_back_to_ll(tmp_path):
+    path = write_cps(tmp_path, "let a: integer = ;")
+    result = parse_file(path)
+    assert result.stage == STAGE_LL
+    assert result.issues
+
+def test_two_stage_tree_matches_ll(tmp_path):
+    path = write_cps(tmp_path, """
+    class A { let v: integer; }
+    let a: A = new A();
+    a.v = 3;
+    let xs: integer[] = [1, 2, 3];
+    """)
+    two = parse_file(path)
+    ll = parse_file(path, strategy="ll")
+    assert ll.stage == STAGE_LL
+    assert tree_as_lisp(two) == tree_as_lisp(ll)
+    assert not two.issues and not ll.issues
+
+def test_unknown_strategy_rejected(tmp_path):
+    path = write_cps(tmp_path, "let a = 1;")
+    with pytest.raises(ValueError):
+        parse_file(path, strategy="lalr")
+
+# ------- Parseo desde memoria -------
+def test_parse_source_matches_parse_file(tmp_path):
+    src = 'let s: string = "ñandú";\nfunction f(): integer { return 1; }\n'
+    from_file = parse_file(write_cps(tmp_path, src))
+    data = src.encode("utf-8")
+    for source in (src, data, bytearray(data), memoryview(data)):
+        result = parse_source(source, path="buffer.cps")
+        assert result.stage == from_file.stage == STAGE_SLL
+        assert tree_as_lisp(result) == tree_as_lisp(from_file)
+        assert result.parser.getInputStream().tokenSource.inputStream.name == "buffer.cps"
+
+def test_parse_source_errors(tmp_path):
+    assert parse_source("let a: integer = ;").issues == parse_file(write_cps(tmp_path, "let a: integer = ;")).issues
+    with pytest.raises(UnicodeDecodeError):     # mismo decode estricto que FileStream
+        parse_source(b"let a = '\xff';")
+
+# ------- Char stream compacto -------
+@pytest.mark.parametrize("text", ["let a = 1;\n", 'print("año");', 'print("€ y ∑");', 'print("😀 €");', ""])
+def test_compact_stream_matches_input_stream(text):
+    compact, plain = CompactInputStream.from_text(text), InputStream(text)
+    assert compact.size == plain.size
+    chars = []
+    while compact.LA(1) != Token.EOF:
+        assert compact.LA(1) == plain.LA(1)
+        chars.append(compact.LA(1))
+        compact.consume()
+        plain.consume()
+    assert chars == [ord(c) for c in text]
+    assert compact.LA(-1) == plain.LA(-1)
+    for start, stop in ((0, 3), (2, 100), (len(text), len(text) + 2)):
+        assert compact.getText(start, stop) == plain.getText(start, stop)
+    assert str(compact) == text
+    assert CompactInputStream.from_bytes(text.encode("utf-8")).getText(0, len(text)) == text
+
+def test_ascii_bytes_are_used_as_is():
+    data = b"let a: integer = 1;"
+    assert CompactInputStream.from_bytes(data).data is data
+
+# ------- Tokens compactos -------
+TOKEN_SOURCES = [
+    'let s: string = "año";\n// comentario\nfunction f(x: integer): integer { return x * 2; }\nprint(f(1));\n',
+    "let a = 1 # 2;\n/* sin cerrar",                  # errores del lexer
+    "let = ;\nif (a { }\n",                          # errores de sintaxis
+]
+
+def lexed(cls, text):
+    tokens = cls(CompiscriptLexer(CompactInputStream.from_text(text)))
+    tokens.fill()
+    return tokens
+
+@pytest.mark.parametrize("text", TOKEN_SOURCES)
+def test_compact_tokens_match_common_tokens(text):
+    common, compact = lexed(CommonTokenStream, text), lexed(CompactTokenStream, text)
+    assert len(compact.tokens) == len(common.tokens)
+    for a, b in zip(common.tokens, compact.tokens):
+        assert isinstance(b, TokenView) and isinstance(b, Token)
+        assert (a.type, a.channel, a.start, a.stop, a.line, a.column, a.text, a.tokenIndex) == \
+               (b.type, b.channel, b.start, b.stop, b.line, b.column, b.text, b.tokenIndex)
+        assert str(a) == str(b)
+    assert compact.getText() == common.getText()
+    assert compact.tokens[3] == compact.tokens[3] and compact.tokens[3] != compact.tokens[4]
+
+@pytest.mark.parametrize("text", TOKEN_SOURCES)
+def test_compact_tokens_parse_like_common_tokens(text, monkeypatch):
+    for strategy in ("two-stage", "ll"):
+        common = parse_tokens(lexed(CommonTokenStream, text), strategy=strategy)
+        compact = parse_tokens(lexed(CompactTokenStream, text), strategy=strategy)
+        assert (compact.stage, compact.issues) == (common.stage, common.issues)
+        assert tree_as_lisp(compact) == tree_as_lisp(common)
+    # parse_source elige el stream por tamaño
+    monkeypatch.setattr(parser_module, "COMPACT_TOKENS_MIN_CHARS", 0)
+    result = parse_source(text)
+    assert isinstance(result.parser.getTokenStream(), CompactTokenStream)
+    assert tree_as_lisp(result) == tree_as_lisp(common) and result.issues == common.issues
+
+@pytest.mark.parametrize("text", TOKEN_SOURCES)
+def test_compact_tokens_print_the_tree_without_a_parser(text, monkeypatch):
+    # sin `recog`, Trees.getNodeText solo usa `.text` si el payload es un Token
+    common = parse_source(text).tree.toStringTree()
+    monkeypatch.setattr(parser_module, "COMPACT_TOKENS_MIN_CHARS", 0)
+    compact = parse_source(text)
+    assert isinstance(compact.parser.getTokenStream(), CompactTokenStream)
+    assert compact.tree.toStringTree() == common
+
+def test_compact_tokens_share_views_in_the_tree():
+    text = "let a: integer = 1 + 2 * 3;\n" * 50
+    tree = parse_tokens(lexed(CompactTokenStream, text)).tree
+    views = {}
+    def walk(node):
+        if hasattr(node, "symbol"):
+            views.setdefault(node.symbol.tokenIndex, set()).add(id(node.symbol))
+            return
+        for token in (node.start, node.stop):
+            views.setdefault(token.tokenIndex, set()).add(id(token))
+        for child in node.getChildren():
+            walk(child)
+    walk(tree)
+    # una vista por token: start/stop de las reglas reusan la del nodo terminal
+    assert max(len(ids) for ids in views.values()) == 1
+    buffer = lexed(CompactTokenStream, text).tokens
+    assert buffer.memory_bytes() < 32 * len(buffer)